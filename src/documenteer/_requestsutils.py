@@ -1,11 +1,17 @@
 """Utilities for working with requests."""
 
-__all__ = ("requests_retry_session",)
+__all__ = (
+    "max_retries",
+    "requests_retry_session",
+    "response_retries",
+    "retries_exhausted",
+)
 
 from collections.abc import Sequence
 
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
 from urllib3.util import Retry
 
 
@@ -14,6 +20,7 @@ def requests_retry_session(
     backoff_factor: float = 0.3,
     status_forcelist: Sequence[int] = (500, 502, 504),
     session: requests.Session | None = None,
+    pool_maxsize: int = 10,
 ) -> requests.Session:
     """Create a requests session that handles errors by retrying.
 
@@ -27,6 +34,10 @@ def requests_retry_session(
         Status codes that must be retried.
     session : `requests.Session`
         An existing requests session to configure.
+    pool_maxsize : `int`, optional
+        Maximum number of connections kept open per host. Set this to at
+        least the number of threads that share the session, so concurrent
+        requests don't discard each other's connections.
 
     Returns
     -------
@@ -48,7 +59,67 @@ def requests_retry_session(
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
+
+
+def max_retries(session: requests.Session, url: str) -> int:
+    """Return the number of times a session retries a request to a URL.
+
+    Parameters
+    ----------
+    session : `requests.Session`
+        The session.
+    url : `str`
+        The URL of the request.
+
+    Returns
+    -------
+    retries : `int`
+        The total number of retries of the session's adapter for the URL,
+        or 0 if it has no retry limit.
+    """
+    retry = getattr(session.get_adapter(url), "max_retries", None)
+    total = getattr(retry, "total", None)
+    return total if isinstance(total, int) else 0
+
+
+def response_retries(response: requests.Response) -> int:
+    """Return the number of times the request of a response was retried.
+
+    Parameters
+    ----------
+    response : `requests.Response`
+        The response.
+
+    Returns
+    -------
+    retries : `int`
+        The number of retries in the urllib3 retry history of the response.
+    """
+    retry = getattr(response.raw, "retries", None)
+    return len(retry.history) if retry is not None else 0
+
+
+def retries_exhausted(error: BaseException | None) -> bool:
+    """Return whether a requests exception was raised because the request
+    ran out of retries.
+
+    Parameters
+    ----------
+    error : `BaseException` or `None`
+        The exception.
+
+    Returns
+    -------
+    exhausted : `bool`
+        `True` if the retries were exhausted, in which case the request was
+        retried `max_retries` times.
+    """
+    if isinstance(error, requests.exceptions.RetryError):
+        return True
+    return isinstance(error, requests.RequestException) and any(
+        isinstance(arg, MaxRetryError) for arg in error.args
+    )
@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 
 import click
+import git
+from sphinx.errors import ConfigError
 
+from documenteer.conf._utils import GitRepository
+from documenteer.services.changedpages import ChangedPagesService
+from documenteer.services.intersphinxlock import IntersphinxLockService
+from documenteer.services.intersphinxprefetch import IntersphinxPrefetchService
 from documenteer.services.technoteauthor import TechnoteAuthorService
 from documenteer.services.technotemigration import TechnoteMigrationService
 from documenteer.storage.authordb import AuthorDb
+from documenteer.storage.intersphinxcacheclient import TOKEN_ENV_VAR
 from documenteer.storage.technotetoml import TechnoteTomlFile
 
 
@@ -185,3 +194,247 @@ def technote_migrate(
 
     if auto_delete or click.confirm("Delete deprecated files?"):
         migration_service.delete_deprecated_files()
+
+
+@main.command(name="changed-pages")
+@click.argument("base")
+@click.argument("head", default="HEAD")
+@click.option(
+    "--doctrees",
+    "-d",
+    "doctree_dir",
+    type=click.Path(exists=True, file_okay=False),
+    default="_build/doctrees",
+    show_default=True,
+    help="Doctree directory of a previous build",
+)
+@click.option(
+    "--srcdir",
+    "-s",
+    "srcdir",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Source directory, if it moved since the build",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print a JSON object rather than one docname per line",
+)
+def changed_pages(
+    base: str,
+    head: str,
+    doctree_dir: str,
+    srcdir: str | None,
+    *,
+    as_json: bool,
+) -> None:
+    """List the pages affected by the changes between two Git revisions.
+
+    The changes are those that HEAD (by default, the checked-out commit)
+    makes since it diverged from BASE, as in a pull request from HEAD into
+    BASE. A page is affected if its source file, or a file it includes,
+    changed. Dependencies are read from the environment saved by a previous
+    Sphinx build; changes to configuration or templates are not counted.
+    """
+    try:
+        service = ChangedPagesService.from_doctree_dir(
+            Path(doctree_dir),
+            srcdir=Path(srcdir) if srcdir is not None else None,
+        )
+    except FileNotFoundError as e:
+        raise click.ClickException(
+            f"No saved Sphinx environment in {doctree_dir}"
+        ) from e
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError) as e:
+        raise click.ClickException(
+            "The source directory is not in a Git repository"
+        ) from e
+    try:
+        paths = service.compute_changed_paths(base, head)
+    except git.GitCommandError as e:
+        raise click.ClickException(
+            f"Can't compare {base} and {head}: {e.stderr.strip()}"
+        ) from e
+    docnames = service.find_docnames(paths)
+    if as_json:
+        data = {
+            "base": base,
+            "head": head,
+            "paths": paths,
+            "docnames": docnames,
+        }
+        click.echo(json.dumps(data, indent=2))
+    else:
+        for docname in docnames:
+            click.echo(docname)
+
+
+@main.group(name="last-modified")
+def last_modified() -> None:
+    """Manage Git last-modified dates for documentation builds."""
+
+
+@last_modified.command(name="export")
+@click.option(
+    "--dir",
+    "-d",
+    "root_dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=".",
+    help="Path inside the Git working tree",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["subprocess", "objects"]),
+    default="subprocess",
+    help="How to read the Git history",
+)
+@click.argument("output", type=click.Path(dir_okay=False))
+def last_modified_export(root_dir: str, backend: str, output: str) -> None:
+    """Export the Git history index to a manifest file.
+
+    Run this command in a full-history clone (such as in a scheduled CI job)
+    and point the documenteer_last_modified_history_manifest configuration
+    at the OUTPUT file so that builds from shallow clones get accurate
+    last-modified dates.
+    """
+    try:
+        git_repo = GitRepository(
+            Path(root_dir), history_index=True, backend=backend
+        )
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError) as e:
+        raise click.ClickException(
+            f"{root_dir} is not a Git repository"
+        ) from e
+    try:
+        git_repo.write_history_manifest(Path(output))
+    except (RuntimeError, OSError) as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(
+        f"Wrote the history of {git_repo.head_sha} to {output} "
+        f"({len(git_repo.get_history_index())} paths)"
+    )
+
+
+@main.group()
+def intersphinx() -> None:
+    """Manage the intersphinx inventories of documentation builds."""
+
+
+@intersphinx.command(name="lock")
+@click.option(
+    "--dir",
+    "-d",
+    "conf_dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=".",
+    help="Sphinx configuration directory, containing conf.py",
+)
+@click.option(
+    "--lockfile",
+    "lockfile",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "Path of the lockfile (default: the configured lockfile, or "
+        "intersphinx-lock.json in the configuration directory)"
+    ),
+)
+def intersphinx_lock(conf_dir: str, lockfile: str | None) -> None:
+    """Pin the project's intersphinx inventories in a lockfile.
+
+    Each inventory in the project's intersphinx_mapping is fetched from Ook
+    and pinned by its content digest. The inventories are stored in the
+    shared intersphinx inventory cache, and builds that use the lockfile
+    (the documenteer_intersphinx_cache_lockfile configuration) map them from
+    there without contacting Ook or the origin sites. Commit the lockfile to
+    the repository, and run this command again to update the pins.
+
+    Fetching the inventories requires an Ook token in the OOK_TOKEN
+    environment variable.
+    """
+    if not os.getenv(TOKEN_ENV_VAR):
+        raise click.ClickException(
+            f"Set the {TOKEN_ENV_VAR} environment variable to an Ook token"
+        )
+    try:
+        service = IntersphinxLockService.from_conf_dir(
+            Path(conf_dir),
+            lockfile_path=Path(lockfile) if lockfile is not None else None,
+        )
+    except ConfigError as e:
+        raise click.ClickException(str(e)) from e
+    try:
+        changed = service.lock()
+    except (RuntimeError, OSError) as e:
+        raise click.ClickException(str(e)) from e
+    if changed:
+        click.echo(f"Updated {service.lockfile_path}:")
+        for name in changed:
+            click.echo(f"- {name}")
+    else:
+        click.echo(f"{service.lockfile_path} is up to date")
+
+
+@intersphinx.command(name="prefetch")
+@click.option(
+    "--toml",
+    "-t",
+    "toml_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default="documenteer.toml",
+    show_default=True,
+    help="Path to the documenteer.toml file",
+)
+@click.option(
+    "--doctrees",
+    "-d",
+    "doctree_dir",
+    type=click.Path(file_okay=False),
+    default="_build/doctrees",
+    show_default=True,
+    help="Doctree directory of the build",
+)
+def intersphinx_prefetch(toml_path: str, doctree_dir: str) -> None:
+    """Prefetch a user guide's intersphinx inventories from Ook.
+
+    The inventories of the [sphinx.intersphinx.projects] in documenteer.toml
+    are fetched concurrently, with the [sphinx.intersphinx_cache] settings,
+    into the directory that the Sphinx build uses (next to its doctree
+    directory). A build that follows within the disk_cache_ttl uses them
+    without contacting Ook, so you can run this command while other build
+    dependencies install.
+
+    Inventories that can't be prefetched are listed, and the build fetches
+    them itself. Fetching the inventories from Ook requires an Ook token in
+    the OOK_TOKEN environment variable. Without it, the inventories are
+    fetched from their origins, as in the build, if direct = true is set in
+    [sphinx.intersphinx_cache].
+    """
+    try:
+        service = IntersphinxPrefetchService.from_toml(
+            Path(toml_path), doctree_dir=Path(doctree_dir)
+        )
+    except (ConfigError, OSError) as e:
+        raise click.ClickException(str(e)) from e
+    if not service.settings.direct and not os.getenv(TOKEN_ENV_VAR):
+        raise click.ClickException(
+            f"Set the {TOKEN_ENV_VAR} environment variable to an Ook token, "
+            "or enable direct mode in [sphinx.intersphinx_cache]"
+        )
+    results = service.prefetch()
+    prefetched = [name for name, path in results.items() if path is not None]
+    click.echo(
+        f"Prefetched {len(prefetched)} of {len(results)} intersphinx "
+        f"inventories into {service.cache_dir}"
+    )
+    for name, path in results.items():
+        if path is None:
+            click.echo(
+                f"Could not prefetch the inventory for {name}; the build "
+                "will fetch it",
+                err=True,
+            )
@@ -28,6 +28,7 @@ from sphinx.errors import ConfigError
 from ..storage.intersphinxcacheclient import (
     DEFAULT_BASE_URL as INTERSPHINX_CACHE_DEFAULT_BASE_URL,
 )
+from ..storage.inventorycache import default_shared_cache_dir
 from ..storage.linkcheckclient import DEFAULT_BASE_URL as OOK_DEFAULT_BASE_URL
 from ._utils import normalize_origin_base_url
 
@@ -178,6 +179,23 @@ class IntersphinxModel(BaseModel):
         description="Mapping of projects and their URLs.", default_factory=dict
     )
 
+    usage_report: bool = Field(
+        False,
+        description=(
+            "Write a report of the references each intersphinx inventory "
+            "resolves, to find unused mapping entries."
+        ),
+    )
+
+    usage_threshold: int = Field(
+        5,
+        ge=1,
+        description=(
+            "Inventories that resolve fewer references than this are listed "
+            "as rarely used in the usage report."
+        ),
+    )
+
 
 class IntersphinxCacheModel(BaseModel):
     """Model for the Ook intersphinx inventory cache configuration in
@@ -213,6 +231,115 @@ class IntersphinxCacheModel(BaseModel):
         ),
     )
 
+    concurrency: int = Field(
+        8,
+        ge=1,
+        description=(
+            "Maximum number of inventories revalidated with Ook at the same "
+            "time. Set to 1 to fetch inventories one at a time."
+        ),
+    )
+
+    circuit_breaker_threshold: int = Field(
+        3,
+        ge=0,
+        description=(
+            "Number of consecutive requests that find Ook unreachable or "
+            "failing after which the remaining inventories skip Ook, using "
+            "an expired on-disk copy or falling back to the origin. Set to "
+            "0 to disable the circuit breaker."
+        ),
+    )
+
+    direct: bool = Field(
+        False,
+        description=(
+            "Without an OOK_TOKEN, fetch intersphinx inventories directly "
+            "from their origins into the same on-disk cache, revalidating "
+            "cached copies with conditional requests. By default, the "
+            "inventories are left to intersphinx when there's no token."
+        ),
+    )
+
+    report_summary: bool = Field(
+        False,
+        description=(
+            "Log a table that summarizes the prefetch report (the outcome, "
+            "size, time, and retries of each inventory) when the build "
+            "finishes."
+        ),
+    )
+
+    stale_while_revalidate: bool = Field(
+        False,
+        description=(
+            "Map an expired on-disk inventory immediately and revalidate it "
+            "with Ook in the background, so a build never waits on Ook when "
+            "it has a cached copy. A refreshed inventory is used as soon as "
+            "it arrives, or by the next build."
+        ),
+    )
+
+    lockfile: str | None = Field(
+        None,
+        description=(
+            "Path of the intersphinx lockfile written by "
+            "'documenteer intersphinx lock', relative to the "
+            "documenteer.toml file if not absolute. Builds map the "
+            "inventories it pins without contacting Ook."
+        ),
+    )
+
+    trim: bool = Field(
+        False,
+        description=(
+            "Record the objects that each prefetched inventory resolves, and "
+            "load only those objects (and the trim_keep object types) in "
+            "later builds. A reference that isn't in a trimmed inventory "
+            "makes the build fall back to the full inventories."
+        ),
+    )
+
+    trim_keep: list[str] = Field(
+        default_factory=lambda: [
+            "py:module",
+            "py:class",
+            "py:exception",
+            "std:doc",
+        ],
+        description=(
+            "Object types, such as 'py:class', that trimmed inventories keep "
+            "in full."
+        ),
+    )
+
+    shared_cache: bool = Field(
+        False,
+        description=(
+            "Keep prefetched inventories in a content-addressed cache shared "
+            "by every build on the machine, and link them into the build "
+            "directory."
+        ),
+    )
+
+    shared_cache_dir: str | None = Field(
+        None,
+        description=(
+            "Directory of the shared inventory cache, relative to the "
+            "documenteer.toml file if not absolute. Defaults to "
+            "documenteer/intersphinx in the user's XDG cache directory."
+        ),
+    )
+
+    shared_cache_max_size: int = Field(
+        256,
+        ge=1,
+        description=(
+            "Size limit of the shared inventory cache, in megabytes. The "
+            "least recently used inventories are evicted beyond it."
+        ),
+    )
+
 
 class LinkCheckModel(BaseModel):
     """Model for linkcheck builder configurations in documenteer.toml."""
@@ -549,6 +676,27 @@ class DocumenteerConfig:
             for project, url in self.conf.sphinx.intersphinx.projects.items():
                 mapping[project] = (str(url), None)
 
+    @property
+    def _intersphinx(self) -> IntersphinxModel:
+        """The intersphinx configuration model, or its defaults if the
+        [sphinx] table is not set.
+        """
+        if self.conf.sphinx:
+            return self.conf.sphinx.intersphinx
+        return IntersphinxModel()
+
+    @property
+    def intersphinx_usage_report(self) -> bool:
+        """Whether the intersphinx usage report is written."""
+        return self._intersphinx.usage_report
+
+    @property
+    def intersphinx_usage_threshold(self) -> int:
+        """Number of references below which an inventory is reported as
+        rarely used.
+        """
+        return self._intersphinx.usage_threshold
+
     @property
     def _intersphinx_cache(self) -> IntersphinxCacheModel:
         """The intersphinx cache configuration model, or its defaults if the
@@ -579,6 +727,74 @@ class DocumenteerConfig:
         """
         return self._intersphinx_cache.disk_cache_ttl
 
+    @property
+    def intersphinx_cache_concurrency(self) -> int:
+        """Maximum number of inventories revalidated with Ook at the same
+        time.
+        """
+        return self._intersphinx_cache.concurrency
+
+    @property
+    def intersphinx_cache_circuit_breaker_threshold(self) -> int:
+        """Number of consecutive failed requests to Ook after which the
+        remaining inventories skip Ook (0 disables the circuit breaker).
+        """
+        return self._intersphinx_cache.circuit_breaker_threshold
+
+    @property
+    def intersphinx_cache_direct(self) -> bool:
+        """Whether builds without an Ook token fetch inventories directly
+        from their origins.
+        """
+        return self._intersphinx_cache.direct
+
+    @property
+    def intersphinx_cache_report_summary(self) -> bool:
+        """Whether the prefetch report is summarized in the build log."""
+        return self._intersphinx_cache.report_summary
+
+    @property
+    def intersphinx_cache_stale_while_revalidate(self) -> bool:
+        """Whether expired on-disk inventories are revalidated with Ook in
+        the background.
+        """
+        return self._intersphinx_cache.stale_while_revalidate
+
+    @property
+    def intersphinx_cache_lockfile(self) -> str | None:
+        """Path of the intersphinx lockfile, or `None` if builds don't use
+        one.
+        """
+        return self._intersphinx_cache.lockfile
+
+    @property
+    def intersphinx_cache_trim(self) -> bool:
+        """Whether prefetched inventories are trimmed to the objects the
+        project links to.
+        """
+        return self._intersphinx_cache.trim
+
+    @property
+    def intersphinx_cache_trim_keep(self) -> list[str]:
+        """Object types that trimmed inventories keep in full."""
+        return self._intersphinx_cache.trim_keep
+
+    @property
+    def intersphinx_cache_shared_dir(self) -> str | None:
+        """Directory of the shared inventory cache, or `None` if the shared
+        cache is disabled.
+        """
+        if not self._intersphinx_cache.shared_cache:
+            return None
+        if self._intersphinx_cache.shared_cache_dir:
+            return self._intersphinx_cache.shared_cache_dir
+        return str(default_shared_cache_dir())
+
+    @property
+    def intersphinx_cache_shared_max_size(self) -> int:
+        """Size limit of the shared inventory cache, in megabytes."""
+        return self._intersphinx_cache.shared_cache_max_size
+
     def append_linkcheck_ignore(self, link_patterns: list[str]) -> None:
         """Append URL patterns for sphinx.linkcheck.ignore to existing
         patterns.
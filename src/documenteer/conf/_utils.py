@@ -2,20 +2,28 @@
 
 from __future__ import annotations
 
+import json
+import os
+import tempfile
 from collections.abc import Sequence
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
 from urllib.parse import urlsplit, urlunsplit
 
-from git import Repo
+from git import GitCommandError, Repo, SymbolicReference
 from sphinx.errors import ConfigError
 
+from ..storage.gitobjects import GitObjectReader, GitObjectReaderError
+
 __all__ = [
     "GitRepository",
+    "LastCommit",
     "extend_static_paths_with_asset_extension",
     "get_asset_path",
     "get_common_nitpick_ignore",
     "get_common_nitpick_ignore_regex",
+    "get_git_repository",
     "get_technote_origin_base_url",
     "get_template_dir",
     "normalize_origin_base_url",
@@ -155,17 +163,107 @@ def get_template_dir(root: str) -> str:
     return str(dirname)
 
 
+@dataclass(frozen=True)
+class LastCommit:
+    """The newest commit to touch a path, or a set of paths."""
+
+    sha: str | None
+    """The hexadecimal SHA of the commit, or `None` when the date comes from
+    uncommitted changes in the working tree (see
+    `GitRepository.compute_last_commit`).
+    """
+
+    date: datetime
+    """The timezone-aware committer datetime, in the commit's own timezone
+    offset.
+    """
+
+
 class GitRepository:
     """Access to to metadata about the Git repository of the documentation
     project.
+
+    Parameters
+    ----------
+    dirname
+        A directory inside the Git working tree. Parent directories are
+        searched for the repository.
+    history_index
+        If `True`, `compute_last_commit` answers from a path-to-commit index
+        built by walking the history once (see `get_history_index`) instead
+        of running one ``git rev-list`` per path. This is much faster when
+        many paths are looked up, as in a documentation build.
+    history_index_cache
+        Path of a JSON file that persists the history index between
+        processes, keyed by the ``HEAD`` commit. When the cached ``HEAD`` is
+        an ancestor of the current one, only the new commits are scanned;
+        otherwise (or when the file is missing or unreadable) the full
+        history is scanned and the file is rewritten. Only used in
+        history-index mode.
+    backend
+        How history-index mode reads the history. ``"subprocess"`` runs
+        ``git log`` and ``git merge-base``. ``"objects"`` reads the
+        repository's object database in-process with
+        `~documenteer.storage.gitobjects.GitObjectReader` (loose objects,
+        packfiles, and the commit-graph), which avoids spawning processes.
+        A repository the in-process reader can't handle (such as one using
+        SHA-256 object names, or a partial clone with missing objects) falls
+        back to the ``"subprocess"`` backend.
+    history_manifest
+        Path of a history index precomputed from a full-history clone of the
+        same repository (see `write_history_manifest`). When the repository
+        is a shallow clone, history-index mode combines the manifest with
+        the commits in the shallow window (see `get_history_index`) instead
+        of dating every file in the boundary commit by that commit. Ignored
+        for a full clone.
     """
 
-    def __init__(self, dirname: Path) -> None:
+    def __init__(
+        self,
+        dirname: Path,
+        *,
+        history_index: bool = False,
+        history_index_cache: Path | None = None,
+        backend: str = "subprocess",
+        history_manifest: Path | None = None,
+    ) -> None:
+        if backend not in ("subprocess", "objects"):
+            raise ValueError(f"Unknown Git backend {backend!r}.")
         self._repo = Repo(dirname, search_parent_directories=True)
-        # Cache of the last-modified datetime for each absolute path so that
-        # shared dependencies (e.g. included files) are only resolved once per
+        # Cache of the last commit for each absolute path so that shared
+        # dependencies (e.g. included files) are only resolved once per
         # build, rather than once per referencing page.
-        self._last_modified_cache: dict[str, datetime | None] = {}
+        self._last_commit_cache: dict[str, LastCommit | None] = {}
+        # In history-index mode, a single ``git log`` pass builds a map of
+        # every path in the history to its newest commit, so that each lookup
+        # is a dictionary access rather than a subprocess. The index is built
+        # lazily on first use, and rebuilt (incrementally, when possible)
+        # when HEAD moves.
+        self._use_history_index = False
+        self._history_index: dict[str, LastCommit] | None = None
+        self._history_index_head: str | None = None
+        self._history_index_cache: Path | None = None
+        self._history_manifest_path: Path | None = None
+        # The manifest's HEAD and index, read on first use.
+        self._history_manifest: tuple[str, dict[str, LastCommit]] | None = None
+        self._history_manifest_read = False
+        # Map of path suffixes to paths, and the index it was built from.
+        self._suffix_map: dict[str, list[str]] | None = None
+        self._suffix_map_index: dict[str, LastCommit] | None = None
+        # Paths with uncommitted changes, and when they were found.
+        self._dirty_paths: frozenset[str] | None = None
+        self._status_time = datetime.now(tz=UTC)
+        self._backend = "subprocess"
+        self._objects: GitObjectReader | None = None
+        if backend == "objects":
+            self._backend = backend
+            self._objects = self._open_object_reader()
+        if history_index:
+            self.enable_history_index(
+                history_index_cache=history_index_cache,
+                backend=backend,
+                history_manifest=history_manifest,
+            )
 
     @property
     def working_tree_dir(self) -> Path:
@@ -216,11 +314,51 @@ class GitRepository:
         ``fetch-depth: 0``) does not contain the full commit history, so
         commit-date lookups are unreliable.
         """
-        result = self._repo.git.rev_parse("--is-shallow-repository")
-        return result.strip() == "true"
+        if self._objects is not None:
+            return self._objects.is_shallow
+        # This is what git rev-parse --is-shallow-repository checks, without
+        # the subprocess.
+        return bool(self._read_shallow_commits())
+
+    def enable_history_index(
+        self,
+        *,
+        history_index_cache: Path | None = None,
+        backend: str = "subprocess",
+        history_manifest: Path | None = None,
+    ) -> None:
+        """Switch to history-index mode, or change its options.
+
+        The parameters are those of the constructor. This lets an instance
+        shared through `get_git_repository` be put in history-index mode by
+        the extension that needs it. Changing any option discards the
+        in-memory index.
+        """
+        if backend not in ("subprocess", "objects"):
+            raise ValueError(f"Unknown Git backend {backend!r}.")
+        if (
+            self._use_history_index
+            and history_index_cache == self._history_index_cache
+            and backend == self._backend
+            and history_manifest == self._history_manifest_path
+        ):
+            return
+        self._use_history_index = True
+        self._history_index_cache = history_index_cache
+        self._history_manifest_path = history_manifest
+        self._history_manifest = None
+        self._history_manifest_read = False
+        self._history_index = None
+        self._history_index_head = None
+        self._last_commit_cache.clear()
+        if backend != self._backend:
+            self._backend = backend
+            self._objects = (
+                self._open_object_reader() if backend == "objects" else None
+            )
 
     def compute_last_modified(
-        self, paths: Sequence[Path | str]
+        self, paths: Sequence[Path | str], *, uncommitted: str = "ignore"
     ) -> datetime | None:
         """Compute the most-recent commit datetime across a set of paths.
 
@@ -229,6 +367,9 @@ class GitRepository:
         paths
             Paths to consider. Typically a page's source file together with
             any files it pulls in via ``include``/``literalinclude``.
+        uncommitted
+            How to date paths with uncommitted changes; see
+            `compute_last_commit`.
 
         Returns
         -------
@@ -236,11 +377,59 @@ class GitRepository:
             The most recent commit datetime (timezone-aware) across all of the
             tracked ``paths``. Paths that are untracked (e.g. new or
             uncommitted files), or that lie outside the Git working tree, are
+            ignored, unless ``uncommitted`` says otherwise. Returns `None` if
+            none of the paths are tracked in the repository.
+
+        See Also
+        --------
+        compute_last_commit
+            The same lookup, also identifying the commit.
+        """
+        last_commit = self.compute_last_commit(paths, uncommitted=uncommitted)
+        return None if last_commit is None else last_commit.date
+
+    def compute_last_commit(
+        self, paths: Sequence[Path | str], *, uncommitted: str = "ignore"
+    ) -> LastCommit | None:
+        """Find the most-recent commit across a set of paths.
+
+        Parameters
+        ----------
+        paths
+            Paths to consider. Typically a page's source file together with
+            any files it pulls in via ``include``/``literalinclude``.
+        uncommitted
+            How to date paths with uncommitted changes (modified, staged,
+            or untracked files, per `get_dirty_paths`). ``"ignore"`` (the
+            default) uses their last commits, if any. ``"now"`` dates them
+            by the time the working-tree status was taken, and ``"mtime"``
+            by their modification times.
+
+        Returns
+        -------
+        LastCommit or None
+            The SHA and datetime of the most recent commit touching any of
+            the tracked ``paths``. Paths that are untracked (e.g. new or
+            uncommitted files), or that lie outside the Git working tree, are
             ignored. Returns `None` if none of the paths are tracked in the
-            repository.
+            repository. When ``uncommitted`` dates a path with uncommitted
+            changes more recently than any commit, the result has that date
+            and no SHA.
+
+        Notes
+        -----
+        In history-index mode each lookup is a dictionary access into
+        `get_history_index`; otherwise each distinct path costs one
+        ``git rev-list`` subprocess (memoized per path).
         """
+        if uncommitted not in ("ignore", "now", "mtime"):
+            raise ValueError(f"Unknown uncommitted mode {uncommitted!r}.")
+        if self._use_history_index:
+            # Refreshes the index, and drops the memoized lookups, if HEAD
+            # moved since the last call.
+            self.get_history_index()
         working_tree_dir = self.working_tree_dir.resolve()
-        datetimes: list[datetime] = []
+        commits: list[LastCommit] = []
         for path in paths:
             abs_path = Path(path).resolve()
 
@@ -250,27 +439,572 @@ class GitRepository:
                 continue
 
             key = str(abs_path)
-            if key in self._last_modified_cache:
-                cached = self._last_modified_cache[key]
+            if key in self._last_commit_cache:
+                cached = self._last_commit_cache[key]
             else:
-                cached = self._get_path_last_modified(abs_path)
-                self._last_modified_cache[key] = cached
+                cached = self._get_path_last_commit(abs_path)
+                self._last_commit_cache[key] = cached
 
             if cached is not None:
-                datetimes.append(cached)
+                commits.append(cached)
+
+            if uncommitted != "ignore":
+                relative = abs_path.relative_to(working_tree_dir).as_posix()
+                dirty = self._date_uncommitted(relative, abs_path, uncommitted)
+                if dirty is not None:
+                    commits.append(dirty)
+
+        if not commits:
+            return None
+        return max(commits, key=lambda commit: commit.date)
+
+    def get_history_index(self) -> dict[str, LastCommit]:
+        """Get the map of every path in the history to the newest commit
+        that touched it.
+
+        The index is built on first use with a single ``git log`` pass over
+        the history reachable from ``HEAD``, and cached on the instance. If
+        ``HEAD`` has since moved to a descendant commit, only the new
+        commits are scanned; otherwise the index is rebuilt.
+
+        In a shallow clone with a usable history manifest (see
+        `history_manifest_head`), the index starts from the manifest and is
+        updated with the commits in the shallow window. If the manifest's
+        ``HEAD`` is in the window, only the commits after it are scanned
+        and the result is exact. Otherwise the whole window is scanned, but
+        the boundary commits' changes are unknown (Git treats them as root
+        commits that add every file), so they only date the paths that the
+        manifest lacks; paths changed between the manifest's ``HEAD`` and
+        the boundary keep their manifest dates.
+
+        Returns
+        -------
+        dict
+            Mapping of POSIX-style paths, relative to the root of the Git
+            working tree, to their newest commits. Paths that were
+            deleted from the working tree are included too; they are simply
+            never looked up.
+        """
+        head = self.head_sha
+        if self._history_index is None or self._history_index_head != head:
+            self._history_index = (
+                {} if head is None else self._update_history_index(head)
+            )
+            self._history_index_head = head
+            self._last_commit_cache.clear()
+        return self._history_index
+
+    @property
+    def head_sha(self) -> str | None:
+        """The SHA of the ``HEAD`` commit, or `None` if the repository has
+        no commits yet.
+        """
+        # Resolving HEAD through GitPython's Commit objects runs git
+        # cat-file; reading the ref files stays in-process, so the SHA is
+        # cheap enough to read afresh on every call.
+        try:
+            return SymbolicReference.dereference_recursive(self._repo, "HEAD")
+        except ValueError:
+            return None
+
+    def find_paths_by_suffix(self, suffix: str) -> list[str]:
+        """Find the paths in the history index that end with a suffix.
+
+        This locates a file in the repository from the tail of its path,
+        such as the source in the repository of a Python module that is
+        installed elsewhere.
+
+        Parameters
+        ----------
+        suffix
+            A POSIX-style relative path, matched against whole trailing
+            components (``"pkg/mod.py"`` matches ``"src/pkg/mod.py"`` but not
+            ``"src/mypkg/mod.py"``).
+
+        Returns
+        -------
+        list of str
+            The matching paths, relative to the root of the Git working tree,
+            that still exist in the working tree, sorted.
+
+        Notes
+        -----
+        The first call builds a map of every suffix of every path in the
+        history index, so that each lookup is a dictionary access; the map
+        is rebuilt when the index is.
+        """
+        index = self.get_history_index()
+        if self._suffix_map is None or self._suffix_map_index is not index:
+            suffix_map: dict[str, list[str]] = {}
+            for path in index:
+                parts = path.split("/")
+                for i in range(len(parts)):
+                    key = "/".join(parts[i:])
+                    suffix_map.setdefault(key, []).append(path)
+            self._suffix_map = suffix_map
+            self._suffix_map_index = index
+        working_tree_dir = self.working_tree_dir
+        return sorted(
+            path
+            for path in self._suffix_map.get(suffix, [])
+            if (working_tree_dir / path).exists()
+        )
+
+    def get_dirty_paths(self) -> frozenset[str]:
+        """Get the paths with uncommitted changes in the working tree.
+
+        The working-tree status is taken with a single
+        ``git status --porcelain=v2 -z`` on first use and cached on the
+        instance; call `refresh_dirty_paths` to take it again (for example,
+        at the start of each build in a long-running process).
+
+        Returns
+        -------
+        frozenset of str
+            POSIX-style paths, relative to the root of the Git working tree,
+            of files that are modified or deleted (whether or not the changes
+            are staged), renamed or copied (both names), in conflict, or
+            untracked and not ignored.
+        """
+        if self._dirty_paths is None:
+            return self.refresh_dirty_paths()
+        return self._dirty_paths
+
+    def refresh_dirty_paths(self) -> frozenset[str]:
+        """Take the working-tree status again, returning the new
+        `get_dirty_paths`.
+        """
+        output = self._repo.git.status(
+            "--porcelain=v2", "-z", "--untracked-files=all"
+        )
+        self._status_time = datetime.now(tz=UTC)
+        self._dirty_paths = frozenset(_parse_porcelain_v2_status(output))
+        return self._dirty_paths
+
+    def compute_changed_paths(
+        self, base: str, head: str = "HEAD"
+    ) -> list[str]:
+        """List the paths changed between two commits.
+
+        Parameters
+        ----------
+        base
+            The base revision (a commit SHA, branch, or tag).
+        head
+            The revision whose changes are listed.
+
+        Returns
+        -------
+        list of str
+            POSIX-style paths, relative to the root of the Git working tree,
+            of the files changed on ``head`` since its merge base with
+            ``base`` (``git diff base...head``, the changes a pull request
+            from ``head`` into ``base`` makes). A renamed file is listed
+            under both its old and new names.
+
+        Raises
+        ------
+        git.GitCommandError
+            Raised if either revision can't be resolved.
+        """
+        output = self._repo.git.diff(
+            "--name-only", "--no-renames", "-z", f"{base}...{head}", "--"
+        )
+        return [name for name in output.split("\0") if name]
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Whether the commit ``ancestor`` is an ancestor of (or the same
+        commit as) ``descendant``.
 
-        if not datetimes:
+        A commit that doesn't exist in the repository (for example, one
+        dropped by a rebase and garbage-collected) is not an ancestor.
+        """
+        if self._objects is not None:
+            return self._objects.is_ancestor(ancestor, descendant)
+        try:
+            # Exits 0 for an ancestor, 1 otherwise, and 128 for an unknown
+            # commit; GitPython raises for any non-zero exit status.
+            self._repo.git.merge_base("--is-ancestor", ancestor, descendant)
+        except GitCommandError:
+            return False
+        return True
+
+    def _update_history_index(self, head: str) -> dict[str, LastCommit]:
+        """Bring the history index up to date with ``head``.
+
+        The starting point is the in-memory index for an earlier ``HEAD``,
+        if any, or else the persisted cache. One for ``head`` itself is used
+        as-is. One for an ancestor of ``head`` is updated by scanning only
+        the commits between the two (``cached..HEAD``). Any other (a rebased
+        or force-pushed branch, an unreadable file, an older format) is
+        discarded in favor of a full scan. The cache file is rewritten
+        whenever its contents change.
+        """
+        cache_path = self._history_index_cache
+        cached: tuple[str, dict[str, LastCommit]] | None = None
+        if self._history_index is not None and self._history_index_head:
+            cached = (self._history_index_head, dict(self._history_index))
+        elif cache_path is not None:
+            cached = _read_history_index_cache(cache_path)
+
+        if cached is not None:
+            cached_head, index = cached
+            if cached_head == head:
+                return index
+            if self.is_ancestor(cached_head, head):
+                new_commits = self._scan_history(head, since=cached_head)
+                for path, committed in new_commits.items():
+                    previous = index.get(path)
+                    if previous is None or committed.date > previous.date:
+                        index[path] = committed
+                if cache_path is not None:
+                    _write_history_index_cache(cache_path, head, index)
+                return index
+
+        index = self._build_history_index(head)
+        if cache_path is not None:
+            _write_history_index_cache(cache_path, head, index)
+        return index
+
+    @property
+    def history_manifest_head(self) -> str | None:
+        """The ``HEAD`` commit that the history manifest was computed for, or
+        `None` if there's no manifest or it can't be read.
+        """
+        manifest = self._read_history_manifest()
+        return None if manifest is None else manifest[0]
+
+    def write_history_manifest(self, path: Path) -> None:
+        """Write the history index to a file, for use as the
+        ``history_manifest`` of a shallow clone of this repository.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if the repository is itself a shallow clone, whose history
+            index is incomplete, or has no commits.
+        """
+        if self.is_shallow:
+            raise RuntimeError(
+                "Can't write a history manifest from a shallow clone."
+            )
+        head = self.head_sha
+        if head is None:
+            raise RuntimeError("The Git repository has no commits.")
+        index = (
+            self.get_history_index()
+            if self._use_history_index
+            else self._scan_history(head)
+        )
+        _write_history_index_cache(path, head, index, raise_errors=True)
+
+    def _date_uncommitted(
+        self, relative: str, path: Path, mode: str
+    ) -> LastCommit | None:
+        """Date a path by its uncommitted changes, or return `None` if it
+        has none (or, in ``"mtime"`` mode, no longer exists).
+        """
+        if relative not in self.get_dirty_paths():
+            return None
+        if mode == "now":
+            return LastCommit(sha=None, date=self._status_time)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        return LastCommit(sha=None, date=datetime.fromtimestamp(mtime, tz=UTC))
+
+    def _read_history_manifest(
+        self,
+    ) -> tuple[str, dict[str, LastCommit]] | None:
+        """Read the history manifest on first use, returning its ``HEAD``
+        and index, or `None` if there's no usable manifest.
+        """
+        if not self._history_manifest_read:
+            self._history_manifest_read = True
+            if self._history_manifest_path is not None:
+                self._history_manifest = _read_history_index_cache(
+                    self._history_manifest_path
+                )
+        return self._history_manifest
+
+    def _build_history_index(self, head: str) -> dict[str, LastCommit]:
+        """Build the history index from scratch, from the history manifest
+        and the shallow window in a shallow clone (see `get_history_index`).
+        """
+        manifest = self._read_history_manifest()
+        if manifest is None or not self.is_shallow:
+            return self._scan_history(head)
+        manifest_head, manifest_index = manifest
+        index = dict(manifest_index)
+        if self.is_ancestor(manifest_head, head):
+            window = self._scan_history(head, since=manifest_head)
+            boundary: frozenset[str] = frozenset()
+        else:
+            window = self._scan_history(head)
+            boundary = self._read_shallow_commits()
+        for path, committed in window.items():
+            previous = index.get(path)
+            if previous is not None and committed.sha in boundary:
+                continue
+            if previous is None or committed.date > previous.date:
+                index[path] = committed
+        return index
+
+    def _read_shallow_commits(self) -> frozenset[str]:
+        """Read the SHAs of the boundary commits of a shallow clone."""
+        shallow_file = Path(self._repo.common_dir) / "shallow"
+        try:
+            text = shallow_file.read_text(encoding="ascii")
+        except FileNotFoundError:
+            return frozenset()
+        return frozenset(text.split())
+
+    def _open_object_reader(self) -> GitObjectReader | None:
+        """Open the in-process object reader, or return `None` (selecting
+        the subprocess backend) if it can't read this repository.
+        """
+        config = self._repo.config_reader()
+        object_format = config.get_value("extensions", "objectformat", "sha1")
+        if object_format != "sha1":
             return None
-        return max(datetimes)
+        try:
+            return GitObjectReader(Path(self._repo.common_dir))
+        except GitObjectReaderError:
+            return None
+
+    def _scan_history(
+        self, head: str, since: str | None = None
+    ) -> dict[str, LastCommit]:
+        """Walk the commit history once and map each touched path to its
+        newest commit.
+
+        Parameters
+        ----------
+        head
+            SHA of the commit whose history is walked.
+        since
+            SHA of a commit whose history is excluded, so that only the
+            commits in ``since..head`` are walked.
+
+        Returns
+        -------
+        dict
+            Mapping of repository-relative POSIX paths to commits.
+        """
+        if self._objects is not None:
+            try:
+                scanned = self._objects.scan_history(head, since=since)
+            except GitObjectReaderError:
+                # For example, a partial clone whose missing objects only
+                # git can fetch; use git itself from now on.
+                self._objects = None
+            else:
+                return {
+                    path: LastCommit(sha=sha, date=date)
+                    for path, (sha, date) in scanned.items()
+                }
+        # Each commit is emitted as a record separator (0x1e), the commit's
+        # SHA, a unit separator (0x1f), and its committer date, NUL
+        # terminated. With -z the paths the commit touched follow as
+        # NUL-terminated names, so unusual characters in filenames are never
+        # quoted. --no-renames reports a rename as a deletion plus an
+        # addition, so the new path is dated by the commit that renamed it
+        # regardless of the user's diff.renames setting. Only the
+        # first-parent chain is walked, and a merge commit lists the paths
+        # that differ from its first parent: changes made only in the merge
+        # (such as conflict resolutions) are dated by it, as are the changes
+        # it brings in, and changes it discarded from the merged branch are
+        # never seen.
+        output = self._repo.git.log(
+            f"{since}..{head}" if since else head,
+            "--name-only",
+            "--no-renames",
+            "--first-parent",
+            "--diff-merges=first-parent",
+            "-z",
+            "--format=%x1e%H%x1f%cI",
+        )
+        index: dict[str, LastCommit] = {}
+        for record in output.split("\x1e"):
+            header, _, names = record.partition("\0")
+            if not header:
+                continue
+            sha, _, iso_date = header.partition("\x1f")
+            committed = LastCommit(
+                sha=sha, date=datetime.fromisoformat(iso_date)
+            )
+            for raw_name in names.split("\0"):
+                name = raw_name.strip("\n")
+                if not name:
+                    continue
+                # git log lists commits newest first, but keep the max
+                # anyway: commit dates aren't guaranteed to be monotonic
+                # (rebases, clock skew), and the newest date is wanted.
+                previous = index.get(name)
+                if previous is None or committed.date > previous.date:
+                    index[name] = committed
+        return index
 
-    def _get_path_last_modified(self, path: Path) -> datetime | None:
-        """Get the datetime of the most recent commit touching a single path,
-        or `None` if the path isn't tracked.
+    def _get_path_last_commit(self, path: Path) -> LastCommit | None:
+        """Get the most recent commit touching a single path, or `None` if
+        the path isn't tracked.
         """
+        if self._use_history_index:
+            relative = self.compute_relative_path(path)
+            if relative is None:
+                return None
+            return self.get_history_index().get(relative)
         commits = list(self._repo.iter_commits(paths=str(path), max_count=1))
         if not commits:
             return None
-        return commits[0].committed_datetime
+        return LastCommit(
+            sha=commits[0].hexsha, date=commits[0].committed_datetime
+        )
+
+
+def _parse_porcelain_v2_status(output: str) -> list[str]:
+    """Parse the paths out of ``git status --porcelain=v2 -z`` output."""
+    paths: list[str] = []
+    records = iter(output.split("\0"))
+    for record in records:
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "1":
+            # 1 XY sub mH mI mW hH hI path
+            paths.append(record.split(" ", 8)[8])
+        elif kind == "2":
+            # 2 XY sub mH mI mW hH hI Xscore path, then the original path as
+            # the next NUL-terminated record.
+            paths.append(record.split(" ", 9)[9])
+            paths.append(next(records, ""))
+        elif kind == "u":
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            paths.append(record.split(" ", 10)[10])
+        elif kind in "?!":
+            paths.append(record[2:])
+    return [path for path in paths if path]
+
+
+_git_repositories: dict[Path, GitRepository] = {}
+"""The shared repositories of `get_git_repository`, keyed by the resolved
+root of their working trees.
+"""
+
+
+def get_git_repository(dirname: Path) -> GitRepository:
+    """Get the process-wide shared `GitRepository` for the working tree that
+    contains a directory.
+
+    Every Documenteer extension looks up its repository here, so the
+    repository is discovered once per process, and its history index is
+    computed and held in memory once, however many extensions (or, in a
+    long-running process like ``sphinx-autobuild``, builds) use it. The
+    shared instance starts out without a history index; an extension that
+    needs one calls `GitRepository.enable_history_index`. The instance
+    re-reads ``HEAD`` as needed, so it stays correct as commits are made.
+
+    Parameters
+    ----------
+    dirname
+        A directory inside the Git working tree. Parent directories are
+        searched for the repository.
+
+    Raises
+    ------
+    git.InvalidGitRepositoryError
+        Raised if ``dirname`` isn't in a Git working tree.
+    git.NoSuchPathError
+        Raised if ``dirname`` doesn't exist.
+    """
+    path = Path(dirname).resolve()
+    # Find the working-tree root the way Git does, by looking for the
+    # nearest .git entry (a directory, or a file for a linked worktree or
+    # submodule), which only costs a few stat calls on a registry hit.
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            repo = _git_repositories.get(candidate)
+            if repo is not None:
+                return repo
+            break
+    repo = GitRepository(path)
+    _git_repositories[repo.working_tree_dir.resolve()] = repo
+    return repo
+
+
+_HISTORY_INDEX_CACHE_VERSION = 2
+"""Format version of the persisted history index. Bump it whenever the
+format changes so that older caches are discarded rather than misread.
+
+Version 2 maps each path to a commit SHA, with each commit's date stored
+once in a separate table.
+"""
+
+
+def _read_history_index_cache(
+    cache_path: Path,
+) -> tuple[str, dict[str, LastCommit]] | None:
+    """Read a persisted history index.
+
+    Returns the ``HEAD`` SHA the index was computed for and the index
+    itself, or `None` if the file is missing, unreadable, or in a different
+    format version (the caller then rebuilds the index from scratch).
+    """
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        if data["version"] != _HISTORY_INDEX_CACHE_VERSION:
+            return None
+        head = data["head"]
+        commits = {
+            sha: LastCommit(sha=sha, date=datetime.fromisoformat(iso))
+            for sha, iso in data["commits"].items()
+        }
+        index = {path: commits[sha] for path, sha in data["paths"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    if not isinstance(head, str):
+        return None
+    return head, index
+
+
+def _write_history_index_cache(
+    cache_path: Path,
+    head: str,
+    index: dict[str, LastCommit],
+    *,
+    raise_errors: bool = False,
+) -> None:
+    """Persist a history index for the ``HEAD`` commit ``head``.
+
+    The file is written to a temporary file and atomically renamed into
+    place, so a concurrent build never reads a partially-written cache.
+    Unless ``raise_errors`` is set, writing is best-effort: a filesystem
+    error only means the next build scans the history again.
+    """
+    data = {
+        "version": _HISTORY_INDEX_CACHE_VERSION,
+        "head": head,
+        "commits": {
+            commit.sha: commit.date.isoformat() for commit in index.values()
+        },
+        "paths": {path: commit.sha for path, commit in index.items()},
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            Path(tmp_name).replace(cache_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    except OSError:
+        if raise_errors:
+            raise
 
 
 def extend_excludes_for_non_index_source(
@@ -73,9 +73,21 @@ __all__ = [
     "intersphinx_mapping",
     "intersphinx_timeout",
     "intersphinx_cache_limit",
+    "documenteer_intersphinx_usage_report",
+    "documenteer_intersphinx_usage_threshold",
     "documenteer_intersphinx_cache_use_service",
     "documenteer_intersphinx_cache_service_url",
     "documenteer_intersphinx_cache_disk_cache_ttl",
+    "documenteer_intersphinx_cache_concurrency",
+    "documenteer_intersphinx_cache_circuit_breaker_threshold",
+    "documenteer_intersphinx_cache_report_summary",
+    "documenteer_intersphinx_cache_direct",
+    "documenteer_intersphinx_cache_stale_while_revalidate",
+    "documenteer_intersphinx_cache_lockfile",
+    "documenteer_intersphinx_cache_trim",
+    "documenteer_intersphinx_cache_trim_keep",
+    "documenteer_intersphinx_cache_shared_dir",
+    "documenteer_intersphinx_cache_shared_max_size",
     # LINKCHECK
     "linkcheck_retries",
     "linkcheck_ignore",
@@ -91,7 +103,8 @@ __all__ = [
     "html_context",
     "html_theme_options",
     "documenteer_last_modified_enabled",
-    "git_last_updated_metatags",
+    "documenteer_last_modified_sitemap",
+    "documenteer_last_modified_manifest",
     "html_sidebars",
     "html_title",
     "html_short_title",
@@ -102,7 +115,6 @@ __all__ = [
     "html_show_sourcelink",
     "favicons",
     "sitemap_url_scheme",
-    "sitemap_show_lastmod",
     "sitemap_excludes",
     # API
     "automodapi_toctreedirnm",
@@ -265,6 +277,10 @@ intersphinx_timeout = 10.0  # seconds
 
 intersphinx_cache_limit = 5  # days
 
+# Intersphinx usage report settings for documenteer.ext.intersphinxusage
+documenteer_intersphinx_usage_report = _conf.intersphinx_usage_report
+documenteer_intersphinx_usage_threshold = _conf.intersphinx_usage_threshold
+
 # Ook intersphinx inventory cache settings for
 # documenteer.ext.intersphinxcache
 documenteer_intersphinx_cache_use_service = _conf.intersphinx_cache_use_service
@@ -272,6 +288,24 @@ documenteer_intersphinx_cache_service_url = _conf.intersphinx_cache_service_url
 documenteer_intersphinx_cache_disk_cache_ttl = (
     _conf.intersphinx_cache_disk_cache_ttl
 )
+documenteer_intersphinx_cache_concurrency = _conf.intersphinx_cache_concurrency
+documenteer_intersphinx_cache_circuit_breaker_threshold = (
+    _conf.intersphinx_cache_circuit_breaker_threshold
+)
+documenteer_intersphinx_cache_report_summary = (
+    _conf.intersphinx_cache_report_summary
+)
+documenteer_intersphinx_cache_direct = _conf.intersphinx_cache_direct
+documenteer_intersphinx_cache_stale_while_revalidate = (
+    _conf.intersphinx_cache_stale_while_revalidate
+)
+documenteer_intersphinx_cache_lockfile = _conf.intersphinx_cache_lockfile
+documenteer_intersphinx_cache_trim = _conf.intersphinx_cache_trim
+documenteer_intersphinx_cache_trim_keep = _conf.intersphinx_cache_trim_keep
+documenteer_intersphinx_cache_shared_dir = _conf.intersphinx_cache_shared_dir
+documenteer_intersphinx_cache_shared_max_size = (
+    _conf.intersphinx_cache_shared_max_size
+)
 
 
 # ============================================================================
@@ -353,10 +387,16 @@ html_theme_options = {
 # last-updated.html component override.
 documenteer_last_modified_enabled = _conf.show_last_updated
 
-# documenteer.ext.lastmodified now emits article:modified_time itself, so
-# turn off the duplicate tag from sphinx-last-updated-by-git (auto-loaded by
-# sphinx-sitemap, which still uses it for sitemap <lastmod>).
-git_last_updated_metatags = False
+# The same Git dates supply the sitemap's <lastmod> entries. Setting
+# sitemap_show_lastmod here would make sphinx-sitemap load
+# sphinx-last-updated-by-git, which scans the Git history a second time;
+# documenteer.ext.lastmodified turns it on once extensions are loaded instead.
+documenteer_last_modified_sitemap = True
+
+# Write last-modified.json (each page's URL, last-modified timestamp, and
+# commit SHA) to the output directory so that deployment and indexing tools
+# can find the pages that changed without re-parsing the whole site.
+documenteer_last_modified_manifest = True
 
 if _conf.github_url:
     if not isinstance(html_theme_options["icon_links"], list):
@@ -442,7 +482,6 @@ html_show_sourcelink = False
 
 # Sitemap generation
 sitemap_url_scheme = "{link}"
-sitemap_show_lastmod = True
 sitemap_excludes = [
     "search.html",
 ]
@@ -48,7 +48,7 @@ from sphinx.config import Config
 from sphinx.util import logging
 from sphinx.util.typing import ExtensionMetadata
 
-from ..conf._utils import GitRepository
+from ..conf._utils import get_git_repository
 from ..version import __version__
 
 __all__ = ["set_doc_path", "setup"]
@@ -100,7 +100,7 @@ def set_doc_path(app: Sphinx, config: Config) -> None:
         return
 
     try:
-        repo = GitRepository(Path(app.srcdir))
+        repo = get_git_repository(Path(app.srcdir))
     except (git.InvalidGitRepositoryError, git.NoSuchPathError):
         # Deliberately info, not warning: Rubin projects build with ``-W``, and
         # building outside a Git checkout is legitimate, so a warning would
@@ -34,8 +34,64 @@ Ook that returns no ``ETag`` header the behavior is exactly the pre-ETag
 path — a full download with no sidecar — and a ``200`` without an ETag clears
 any stale sidecar.
 
-The extension is a complete no-op when ``OOK_TOKEN`` is unset (forks, local
-builds) or when disabled via ``documenteer_intersphinx_cache_use_service``.
+Entries that need a request to Ook are revalidated together in a single
+request to Ook's batch endpoint, so a warm build whose inventories are all
+unchanged costs one round-trip. Against an Ook without the batch endpoint
+(or when the batch request fails), they are revalidated individually and
+concurrently on a bounded thread pool
+(``documenteer_intersphinx_cache_concurrency`` workers, default 8), so a
+build that maps many projects waits roughly as long as its slowest inventory
+rather than the sum of every round-trip. Either way, the mapping is rewritten
+on the main thread once every fetch has finished, in mapping order.
+
+In stale-while-revalidate mode
+(``documenteer_intersphinx_cache_stale_while_revalidate``), an expired
+inventory that is on disk is mapped immediately and revalidated on a
+background thread instead, so the build never waits on Ook when it has a
+cached copy. The refreshed file replaces the cached one atomically; if it
+arrives before intersphinx loads its inventories it is used by this build,
+and otherwise by the next one. The build waits for the thread when it
+finishes (and, in a parallel build, before forking its reader processes).
+
+Optionally, inventories are also kept in a content-addressed cache shared
+by every build on the machine (``documenteer_intersphinx_cache_shared_dir``,
+or the ``DOCUMENTEER_INTERSPHINX_CACHE_DIR`` environment variable). A build
+links each inventory from the shared cache into its build directory (a hard
+link, or a symbolic link across file systems), so a fresh checkout or a
+clean build starts from the inventories other builds already fetched and
+only revalidates them. The shared cache is kept under
+``documenteer_intersphinx_cache_shared_max_size`` megabytes by evicting the
+least recently used inventories.
+
+Parsing a large inventory (decompressing it and parsing each line) is
+noticeable work that stock intersphinx repeats on every build, because it
+always re-reads local inventory files. For each prefetched inventory, the
+parsed result is therefore saved next to the cached ``.inv`` file as a
+``<name>-<hash>.inv.parsed`` sidecar, keyed by the SHA-256 digest of the
+inventory bytes, the target URI, and the Sphinx version; a sidecar that
+doesn't match is deleted. While a build has prefetched inventories, the
+extension wraps intersphinx's internal parsing step so that later builds
+load a valid sidecar directly, and parse (and rewrite the sidecar) only when
+the inventory changes. The parsing step is separate from Sphinx 8.2, so
+earlier versions parse every inventory as usual. With
+``documenteer_intersphinx_cache_trim``, the parsed inventories are also
+trimmed to the objects the project links to (see
+``documenteer.ext.intersphinxtrim``).
+
+When ``OOK_TOKEN`` is unset (forks, local builds), the extension is a
+complete no-op, as it is when disabled via
+``documenteer_intersphinx_cache_use_service``, unless direct mode is enabled
+with ``documenteer_intersphinx_cache_direct = True``. In direct mode, it
+fetches each inventory straight from its origin into the same cache, with
+the same TTL fast path, concurrency, and shared cache, and revalidates
+cached copies with conditional requests to the origin (``If-None-Match``
+with the origin's ETag, and ``If-Modified-Since`` with its
+``Last-Modified`` date, persisted next to the ``.inv`` file as
+``<name>-<hash>.inv.last-modified``). The requests to origins use
+intersphinx's ``intersphinx_timeout``, ``tls_verify``, ``tls_cacerts``, and
+``user_agent`` settings. An origin that can't be reached isn't left for
+intersphinx to try again: the entry is mapped to its expired on-disk copy,
+or removed from the mapping for the build.
 Any per-inventory client error (unauthorized, unreachable, 5xx, 404,
 timeout) leaves that mapping entry untouched so stock intersphinx fetches
 the origin directly, and reports the fallback at INFO level naming the
@@ -44,37 +100,92 @@ inventory. INFO (not WARNING) is deliberate: Rubin docs builds run with
 warning would fail the build, defeating the guarantee that an Ook outage
 can never make a build worse than today. (This matches the linkcheck
 service, which likewise logs service-side conditions at INFO.)
+
+Each request that finds Ook unreachable or failing pays the session's
+retries and timeout, so during an outage a circuit breaker bounds the cost:
+after ``documenteer_intersphinx_cache_circuit_breaker_threshold``
+consecutive such failures (default 3), the remaining entries skip Ook. An
+entry with an expired on-disk copy then uses it, and any other entry falls
+back to the origin.
+
+When the build finishes, the extension writes a report of the prefetch,
+``prefetch-report.json``, to the prefetched inventory directory. For each
+prefetched mapping entry it records the outcome (reused within the TTL,
+revalidated with a 304, downloaded, used as an expired copy, mapped from the
+lockfile, or fallen back to the origin), the inventory bytes downloaded, and
+the wall time and retries of its request to Ook, so the cost of the
+prefetch can be tracked across builds. With
+``documenteer_intersphinx_cache_report_summary``, the report is also
+summarized as a table in the build log.
 """
 
 from __future__ import annotations
 
 import contextlib
 import hashlib
+import json
 import os
+import pickle
 import posixpath
 import re
+import threading
 import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, replace
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import sphinx
+from pydantic import ValidationError
+from sphinx.ext.intersphinx import _load as intersphinx_load
 from sphinx.util import logging
 
+from .._requestsutils import requests_retry_session
 from ..storage.intersphinxcacheclient import (
     DEFAULT_BASE_URL,
     TOKEN_ENV_VAR,
+    IntersphinxCacheCircuitOpenError,
     IntersphinxCacheClient,
     IntersphinxCacheError,
+    InventoryFetchResult,
+    InventoryRequest,
+)
+from ..storage.inventorycache import (
+    DEFAULT_MAX_SIZE,
+    SharedInventoryCache,
+    default_shared_cache_dir,
+    resolve_shared_cache_dir,
+    write_file_atomically,
+)
+from ..storage.inventorylock import InventoryLockfile, LockedInventory
+from ..storage.origininventoryclient import (
+    OriginInventoryClient,
+    OriginInventoryError,
+    OriginInventoryRequest,
 )
 from ..version import __version__
+from .intersphinxtrim import trim_inventory
 
 if TYPE_CHECKING:
     from sphinx.application import Sphinx
     from sphinx.config import Config
+    from sphinx.environment import BuildEnvironment
     from sphinx.util.typing import ExtensionMetadata
 
 # TOKEN_ENV_VAR is re-exported from the storage client so the extension's
 # public surface is unchanged while the constant has a single definition.
-__all__ = ["TOKEN_ENV_VAR", "setup"]
+__all__ = [
+    "CACHE_DIRNAME",
+    "REPORT_FILENAME",
+    "TOKEN_ENV_VAR",
+    "PrefetchSettings",
+    "prefetch_inventories",
+    "resolve_prefetch_target",
+    "setup",
+    "wait_for_background_revalidations",
+]
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +199,277 @@ inventories. Dot-prefixed so it is excluded from a published site even when
 the doctree cache defaults to ``outdir/.doctrees`` (a build without ``-d``),
 mirroring how ``.doctrees`` is conventionally excluded."""
 
+REPORT_FILENAME = "prefetch-report.json"
+"""Name of the prefetch report, in the prefetched inventory directory."""
+
+_BATCH_PROBE_FILENAME = "batch-unsupported.json"
+"""Name of the marker, in the prefetched inventory directory, recording that
+the intersphinx cache service has no batch endpoint."""
+
+_BATCH_PROBE_TTL = 86400
+"""Seconds for which a recorded missing batch endpoint is trusted before the
+endpoint is probed again (so a service upgrade is picked up)."""
+
+DEFAULT_CONCURRENCY = 8
+"""Default maximum number of inventories revalidated with Ook at once."""
+
+DEFAULT_DISK_CACHE_TTL = 600
+"""Default seconds an on-disk inventory is reused without contacting Ook."""
+
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 3
+"""Default number of consecutive failed requests to Ook after which the
+remaining inventories skip Ook."""
+
+DEFAULT_ORIGIN_TIMEOUT = 10.0
+"""Default seconds to wait for an origin in direct mode, when
+``intersphinx_timeout`` is unset (the user guide's ``intersphinx_timeout``).
+"""
+
+_UNAVAILABLE = ""
+"""The local path of a mapping entry whose inventory is unavailable for this
+build (see `_store_inventory`); the entry is removed from the mapping."""
+
+
+@dataclass(frozen=True)
+class PrefetchSettings:
+    """Settings for prefetching intersphinx inventories from Ook.
+
+    These are the ``documenteer_intersphinx_cache_*`` configuration values
+    (see `from_config`), so that inventories can also be prefetched outside a
+    Sphinx build (see `prefetch_inventories`).
+    """
+
+    service_url: str = DEFAULT_BASE_URL
+    """Base URL of the Ook API."""
+
+    disk_cache_ttl: int = DEFAULT_DISK_CACHE_TTL
+    """Seconds an on-disk inventory is reused without contacting Ook (``0``
+    disables the fast path).
+    """
+
+    concurrency: int = DEFAULT_CONCURRENCY
+    """Maximum number of inventories revalidated individually at once."""
+
+    stale_while_revalidate: bool = False
+    """Whether expired on-disk inventories are revalidated in the
+    background.
+    """
+
+    shared_dir: Path | None = None
+    """Directory of the shared inventory cache, or `None` if it's disabled.
+    """
+
+    shared_max_size: int = DEFAULT_MAX_SIZE
+    """Size limit of the shared inventory cache, in bytes."""
+
+    circuit_breaker_threshold: int = DEFAULT_CIRCUIT_BREAKER_THRESHOLD
+    """Number of consecutive requests that find Ook unreachable or failing
+    after which the remaining inventories skip Ook (``0`` disables the
+    circuit breaker).
+    """
+
+    direct: bool = False
+    """Whether inventories are fetched directly from their origins instead
+    of from Ook.
+    """
+
+    origin_timeout: float | None = DEFAULT_ORIGIN_TIMEOUT
+    """Seconds to wait for an origin in direct mode (``intersphinx_timeout``),
+    or `None` to wait indefinitely.
+    """
+
+    tls_verify: bool = True
+    """Whether origins' TLS certificates are verified in direct mode
+    (``tls_verify``).
+    """
+
+    tls_cacerts: str | dict[str, str] | None = None
+    """CA certificates that origins are verified with in direct mode
+    (``tls_cacerts``).
+    """
+
+    user_agent: str | None = None
+    """The ``User-Agent`` of requests to origins in direct mode
+    (``user_agent``), or `None` for the default.
+    """
+
+    @classmethod
+    def from_config(cls, app: Sphinx, config: Config) -> PrefetchSettings:
+        """Create the settings from a Sphinx configuration.
+
+        A relative shared cache directory is relative to the configuration
+        directory, and the ``DOCUMENTEER_INTERSPHINX_CACHE_DIR`` environment
+        variable overrides it (see `resolve_shared_cache_dir`). Requests to
+        origins in direct mode use the same ``intersphinx_timeout``,
+        ``tls_verify``, ``tls_cacerts``, and ``user_agent`` settings as
+        intersphinx.
+        """
+        timeout = getattr(config, "intersphinx_timeout", None)
+        return cls(
+            service_url=config.documenteer_intersphinx_cache_service_url,
+            disk_cache_ttl=config.documenteer_intersphinx_cache_disk_cache_ttl,
+            # A non-positive concurrency (only possible from conf.py;
+            # documenteer.toml validates it) runs any individual fetches one
+            # at a time.
+            concurrency=max(
+                1, config.documenteer_intersphinx_cache_concurrency
+            ),
+            stale_while_revalidate=(
+                config.documenteer_intersphinx_cache_stale_while_revalidate
+            ),
+            shared_dir=resolve_shared_cache_dir(
+                config.documenteer_intersphinx_cache_shared_dir,
+                base=Path(app.confdir),
+            ),
+            shared_max_size=(
+                config.documenteer_intersphinx_cache_shared_max_size
+                * 1024
+                * 1024
+            ),
+            # A negative threshold (only possible from conf.py) disables the
+            # circuit breaker.
+            circuit_breaker_threshold=max(
+                0,
+                config.documenteer_intersphinx_cache_circuit_breaker_threshold,
+            ),
+            origin_timeout=(
+                timeout if timeout is not None else DEFAULT_ORIGIN_TIMEOUT
+            ),
+            tls_verify=config.tls_verify,
+            tls_cacerts=config.tls_cacerts,
+            user_agent=config.user_agent or None,
+        )
+
+
+@dataclass
+class _InventoryMetrics:
+    """The outcome and cost of prefetching one mapping entry's inventory."""
+
+    url: str
+    """The origin inventory URL."""
+
+    outcome: str
+    """How the inventory was prefetched: ``ttl_hit`` (reused without
+    contacting Ook), ``not_modified`` (revalidated with a 304),
+    ``downloaded``, ``stale`` (an expired on-disk copy was used instead),
+    ``locked`` (mapped from the lockfile), ``fallback`` (left to
+    intersphinx to fetch from the origin), or ``unavailable`` (an
+    unreachable origin in direct mode, removed from the mapping).
+    """
+
+    bytes: int = 0
+    """Size of the downloaded inventory."""
+
+    elapsed: float = 0.0
+    """Seconds the request to Ook took, including its retries."""
+
+    retries: int = 0
+    """Number of times the request to Ook was retried."""
+
+    background: bool = False
+    """Whether the inventory was revalidated in the background."""
+
+
+class _PrefetchReport:
+    """Collects the metrics of each prefetched inventory for the prefetch
+    report.
+    """
+
+    def __init__(self) -> None:
+        self.inventories: dict[str, _InventoryMetrics] = {}
+        # Seconds the build waited for the prefetch.
+        self.elapsed = 0.0
+        # Whether the inventories were fetched from their origins.
+        self.direct = False
+
+    def clear(self) -> None:
+        """Forget the inventories of a previous build."""
+        self.inventories = {}
+        self.elapsed = 0.0
+        self.direct = False
+
+    def record(self, name: str, metrics: _InventoryMetrics) -> None:
+        """Record the metrics of a mapping entry's inventory.
+
+        This is called from the background revalidation thread as well as
+        the main thread.
+        """
+        self.inventories[name] = metrics
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the report as a JSON-serializable dictionary."""
+        inventories = dict(sorted(self.inventories.items()))
+        outcomes = Counter(m.outcome for m in inventories.values())
+        return {
+            "documenteer_version": __version__,
+            "date": datetime.now(tz=UTC).isoformat(timespec="seconds"),
+            "elapsed": round(self.elapsed, 3),
+            "source": "origin" if self.direct else "ook",
+            "totals": {
+                "inventories": len(inventories),
+                "bytes": sum(m.bytes for m in inventories.values()),
+                "retries": sum(m.retries for m in inventories.values()),
+                "outcomes": dict(sorted(outcomes.items())),
+            },
+            "inventories": {
+                name: asdict(metrics) | {"elapsed": round(metrics.elapsed, 3)}
+                for name, metrics in inventories.items()
+            },
+        }
+
+    def format_table(self) -> str:
+        """Return a plain-text table that summarizes the report."""
+        rows = [("inventory", "outcome", "bytes", "time (s)", "retries")]
+        for name, metrics in sorted(self.inventories.items()):
+            outcome = metrics.outcome
+            if metrics.background:
+                outcome += " (background)"
+            rows.append(
+                (
+                    name,
+                    outcome,
+                    str(metrics.bytes),
+                    f"{metrics.elapsed:.3f}",
+                    str(metrics.retries),
+                )
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(5)]
+        return "\n".join(
+            "  ".join(
+                # Left-align the text columns and right-align the numbers.
+                cell.ljust(width) if i < 2 else cell.rjust(width)
+                for i, (cell, width) in enumerate(
+                    zip(row, widths, strict=True)
+                )
+            ).rstrip()
+            for row in rows
+        )
+
+
+_prefetch_report = _PrefetchReport()
+"""Metrics of the inventories prefetched for the current build."""
+
+_PARSED_SIDECAR_FORMAT = 1
+"""Version of the parsed-inventory sidecar format."""
+
+_intersphinx_load_inventory: Callable[..., Any] | None = getattr(
+    intersphinx_load, "_load_inventory", None
+)
+"""Intersphinx's own inventory parser, wrapped by
+`_load_inventory_with_sidecar` (`None` if this Sphinx version has no
+separate parsing step)."""
+
+_prefetched_inventory_paths: dict[str, Path] = {}
+"""Cached inventory files of prefetched mapping entries, by target URI."""
+
+_Entry = tuple[str, str, str, Path]
+"""A prefetched mapping entry, as ``(name, target_uri, origin_url,
+inv_path)``."""
+
+_background_revalidations: list[threading.Thread] = []
+"""Threads revalidating inventories in the background (see
+`_revalidate_in_background`)."""
+
 _UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
 """Characters not allowed in a generated inventory filename stem."""
 
@@ -131,6 +513,32 @@ def _resolve_origin_inventory_url(
     return None
 
 
+def resolve_prefetch_target(value: object) -> tuple[str, str] | None:
+    """Return the target URI and origin inventory URL of an
+    ``intersphinx_mapping`` entry, or `None` if the entry isn't prefetched.
+
+    An unexpected entry shape is left for intersphinx to validate.
+
+    Parameters
+    ----------
+    value
+        The value of a mapping entry, as ``(target_uri, location)``.
+
+    Returns
+    -------
+    tuple or None
+        The target URI and the origin ``objects.inv`` URL, or `None` for a
+        local target or inventory location.
+    """
+    if not isinstance(value, (tuple, list)) or len(value) != 2:
+        return None
+    target_uri, inv_location = value
+    origin_url = _resolve_origin_inventory_url(target_uri, inv_location)
+    if origin_url is None:
+        return None
+    return target_uri, origin_url
+
+
 def _is_cache_fresh(path: Path, ttl: int) -> bool:
     """Return whether a cached inventory file exists and its mtime is younger
     than ``ttl`` seconds.
@@ -145,6 +553,26 @@ def _is_cache_fresh(path: Path, ttl: int) -> bool:
     return (time.time() - mtime) < ttl
 
 
+def _reuse_fresh_inventory(name: str, inv_path: Path, ttl: int) -> bool:
+    """Return whether a mapping entry's on-disk inventory is reused as-is
+    (the TTL fast path), without contacting Ook at all.
+
+    The TTL governs only this client-to-Ook hop; whether Ook's own cached
+    copy is stale relative to the origin remains Ook's concern. A TTL of
+    ``0`` disables the fast path.
+    """
+    if ttl <= 0 or not _is_cache_fresh(inv_path, ttl):
+        return False
+    # Reported at info level so build logs distinguish a cache hit from the
+    # extension not running at all.
+    logger.info(
+        "Reusing the on-disk intersphinx inventory for %r "
+        "(younger than disk_cache_ttl).",
+        name,
+    )
+    return True
+
+
 def _etag_sidecar_path(inv_path: Path) -> Path:
     """Return the ETag sidecar path for a cached inventory file.
 
@@ -186,46 +614,190 @@ def _store_etag(etag_path: Path, etag: str | None) -> None:
         pass
 
 
-def _revalidate_inventory(
-    client: IntersphinxCacheClient,
+def _last_modified_sidecar_path(inv_path: Path) -> Path:
+    """Return the ``Last-Modified`` sidecar path for a cached inventory file
+    (``<name>-<hash>.inv.last-modified``).
+
+    In direct mode, the sidecar holds the ``Last-Modified`` date the origin
+    returned, used for ``If-Modified-Since`` revalidation. It's read and
+    written like the ETag sidecar.
+    """
+    return inv_path.with_name(inv_path.name + os.extsep + "last-modified")
+
+
+def _request_validator(inv_path: Path, sidecar_path: Path) -> str | None:
+    """Return the ETag (or ``Last-Modified`` date) to revalidate a cached
+    inventory with, or `None`.
+
+    A validator is sent (as ``If-None-Match`` or ``If-Modified-Since``) only
+    when both a cached inventory and its sidecar exist, so a ``304`` can
+    safely reuse the on-disk bytes.
+    """
+    if inv_path.is_file() and sidecar_path.is_file():
+        return _read_etag(sidecar_path)
+    return None
+
+
+def _write_inventory(
+    inv_path: Path,
+    content: bytes | None,
+    origin_url: str,
+    etag: str | None,
+    shared: SharedInventoryCache | None,
+) -> None:
+    """Write a downloaded inventory to its build-tree cache file.
+
+    ``content`` is `None` if the client already streamed the inventory to
+    the file. With a shared cache, the inventory is stored there and linked
+    into the build tree. If the shared cache can't be written, the inventory
+    is written to the build tree directly, so a read-only or full shared
+    cache never forces a fallback to the origin.
+
+    Raises
+    ------
+    OSError
+        Raised if the build-tree file can't be written.
+    """
+    if shared is not None:
+        try:
+            shared.link(
+                shared.store(origin_url, content, etag)
+                if content is not None
+                else shared.store_file(origin_url, inv_path, etag),
+                inv_path,
+            )
+        except OSError as e:
+            logger.info(
+                "Could not add the intersphinx inventory from %s to the "
+                "shared cache at %s (%s).",
+                origin_url,
+                shared.root,
+                e,
+            )
+        else:
+            return
+    # Written atomically, so intersphinx never reads a partial inventory
+    # (a background revalidation can replace the file while the build
+    # runs), and a file that is a hard link to a shared blob is replaced
+    # rather than overwritten through it.
+    if content is not None:
+        write_file_atomically(inv_path, content)
+
+
+def _use_shared_cache(
+    shared: SharedInventoryCache,
+    name: str,
+    origin_url: str,
+    inv_path: Path,
+) -> None:
+    """Mark a mapping entry's inventory as used in the shared cache, and
+    link it into the build tree (with its ETag sidecar) if the build tree
+    doesn't have it yet.
+
+    The entry then follows the usual TTL and revalidation path as if the
+    build had fetched the inventory itself.
+    """
+    inventory = shared.lookup(origin_url)
+    if inventory is None or inv_path.is_file():
+        return
+    try:
+        shared.link(inventory.path, inv_path)
+    except OSError:
+        return
+    _store_etag(_etag_sidecar_path(inv_path), inventory.etag)
+    logger.info(
+        "Linked the intersphinx inventory for %r from the shared cache.",
+        name,
+    )
+
+
+def _open_shared_cache(
+    settings: PrefetchSettings,
+) -> SharedInventoryCache | None:
+    """Open the shared inventory cache, or return `None` if it's disabled."""
+    if settings.shared_dir is None:
+        return None
+    return SharedInventoryCache(
+        settings.shared_dir, max_size=settings.shared_max_size
+    )
+
+
+def _store_inventory(
+    result: InventoryFetchResult | IntersphinxCacheError,
     name: str,
     origin_url: str,
     inv_path: Path,
     etag_path: Path,
+    request_validator: str | None,
+    shared: SharedInventoryCache | None = None,
+    *,
+    source: str = "Ook",
 ) -> str | None:
-    """Fetch or revalidate one inventory and return the local path to map to.
+    """Apply the outcome of fetching or revalidating one inventory and return
+    the local path to map to.
 
-    Sends ``If-None-Match`` only when both a cached inventory and its ETag
-    sidecar exist, so a ``304`` can safely reuse the on-disk bytes. Returns
-    the local file path to rewrite the mapping entry to, or `None` to leave
-    the entry untouched (a client error or a cache write failure), so stock
-    intersphinx fetches the origin directly and the build is never worse than
-    without the service.
-    """
-    request_etag: str | None = None
-    if inv_path.is_file() and etag_path.is_file():
-        request_etag = _read_etag(etag_path)
+    Returns the local file path to rewrite the mapping entry to, or `None`
+    to leave the entry untouched (a client error or a cache write failure),
+    so stock intersphinx fetches the origin directly and the build is never
+    worse than without the service. An entry that skipped Ook because the
+    client's circuit breaker opened is mapped to its expired on-disk copy,
+    if it has one. So is an entry whose origin can't be reached in direct
+    mode, since intersphinx would only try the same origin again; without
+    an on-disk copy, `_UNAVAILABLE` is returned so the entry is removed.
 
-    try:
-        result = client.get_inventory(origin_url, etag=request_etag)
-    except IntersphinxCacheError as e:
+    ``request_validator`` is the ETag (or, in direct mode, the
+    ``Last-Modified`` date) that the request was conditional on, if any,
+    and ``source`` names where the inventory was fetched from in log
+    messages.
+    """
+    if isinstance(result, IntersphinxCacheCircuitOpenError) and (
+        inv_path.is_file()
+    ):
+        # Ook is failing, so an expired on-disk copy is better than waiting
+        # on the origin. Its mtime is left alone, so the next build
+        # revalidates it.
+        logger.info(
+            "Skipped Ook for the intersphinx inventory for %r (%s); using "
+            "the expired on-disk copy.",
+            name,
+            result,
+        )
+        return str(inv_path)
+    if isinstance(result, OriginInventoryError) and result.unreachable:
+        if inv_path.is_file():
+            logger.info(
+                "Could not reach the origin of the intersphinx inventory for "
+                "%r (%s); using the expired on-disk copy.",
+                name,
+                result,
+            )
+            return str(inv_path)
+        logger.info(
+            "Could not reach the origin of the intersphinx inventory for %r "
+            "(%s); the inventory is unavailable in this build.",
+            name,
+            result,
+        )
+        return _UNAVAILABLE
+    if isinstance(result, IntersphinxCacheError):
         # Reported at info (not warning) level so a warnings-as-errors
         # (``-W``) build does not fail on graceful service degradation (e.g.
         # Ook returning 404 for a not-yet-deployed endpoint), matching the
         # linkcheck-service precedent in ``linkcheckservice.py``.
         logger.info(
             "Could not prefetch the intersphinx inventory for %r from "
-            "Ook (%s); falling back to a direct fetch of %s.",
+            "%s (%s); falling back to a direct fetch of %s.",
             name,
-            e,
+            source,
+            result,
             origin_url,
         )
         return None
 
     if result.not_modified:
         # 304 Not Modified: the on-disk bytes are current and no body was
-        # transferred. This is only meaningful when we actually sent an
-        # If-None-Match (request_etag is not None) and the cached file is
+        # transferred. This is only meaningful when we actually sent a
+        # validator (request_validator is not None) and the cached file is
         # still present. A misbehaving server that answers 304 to an
         # unconditional request would otherwise map the entry to a
         # possibly-nonexistent local file, which intersphinx would then warn
@@ -233,11 +805,12 @@ def _revalidate_inventory(
         # build worse than not using the service at all. Treat that as a
         # fallback: leave the entry untouched so stock intersphinx fetches
         # the origin directly.
-        if request_etag is None or not inv_path.is_file():
+        if request_validator is None or not inv_path.is_file():
             logger.info(
-                "Ook returned 304 Not Modified for %r without a usable "
-                "cached inventory (no ETag was sent or the cache file is "
-                "missing); falling back to a direct fetch of %s.",
+                "Got 304 Not Modified from %s for %r without a usable "
+                "cached inventory (no validator was sent or the cache file "
+                "is missing); falling back to a direct fetch of %s.",
+                source,
                 name,
                 origin_url,
             )
@@ -249,20 +822,22 @@ def _revalidate_inventory(
         with contextlib.suppress(OSError):
             os.utime(inv_path, None)
         logger.info(
-            "The intersphinx inventory for %r is unchanged on Ook "
+            "The intersphinx inventory for %r is unchanged on %s "
             "(HTTP 304 Not Modified); reusing the on-disk copy.",
             name,
+            source,
         )
         return str(inv_path)
 
     content = result.content
-    if content is None:
-        # Defensive: a non-304 response always carries bytes. Treat an empty
-        # payload as a fallback rather than writing a truncated inventory.
+    if content is None and result.path != inv_path:
+        # Defensive: a non-304 response always carries bytes, or was streamed
+        # to the cache file. Treat an empty payload as a fallback rather
+        # than writing a truncated inventory.
         return None
     try:
-        inv_path.parent.mkdir(parents=True, exist_ok=True)
-        inv_path.write_bytes(content)
+        size = len(content) if content is not None else inv_path.stat().st_size
+        _write_inventory(inv_path, content, origin_url, result.etag, shared)
     except OSError as e:
         # A filesystem error writing the cache leaves this entry untouched;
         # reported at info level for the same warnings-as-errors reason.
@@ -279,37 +854,613 @@ def _revalidate_inventory(
     # ETag, or clear any stale sidecar when the server sent none (older-server
     # graceful degradation).
     _store_etag(etag_path, result.etag)
+    # The Last-Modified sidecar is reconciled the same way (Ook sends none,
+    # so it's cleared for an inventory from Ook).
+    _store_etag(_last_modified_sidecar_path(inv_path), result.last_modified)
     # Reported at info level so build logs show that the inventory came from
     # the Ook cache (the local-path rewrite is otherwise only visible via
     # intersphinx's own "loading intersphinx inventory from ..." lines).
     logger.info(
-        "Downloaded the intersphinx inventory for %r from Ook (%d bytes).",
+        "Downloaded the intersphinx inventory for %r from %s (%d bytes).",
         name,
-        len(content),
+        source,
+        size,
     )
     return str(inv_path)
 
 
+def _fetch_inventories(
+    settings: PrefetchSettings,
+    stale: list[_Entry],
+    *,
+    shared: SharedInventoryCache | None,
+    background: bool = False,
+) -> list[str | None]:
+    """Fetch or revalidate inventories with Ook and write them to their
+    cache files.
+
+    All of the inventories are requested together (see
+    `IntersphinxCacheClient.get_inventories`), with up to
+    ``settings.concurrency`` individual requests at once if Ook can't answer
+    them in one batch. In direct mode (``settings.direct``), they're instead
+    requested from their origins, up to ``settings.concurrency`` at once
+    (see `OriginInventoryClient.get_inventories`). ``stale`` holds the
+    ``(name, target_uri, origin_url, inv_path)`` of each entry.
+
+    The outcome of each fetch is recorded for the prefetch report, as a
+    background revalidation if ``background`` is `True`.
+
+    Returns
+    -------
+    list
+        For each entry, the local file path to map it to, or `None` to leave
+        it untouched (see `_store_inventory`).
+    """
+    request_etags = [
+        _request_validator(inv_path, _etag_sidecar_path(inv_path))
+        for _, _, _, inv_path in stale
+    ]
+    results: Sequence[InventoryFetchResult | IntersphinxCacheError]
+    if settings.direct:
+        request_dates = [
+            _request_validator(inv_path, _last_modified_sidecar_path(inv_path))
+            for _, _, _, inv_path in stale
+        ]
+        results = _request_from_origins(
+            settings, stale, request_etags, request_dates
+        )
+        source = "its origin"
+        # A 304 is valid if either validator was sent.
+        validators = [
+            etag or date
+            for etag, date in zip(request_etags, request_dates, strict=True)
+        ]
+    else:
+        results = _request_from_ook(settings, stale, request_etags)
+        source = "Ook"
+        validators = request_etags
+
+    local_paths = []
+    for (name, _, origin_url, inv_path), validator, result in zip(
+        stale, validators, results, strict=True
+    ):
+        local_path = _store_inventory(
+            result,
+            name,
+            origin_url,
+            inv_path,
+            _etag_sidecar_path(inv_path),
+            validator,
+            shared,
+            source=source,
+        )
+        _prefetch_report.record(
+            name,
+            _fetch_metrics(
+                result,
+                origin_url,
+                inv_path,
+                local_path,
+                background=background,
+            ),
+        )
+        local_paths.append(local_path)
+    return local_paths
+
+
+def _request_from_ook(
+    settings: PrefetchSettings,
+    stale: list[_Entry],
+    request_etags: list[str | None],
+) -> list[InventoryFetchResult | IntersphinxCacheError]:
+    """Request inventories from Ook (see `_fetch_inventories`)."""
+    concurrency = settings.concurrency
+    marker = stale[0][3].parent / _BATCH_PROBE_FILENAME
+    batch_supported = not _batch_unsupported(marker, settings.service_url)
+    # Individual fallback fetches share one session across threads; its
+    # connection pool is sized to the worker count so concurrent requests to
+    # Ook reuse their connections.
+    client = IntersphinxCacheClient(
+        base_url=settings.service_url,
+        session=requests_retry_session(pool_maxsize=concurrency),
+        circuit_breaker_threshold=settings.circuit_breaker_threshold,
+        batch_supported=batch_supported,
+    )
+    results = client.get_inventories(
+        [
+            InventoryRequest(url=origin_url, etag=etag)
+            for (_, _, origin_url, _), etag in zip(
+                stale, request_etags, strict=True
+            )
+        ],
+        max_workers=concurrency,
+        # Inventories that are requested individually are streamed straight
+        # to their cache files.
+        destinations=[inv_path for _, _, _, inv_path in stale],
+    )
+    if batch_supported and not client.batch_supported:
+        # Later builds skip the failing batch request until the marker
+        # expires.
+        with contextlib.suppress(OSError):
+            write_file_atomically(
+                marker,
+                json.dumps({"service_url": settings.service_url}).encode(),
+            )
+    return results
+
+
+def _batch_unsupported(marker: Path, service_url: str) -> bool:
+    """Return whether an unexpired marker records that the service at
+    ``service_url`` has no batch endpoint.
+    """
+    try:
+        if time.time() - marker.stat().st_mtime > _BATCH_PROBE_TTL:
+            return False
+        data = json.loads(marker.read_bytes())
+    except (OSError, ValueError):
+        return False
+    return isinstance(data, dict) and data.get("service_url") == service_url
+
+
+def _request_from_origins(
+    settings: PrefetchSettings,
+    stale: list[_Entry],
+    request_etags: list[str | None],
+    request_dates: list[str | None],
+) -> list[InventoryFetchResult | OriginInventoryError]:
+    """Request inventories directly from their origins, in direct mode (see
+    `_fetch_inventories`).
+    """
+    concurrency = settings.concurrency
+    # The origins are different hosts, but the pool is per host, so it's
+    # sized for several projects on one host (such as Read the Docs).
+    client = OriginInventoryClient(
+        session=requests_retry_session(pool_maxsize=concurrency),
+        timeout=settings.origin_timeout,
+        tls_verify=settings.tls_verify,
+        tls_cacerts=settings.tls_cacerts,
+        user_agent=settings.user_agent,
+    )
+    return client.get_inventories(
+        [
+            OriginInventoryRequest(
+                url=origin_url, etag=etag, last_modified=date
+            )
+            for (_, _, origin_url, _), etag, date in zip(
+                stale, request_etags, request_dates, strict=True
+            )
+        ],
+        max_workers=concurrency,
+        destinations=[inv_path for _, _, _, inv_path in stale],
+    )
+
+
+def _fetch_metrics(
+    result: InventoryFetchResult | IntersphinxCacheError,
+    origin_url: str,
+    inv_path: Path,
+    local_path: str | None,
+    *,
+    background: bool,
+) -> _InventoryMetrics:
+    """Return the prefetch report metrics of a fetched inventory, given the
+    local path it was mapped to (see `_store_inventory`).
+    """
+    size = 0
+    if local_path is None:
+        # A failed background revalidation keeps the expired copy, which is
+        # already mapped.
+        outcome = "stale" if background else "fallback"
+    elif local_path == _UNAVAILABLE:
+        outcome = "unavailable"
+    elif isinstance(result, IntersphinxCacheError):
+        outcome = "stale"
+    elif result.not_modified:
+        outcome = "not_modified"
+    else:
+        outcome = "downloaded"
+        if result.content is not None:
+            size = len(result.content)
+        else:
+            with contextlib.suppress(OSError):
+                size = inv_path.stat().st_size
+    return _InventoryMetrics(
+        url=origin_url,
+        outcome=outcome,
+        bytes=size,
+        elapsed=result.elapsed,
+        retries=result.retries,
+        background=background,
+    )
+
+
+def _revalidate_inventories(
+    settings: PrefetchSettings,
+    mapping: dict,
+    stale: list[_Entry],
+    *,
+    shared: SharedInventoryCache | None,
+) -> None:
+    """Fetch or revalidate inventories with Ook (see `_fetch_inventories`)
+    and rewrite their mapping entries.
+    """
+    local_paths = _fetch_inventories(settings, stale, shared=shared)
+    # Rewrite the mapping on the main thread, in mapping order. On success
+    # only the inventory location changes (the target URI is left unchanged
+    # so resolved links still point at the upstream site). A None result
+    # leaves the entry untouched as a fallback, and an unavailable
+    # inventory's entry is removed so intersphinx doesn't fetch it either.
+    for (name, target_uri, _, _), local_path in zip(
+        stale, local_paths, strict=True
+    ):
+        if local_path == _UNAVAILABLE:
+            del mapping[name]
+        elif local_path is not None:
+            mapping[name] = (target_uri, local_path)
+
+
+def _revalidate_in_background(
+    settings: PrefetchSettings,
+    stale: list[_Entry],
+    *,
+    shared: SharedInventoryCache | None,
+) -> None:
+    """Start revalidating inventories with Ook on a background thread.
+
+    The entries are already mapped to their on-disk copies. Refreshed
+    inventories replace those files atomically, so intersphinx reads either
+    the old or the new inventory, and whichever arrives after intersphinx
+    has loaded its inventories is used by the next build. A failed
+    revalidation keeps the on-disk copy. The thread is waited for by
+    `wait_for_background_revalidations`.
+    """
+    logger.info(
+        "Revalidating %d intersphinx inventories with %s in the "
+        "background; using the on-disk copies meanwhile.",
+        len(stale),
+        "their origins" if settings.direct else "Ook",
+    )
+    thread = threading.Thread(
+        target=_fetch_inventories,
+        args=(settings, stale),
+        kwargs={"shared": shared, "background": True},
+        name="intersphinxcache-revalidate",
+        daemon=True,
+    )
+    _background_revalidations.append(thread)
+    thread.start()
+
+
+def _wait_for_background_revalidation(
+    app: Sphinx, exception: Exception | None
+) -> None:
+    """Wait for background revalidations to finish at the end of the build,
+    so the refreshed inventories are on disk for the next build.
+    """
+    wait_for_background_revalidations()
+
+
+def wait_for_background_revalidations() -> None:
+    """Wait for the inventories that `prefetch_inventories` revalidates in
+    the background (with ``settings.stale_while_revalidate``) to be
+    written.
+    """
+    while _background_revalidations:
+        _background_revalidations.pop().join()
+
+
+def _wait_before_parallel_read(
+    app: Sphinx, env: BuildEnvironment, docnames: list[str]
+) -> None:
+    """Wait for background revalidations before a parallel read phase, so
+    Sphinx doesn't fork its reader processes while a thread is running.
+
+    A serial build lets the revalidation overlap the read phase.
+    """
+    if app.parallel > 1:
+        _wait_for_background_revalidation(app, None)
+
+
+def _parsed_sidecar_path(inv_path: Path) -> Path:
+    """Return the parsed-inventory sidecar path for a cached inventory file
+    (``<name>-<hash>.inv.parsed``).
+    """
+    return inv_path.with_name(inv_path.name + os.extsep + "parsed")
+
+
+def _parsed_sidecar_key(digest: str, target_uri: str) -> dict[str, str]:
+    """Return the header that identifies what a parsed-inventory sidecar was
+    parsed from.
+
+    A sidecar is valid only for the same inventory bytes (by SHA-256
+    digest), the same target URI (which every parsed item's URI is joined
+    with), and the same Sphinx version (whose inventory item classes are
+    pickled).
+    """
+    return {
+        "format": str(_PARSED_SIDECAR_FORMAT),
+        "sphinx": sphinx.__version__,
+        "digest": digest,
+        "target_uri": target_uri,
+    }
+
+
+def _read_parsed_sidecar(path: Path, key: dict[str, str]) -> Any | None:
+    """Load a parsed inventory from its sidecar, or return `None` if the
+    sidecar is missing, unreadable, or was parsed from something else.
+
+    A sidecar that is unreadable or parsed from something else (such as
+    another Sphinx version, whose pickled classes may differ) is deleted.
+    """
+    try:
+        with path.open("rb") as f:
+            if pickle.load(f) == key:  # noqa: S301
+                return pickle.load(f)  # noqa: S301
+    except FileNotFoundError:
+        return None
+    except Exception:  # noqa: S110
+        # Any other failure (a truncated file, or classes that no longer
+        # unpickle) only means the inventory is parsed as usual.
+        pass
+    with contextlib.suppress(OSError):
+        path.unlink()
+    return None
+
+
+def _write_parsed_sidecar(
+    path: Path, key: dict[str, str], inventory: object
+) -> None:
+    """Write a parsed inventory to its sidecar (best-effort)."""
+    try:
+        content = pickle.dumps(key) + pickle.dumps(
+            inventory, protocol=pickle.HIGHEST_PROTOCOL
+        )
+        write_file_atomically(path, content)
+    except (OSError, pickle.PicklingError):
+        pass
+
+
+def _load_inventory_with_sidecar(raw_data: bytes, /, **kwargs: Any) -> Any:
+    """Parse inventory bytes for ``sphinx.ext.intersphinx``, using a parsed
+    sidecar for inventories this extension prefetched.
+
+    This wraps intersphinx's internal ``_load_inventory`` function. An
+    inventory that wasn't prefetched is parsed by intersphinx as usual. A
+    prefetched inventory may be trimmed (see `trim_inventory`).
+    """
+    target_uri = kwargs.get("target_uri")
+    load_inventory = _intersphinx_load_inventory
+    if load_inventory is None:
+        msg = "intersphinx has no inventory parser to wrap"
+        raise RuntimeError(msg)
+    inv_path = _prefetched_inventory_paths.get(str(target_uri))
+    if inv_path is None:
+        return load_inventory(raw_data, **kwargs)
+    digest = hashlib.sha256(raw_data).hexdigest()
+    key = _parsed_sidecar_key(digest, str(target_uri))
+    sidecar_path = _parsed_sidecar_path(inv_path)
+    inventory = _read_parsed_sidecar(sidecar_path, key)
+    if inventory is None:
+        inventory = load_inventory(raw_data, **kwargs)
+        _write_parsed_sidecar(sidecar_path, key, inventory)
+    return trim_inventory(
+        inventory, target_uri=str(target_uri), digest=digest, inv_path=inv_path
+    )
+
+
+def _install_parsed_inventory_hook() -> None:
+    """Install `_load_inventory_with_sidecar` as intersphinx's inventory
+    parser while this build has prefetched inventories, and restore
+    intersphinx's own parser otherwise.
+
+    On a Sphinx version whose intersphinx has no separate
+    ``_load_inventory`` step, nothing is installed and inventories are
+    parsed as usual (see `setup`).
+    """
+    if _intersphinx_load_inventory is None:
+        return
+    intersphinx_load._load_inventory = (  # noqa: SLF001
+        _load_inventory_with_sidecar
+        if _prefetched_inventory_paths
+        else _intersphinx_load_inventory
+    )
+
+
+def _register_prefetched_inventories(mapping: dict, cache_dir: Path) -> None:
+    """Record the cached inventory file for each mapping entry that was
+    rewritten to one, so the parsed-inventory hook can find its sidecar.
+    """
+    for value in mapping.values():
+        if not isinstance(value, (tuple, list)) or len(value) != 2:
+            continue
+        target_uri, location = value
+        if isinstance(location, str) and Path(location).parent == cache_dir:
+            _prefetched_inventory_paths[target_uri] = Path(location)
+
+
+def _map_cached_inventories(
+    settings: PrefetchSettings,
+    mapping: dict,
+    cache_dir: Path,
+    shared: SharedInventoryCache | None,
+) -> tuple[list[_Entry], list[_Entry]]:
+    """Map each prefetched entry whose on-disk inventory can be used now, and
+    return the entries to revalidate with Ook.
+
+    Returns
+    -------
+    tuple
+        The entries to revalidate before the build continues, and the
+        entries (already mapped to their expired on-disk copies) to
+        revalidate in the background.
+    """
+    ttl = settings.disk_cache_ttl
+
+    # Entries whose TTL has expired (or that have no cached copy), as
+    # (name, target_uri, origin_url, inv_path) tuples.
+    stale: list[_Entry] = []
+    # Entries with an expired on-disk copy to revalidate in the background,
+    # in stale-while-revalidate mode.
+    expired: list[_Entry] = []
+    swr = settings.stale_while_revalidate
+    for name, value in list(mapping.items()):
+        target = resolve_prefetch_target(value)
+        if target is None:
+            continue
+        target_uri, origin_url = target
+
+        inv_path = cache_dir / _inventory_filename(name, origin_url)
+        if shared is not None:
+            _use_shared_cache(shared, name, origin_url, inv_path)
+        if _reuse_fresh_inventory(name, inv_path, ttl):
+            # The mapping is rewritten to the local path exactly as it would
+            # be after a fresh prefetch.
+            mapping[name] = (target_uri, str(inv_path))
+            _prefetch_report.record(
+                name, _InventoryMetrics(url=origin_url, outcome="ttl_hit")
+            )
+            continue
+        if swr and inv_path.is_file():
+            # Stale-while-revalidate: map the expired on-disk inventory now
+            # and revalidate it without blocking the build.
+            mapping[name] = (target_uri, str(inv_path))
+            expired.append((name, target_uri, origin_url, inv_path))
+            continue
+        stale.append((name, target_uri, origin_url, inv_path))
+    return stale, expired
+
+
+def _file_digest(path: Path) -> str | None:
+    """Return the SHA-256 digest of a file, or `None` if it can't be
+    read.
+    """
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _link_locked_inventory(
+    store: SharedInventoryCache, pin: LockedInventory, inv_path: Path
+) -> bool:
+    """Put a pinned inventory at its build-tree cache file, and return
+    whether it's there.
+
+    An existing file with the pinned digest is kept. Otherwise the pinned
+    blob is linked from the inventory cache, after checking its digest.
+    """
+    if _file_digest(inv_path) == pin.sha256:
+        store.touch(pin.url)
+        return True
+    blob_path = store.find_blob(pin.sha256)
+    if blob_path is None or _file_digest(blob_path) != pin.sha256:
+        return False
+    try:
+        store.link(blob_path, inv_path)
+    except OSError:
+        return False
+    store.touch(pin.url)
+    return True
+
+
+def _read_lockfile(app: Sphinx, config: Config) -> InventoryLockfile | None:
+    """Read the project's intersphinx lockfile, or return `None` (with a
+    warning) if it can't be read.
+    """
+    path = Path(app.confdir) / config.documenteer_intersphinx_cache_lockfile
+    try:
+        return InventoryLockfile.read(path)
+    except OSError as e:
+        logger.warning(
+            "Could not read the intersphinx lockfile %s (%s); run "
+            "'documenteer intersphinx lock' to create it.",
+            path,
+            e,
+        )
+    except ValidationError as e:
+        logger.warning("The intersphinx lockfile %s is invalid:\n%s", path, e)
+    return None
+
+
+def _map_locked_inventories(
+    app: Sphinx,
+    config: Config,
+    settings: PrefetchSettings,
+    mapping: dict,
+    cache_dir: Path,
+) -> None:
+    """Map each entry pinned by the intersphinx lockfile to its pinned
+    inventory, without contacting Ook.
+
+    The pinned inventories are found in the shared inventory cache (in its
+    default directory if the project doesn't configure one), where
+    ``documenteer intersphinx lock`` stored them. An entry that isn't in the
+    lockfile (or is pinned to a different URL) is reported at info level and
+    prefetched as usual. An entry whose pinned inventory isn't in the cache
+    (such as one evicted by another project's build) is prefetched as well,
+    with a warning, since the build then doesn't use the pinned inventory.
+    """
+    lockfile = _read_lockfile(app, config)
+    if lockfile is None:
+        return
+    store = SharedInventoryCache(
+        settings.shared_dir
+        if settings.shared_dir is not None
+        else default_shared_cache_dir()
+    )
+    for name, value in list(mapping.items()):
+        target = resolve_prefetch_target(value)
+        if target is None:
+            continue
+        target_uri, origin_url = target
+        pin = lockfile.inventories.get(name)
+        if pin is None or pin.url != origin_url:
+            logger.info(
+                "The intersphinx inventory for %r isn't pinned in the "
+                "lockfile; run 'documenteer intersphinx lock' to pin it.",
+                name,
+            )
+            continue
+        inv_path = cache_dir / _inventory_filename(name, origin_url)
+        if not _link_locked_inventory(store, pin, inv_path):
+            # Unlike an unpinned entry, this is a warning: the build can't use
+            # the pinned inventory (for example, because another build
+            # evicted it from the shared cache), so it isn't reproducible.
+            logger.warning(
+                "The pinned intersphinx inventory for %r isn't in the "
+                "inventory cache at %s, so it's prefetched instead; run "
+                "'documenteer intersphinx lock' to fetch it.",
+                name,
+                store.root,
+            )
+            continue
+        _store_etag(_etag_sidecar_path(inv_path), pin.etag)
+        mapping[name] = (target_uri, str(inv_path))
+        _prefetch_report.record(
+            name, _InventoryMetrics(url=origin_url, outcome="locked")
+        )
+
+
 def _prefetch_inventories(app: Sphinx, config: Config) -> None:
     """Prefetch intersphinx inventories from Ook and rewrite the mapping.
 
     Runs on ``config-inited`` before ``sphinx.ext.intersphinx`` validates
-    the mapping. No-ops when the service is disabled, when ``OOK_TOKEN`` is
-    unset, or when there is nothing to prefetch.
+    the mapping. When ``OOK_TOKEN`` is unset, the inventories are fetched
+    directly from their origins instead if direct mode is enabled.
+    No-ops when the service is disabled, or when there is nothing to
+    prefetch.
     """
+    # Forget the previous build's inventories (for repeated builds in one
+    # process, such as sphinx-autobuild).
+    _prefetched_inventory_paths.clear()
+    _install_parsed_inventory_hook()
+    _prefetch_report.clear()
     if not config.documenteer_intersphinx_cache_use_service:
         return
-    if not os.getenv(TOKEN_ENV_VAR):
-        # Forks and local builds without the token fall back to stock
-        # intersphinx behavior with no attempt to contact Ook.
-        return
     mapping = config.intersphinx_mapping
     if not mapping:
         return
 
-    client = IntersphinxCacheClient(
-        base_url=config.documenteer_intersphinx_cache_service_url
-    )
     # Written under the build tree (a sibling of the doctree cache) rather
     # than app.outdir. The directory name is dot-prefixed so that even when
     # doctreedir defaults to outdir/.doctrees (a build without -d) and this
@@ -317,44 +1468,99 @@ def _prefetch_inventories(app: Sphinx, config: Config) -> None:
     # from the published HTML site, mirroring how .doctrees is excluded.
     cache_dir = Path(app.doctreedir).parent / CACHE_DIRNAME
 
-    ttl = config.documenteer_intersphinx_cache_disk_cache_ttl
+    # Locked entries are mapped without contacting Ook, so a locked build
+    # doesn't need the token. They then have local inventory locations,
+    # which the prefetch skips.
+    settings = PrefetchSettings.from_config(app, config)
+    has_token = bool(os.getenv(TOKEN_ENV_VAR))
+    if not has_token and config.documenteer_intersphinx_cache_direct:
+        # Forks and local builds without the token fetch the inventories
+        # from their origins into the same cache, so they still get the TTL
+        # fast path and conditional revalidation.
+        settings = replace(settings, direct=True)
+    start = time.monotonic()
+    if config.documenteer_intersphinx_cache_lockfile:
+        _map_locked_inventories(app, config, settings, mapping, cache_dir)
+    if has_token or settings.direct:
+        prefetch_inventories(mapping, cache_dir, settings)
+    # Otherwise (direct mode isn't enabled), the remaining entries fall back
+    # to stock intersphinx behavior with no attempt to contact Ook.
+    _prefetch_report.elapsed = time.monotonic() - start
+    _prefetch_report.direct = settings.direct
+    _register_prefetched_inventories(mapping, cache_dir)
+    _install_parsed_inventory_hook()
 
-    for name, value in list(mapping.items()):
-        if not isinstance(value, (tuple, list)) or len(value) != 2:
-            # An unexpected entry shape is left for intersphinx to validate.
-            continue
-        target_uri, inv_location = value
-        origin_url = _resolve_origin_inventory_url(target_uri, inv_location)
-        if origin_url is None:
-            continue
 
-        inv_path = cache_dir / _inventory_filename(name, origin_url)
-        etag_path = _etag_sidecar_path(inv_path)
-        if ttl > 0 and _is_cache_fresh(inv_path, ttl):
-            # TTL fast path: the on-disk inventory is younger than the TTL, so
-            # reuse it without contacting Ook at all. The mapping is rewritten
-            # to the local path exactly as it would be after a fresh prefetch.
-            # The TTL governs only this client-to-Ook hop; whether Ook's own
-            # cached copy is stale relative to the origin remains Ook's
-            # concern. Reported at info level so build logs distinguish a
-            # cache hit from the extension not running at all.
-            logger.info(
-                "Reusing the on-disk intersphinx inventory for %r "
-                "(younger than disk_cache_ttl).",
-                name,
-            )
-            mapping[name] = (target_uri, str(inv_path))
-            continue
+def prefetch_inventories(
+    mapping: dict, cache_dir: Path, settings: PrefetchSettings
+) -> None:
+    """Prefetch the inventories of intersphinx mapping entries from Ook,
+    reusing or revalidating cached copies, and rewrite the entries to the
+    local files.
 
-        # The TTL has expired (or there is no cached copy). Revalidate with
-        # Ook; on success rewrite only the inventory location (the target URI
-        # is left unchanged so resolved links still point at the upstream
-        # site). A None result leaves the entry untouched as a fallback.
-        local_path = _revalidate_inventory(
-            client, name, origin_url, inv_path, etag_path
+    Entries that aren't prefetched (local targets or inventories), and
+    entries whose inventories can't be prefetched, are left untouched. The
+    Ook token is read from the ``OOK_TOKEN`` environment variable. With
+    ``settings.direct``, the inventories are fetched from their origins
+    instead, and no token is needed.
+
+    Parameters
+    ----------
+    mapping
+        The ``intersphinx_mapping``, as ``{name: (target_uri, location)}``.
+        It's rewritten in place.
+    cache_dir
+        The directory of the prefetched inventory files: the
+        ``.documenteer_intersphinx_inventory`` directory (`CACHE_DIRNAME`)
+        next to the build's doctree directory.
+    settings
+        The prefetch settings.
+    """
+    shared = _open_shared_cache(settings)
+    stale, expired = _map_cached_inventories(
+        settings, mapping, cache_dir, shared
+    )
+    if stale:
+        _revalidate_inventories(settings, mapping, stale, shared=shared)
+    if expired:
+        _revalidate_in_background(settings, expired, shared=shared)
+    if shared is not None:
+        # Best-effort: a failed eviction only leaves the cache over its limit
+        # until the next build.
+        with contextlib.suppress(OSError):
+            shared.evict()
+
+
+def _write_prefetch_report(app: Sphinx, exception: Exception | None) -> None:
+    """Write the prefetch report, and log its summary table if it's enabled.
+
+    This is a ``build-finished`` handler that runs after the background
+    revalidations have finished. The report is written even if the build
+    failed, since the prefetch cost is the same.
+    """
+    if not _prefetch_report.inventories:
+        return
+    path = Path(app.doctreedir).parent / CACHE_DIRNAME / REPORT_FILENAME
+    try:
+        write_file_atomically(
+            path,
+            (json.dumps(_prefetch_report.to_json(), indent=2) + "\n").encode(),
+        )
+    except OSError as e:
+        logger.info(
+            "Could not write the intersphinx prefetch report to %s (%s).",
+            path,
+            e,
+        )
+        return
+    if app.config.documenteer_intersphinx_cache_report_summary:
+        logger.info(
+            "Prefetched %d intersphinx inventories in %.3f s (see %s):\n%s",
+            len(_prefetch_report.inventories),
+            _prefetch_report.elapsed,
+            path,
+            _prefetch_report.format_table(),
         )
-        if local_path is not None:
-            mapping[name] = (target_uri, local_path)
 
 
 def setup(app: Sphinx) -> ExtensionMetadata:
@@ -374,14 +1580,50 @@ def setup(app: Sphinx) -> ExtensionMetadata:
     # sphinx.ext.intersphinx's validate_intersphinx_mapping (priority 800)
     # on the same config-inited event.
     app.connect("config-inited", _prefetch_inventories)
+    app.connect("env-before-read-docs", _wait_before_parallel_read)
+    app.connect("build-finished", _wait_for_background_revalidation)
+    # After the background revalidations, whose outcomes it reports.
+    app.connect("build-finished", _write_prefetch_report, priority=600)
+    if _intersphinx_load_inventory is None:
+        logger.info(
+            "Not saving parsed intersphinx inventories, which needs Sphinx "
+            "8.2 or later."
+        )
+    # The usage report helps prune the inventories that are prefetched.
+    app.setup_extension("documenteer.ext.intersphinxusage")
+    app.setup_extension("documenteer.ext.intersphinxtrim")
 
     app.add_config_value("documenteer_intersphinx_cache_use_service", True, "")
     app.add_config_value(
         "documenteer_intersphinx_cache_service_url", DEFAULT_BASE_URL, ""
     )
     app.add_config_value(
-        "documenteer_intersphinx_cache_disk_cache_ttl", 600, ""
+        "documenteer_intersphinx_cache_disk_cache_ttl",
+        DEFAULT_DISK_CACHE_TTL,
+        "",
+    )
+    app.add_config_value(
+        "documenteer_intersphinx_cache_concurrency", DEFAULT_CONCURRENCY, ""
+    )
+    app.add_config_value(
+        "documenteer_intersphinx_cache_stale_while_revalidate", False, ""
+    )
+    app.add_config_value("documenteer_intersphinx_cache_lockfile", None, "")
+    app.add_config_value("documenteer_intersphinx_cache_shared_dir", None, "")
+    app.add_config_value(
+        "documenteer_intersphinx_cache_shared_max_size",
+        DEFAULT_MAX_SIZE // (1024 * 1024),
+        "",
+    )
+    app.add_config_value(
+        "documenteer_intersphinx_cache_circuit_breaker_threshold",
+        DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+        "",
+    )
+    app.add_config_value(
+        "documenteer_intersphinx_cache_report_summary", False, ""
     )
+    app.add_config_value("documenteer_intersphinx_cache_direct", False, "")
 
     return {
         "version": __version__,
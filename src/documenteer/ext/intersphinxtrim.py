@@ -0,0 +1,518 @@
+"""Sphinx extension that trims prefetched intersphinx inventories to the
+objects a project links to.
+
+Large inventories hold tens of thousands of objects (``std:label``,
+``std:term``, and ``py:method`` entries especially) that a project never
+links to, but that stay in memory, and in every intersphinx lookup, for the
+whole build. With ``documenteer_intersphinx_cache_trim`` enabled, this
+extension records the objects that each inventory resolves, by document, in
+``intersphinx-trim.json`` in the build directory (next to the prefetched
+inventory cache). Later builds load a trimmed copy of each inventory that
+``documenteer.ext.intersphinxcache`` prefetched, holding only the recorded
+objects plus every object of the types in
+``documenteer_intersphinx_cache_trim_keep`` (a safety set of types that new
+references commonly link to). An inventory is trimmed only if its content
+(by SHA-256 digest) is the one the objects were recorded from, so a changed
+inventory is loaded in full, and recorded again. Trimming needs Sphinx 8.2
+or later, and is disabled (with an info message) on earlier versions.
+
+If a reference isn't resolved with the trimmed inventories, the build falls
+back to the full inventories: they're loaded from the cached inventory files
+(or their parsed sidecars), replace the trimmed ones for the rest of the
+build, and the reference is resolved again. References are checked before
+intersphinx resolves them: in a ``missing-reference`` handler that replaces
+intersphinx's (and resolves the reference in its place), and, for
+``:external:`` roles, in a post-transform that runs before intersphinx's
+resolver. The handlers are only connected in builds that trim their
+inventories. References that are unresolved even
+with the full inventories (such as ignored nitpicky references) are recorded
+too, so that they don't cause a fallback on every build.
+
+Objects are recorded only for mapping entries with an absolute (``http`` or
+``https``) target URI, whose resolved links can be matched to inventory
+objects, so only those inventories are trimmed. References are resolved in
+the main process, even in a parallel build, and the record keeps the objects
+of each document, so an incremental build updates the documents it writes
+and reuses the rest.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from dataclasses import dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from docutils import nodes
+from sphinx.addnodes import pending_xref
+from sphinx.ext.intersphinx import (
+    IntersphinxRoleResolver,
+    InventoryAdapter,
+    missing_reference,
+    resolve_reference_any_inventory,
+    resolve_reference_in_inventory,
+)
+from sphinx.ext.intersphinx import _load as intersphinx_load
+from sphinx.transforms.post_transforms import SphinxPostTransform
+from sphinx.util import logging
+
+from ..storage.inventorycache import write_file_atomically
+from ..version import __version__
+from .intersphinxusage import mapped_target_uris
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.config import Config
+    from sphinx.environment import BuildEnvironment
+    from sphinx.util.typing import ExtensionMetadata
+
+__all__ = [
+    "DEFAULT_TRIM_KEEP",
+    "RECORD_FILENAME",
+    "ExternalRoleFallback",
+    "setup",
+    "trim_inventory",
+]
+
+logger = logging.getLogger(__name__)
+
+RECORD_FILENAME = "intersphinx-trim.json"
+"""Name of the record of resolved objects, in the parent of the doctree
+directory.
+"""
+
+DEFAULT_TRIM_KEEP = ("py:module", "py:class", "py:exception", "std:doc")
+"""Object types that trimmed inventories keep in full by default."""
+
+_RECORD_VERSION = 1
+"""Version of the record format."""
+
+_CAN_TRIM = hasattr(intersphinx_load, "_load_inventory")
+"""Whether intersphinx loads inventories with ``_load_inventory`` (Sphinx
+8.2 and later), which ``documenteer.ext.intersphinxcache`` hooks to trim
+them. Earlier versions also hold inventory items as plain tuples rather
+than objects with a ``uri``, so trimming is disabled on them.
+"""
+
+
+@dataclass(frozen=True)
+class _TrimPlan:
+    """The objects to keep of an inventory."""
+
+    digest: str
+    """SHA-256 digest of the inventory that the objects were recorded
+    from.
+    """
+
+    objects: dict[str, frozenset[str]]
+    """Names of the recorded objects, by object type."""
+
+    keep: frozenset[str]
+    """Object types kept in full."""
+
+
+_trim_plans: dict[str, _TrimPlan] = {}
+"""Objects to keep of each inventory that can be trimmed in this build, by
+target URI."""
+
+_trimmed_inventories: dict[str, Path] = {}
+"""Cached inventory files of the inventories trimmed in this build, by
+target URI."""
+
+_loaded_digests: dict[str, str] = {}
+"""SHA-256 digests of the prefetched inventories loaded in this build, by
+target URI."""
+
+_previous_documents: dict[str, dict[str, Any]] = {}
+"""Recorded objects and unresolved references of each document, from the
+previous build's record."""
+
+_documents: dict[str, dict[str, Any]] = {}
+"""Recorded objects and unresolved references of each document resolved in
+this build."""
+
+_known_unresolved: set[str] = set()
+"""References that the previous build couldn't resolve with the full
+inventories."""
+
+_objects_by_uri: dict[str, list[tuple[str, str, str]]] = {}
+"""The ``(name, objtype, target)`` of the loaded inventory objects, by URI
+(built when it's first needed, and cleared when the inventories change)."""
+
+
+def trim_inventory(
+    inventory: Any, *, target_uri: str, digest: str, inv_path: Path
+) -> Any:
+    """Return the trimmed copy of a prefetched inventory, or the inventory
+    itself if it isn't trimmed in this build.
+
+    ``documenteer.ext.intersphinxcache`` calls this function when
+    intersphinx loads an inventory that it prefetched.
+
+    Parameters
+    ----------
+    inventory
+        The inventory parsed by intersphinx.
+    target_uri
+        The target URI of the mapping entry.
+    digest
+        SHA-256 digest of the inventory file.
+    inv_path
+        The cached inventory file, which the full inventory is loaded from
+        again if the build falls back to it.
+    """
+    _loaded_digests[target_uri] = digest
+    plan = _trim_plans.get(target_uri)
+    if plan is None or plan.digest != digest:
+        return inventory
+    data: dict[str, dict[str, Any]] = {}
+    for objtype, objects in inventory.data.items():
+        if objtype in plan.keep:
+            data[objtype] = objects
+            continue
+        names = plan.objects.get(objtype, frozenset())
+        kept = {name: objects[name] for name in names if name in objects}
+        if kept:
+            data[objtype] = kept
+    trimmed = copy.copy(inventory)
+    trimmed.data = data
+    _trimmed_inventories[target_uri] = inv_path
+    logger.info(
+        "Trimmed the intersphinx inventory for %s to %d of %d objects.",
+        target_uri,
+        sum(len(objects) for objects in data.values()),
+        sum(len(objects) for objects in inventory.data.values()),
+    )
+    return trimmed
+
+
+def _read_record(path: Path) -> dict[str, Any]:
+    """Read the previous build's record, or return an empty one if there
+    isn't a readable one.
+    """
+    try:
+        record = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(record, dict) or (
+        record.get("version") != _RECORD_VERSION
+    ):
+        return {}
+    return record
+
+
+def _record_path(app: Sphinx) -> Path:
+    return Path(app.doctreedir).parent / RECORD_FILENAME
+
+
+def _connect(app: Sphinx, config: Config) -> None:
+    """Connect the trimming handlers if inventories are trimmed in this
+    build.
+
+    This is a ``config-inited`` handler, so that projects that don't trim
+    their inventories don't run any of the handlers.
+    """
+    # Forget the previous build's state (for repeated builds in one
+    # process, such as sphinx-autobuild).
+    _trim_plans.clear()
+    _trimmed_inventories.clear()
+    _loaded_digests.clear()
+    _previous_documents.clear()
+    _documents.clear()
+    _known_unresolved.clear()
+    _objects_by_uri.clear()
+    if not config.documenteer_intersphinx_cache_trim:
+        return
+    if not _CAN_TRIM:
+        logger.info(
+            "Not trimming the intersphinx inventories, which needs Sphinx "
+            "8.2 or later."
+        )
+        return
+
+    # Plan the trimming before intersphinx loads its inventories, and check
+    # references before intersphinx resolves them.
+    app.connect("builder-inited", _start, priority=400)
+    # Sphinx runs every missing-reference handler (and uses the first
+    # result), so intersphinx's handler, which this one takes the place of,
+    # is disconnected so that references aren't resolved twice.
+    for listener in list(app.events.listeners["missing-reference"]):
+        if listener.handler is missing_reference:
+            app.disconnect(listener.id)
+    app.connect("missing-reference", _check_missing_reference, priority=400)
+    app.connect("doctree-resolved", _record_objects)
+    app.connect("build-finished", _write_record)
+    app.add_post_transform(ExternalRoleFallback)
+
+
+def _start(app: Sphinx) -> None:
+    """Plan which inventories to trim, before intersphinx loads them.
+
+    This is a ``builder-inited`` handler that runs before intersphinx's.
+    """
+    record = _read_record(_record_path(app))
+    documents = record.get("documents")
+    if isinstance(documents, dict):
+        _previous_documents.update(documents)
+    for document in _previous_documents.values():
+        _known_unresolved.update(document.get("unresolved", []))
+
+    inventories = record.get("inventories") or {}
+    keep = frozenset(app.config.documenteer_intersphinx_cache_trim_keep)
+    for name, target_uri in mapped_target_uris(app).items():
+        recorded = inventories.get(name)
+        if not isinstance(recorded, dict) or (
+            recorded.get("target_uri") != target_uri
+        ):
+            continue
+        objects: dict[str, set[str]] = {}
+        for document in _previous_documents.values():
+            for objtype, names in (
+                document.get("objects", {}).get(name, {}).items()
+            ):
+                objects.setdefault(objtype, set()).update(names)
+        _trim_plans[target_uri] = _TrimPlan(
+            digest=recorded.get("sha256", ""),
+            objects={
+                objtype: frozenset(names) for objtype, names in objects.items()
+            },
+            keep=keep,
+        )
+
+
+def _load_full_inventories(env: BuildEnvironment) -> None:
+    """Replace the trimmed inventories with the full ones for the rest of
+    the build.
+    """
+    logger.info(
+        "Loading the full intersphinx inventories, because a reference "
+        "isn't in the trimmed ones."
+    )
+    trimmed = dict(_trimmed_inventories)
+    _trimmed_inventories.clear()
+    _trim_plans.clear()
+    _objects_by_uri.clear()
+
+    inventories = InventoryAdapter(env)
+    for target_uri, inv_path in trimmed.items():
+        entry = inventories.cache.get(target_uri)
+        if entry is None:
+            continue
+        try:
+            # This is the parsed-inventory hook of intersphinxcache, which
+            # loads the parsed sidecar, and no longer trims the inventory.
+            inventory = intersphinx_load._load_inventory(  # noqa: SLF001
+                inv_path.read_bytes(), target_uri=target_uri
+            )
+        except Exception as e:
+            logger.info(
+                "Could not load the full intersphinx inventory for %s (%s).",
+                target_uri,
+                e,
+            )
+            continue
+        inventories.cache[target_uri] = (entry[0], entry[1], inventory.data)
+
+    # Rebuild the named and main inventories the way intersphinx does.
+    inventories.clear()
+    for name, _expiry, invdata in sorted(
+        inventories.cache.values(), key=itemgetter(0, 1)
+    ):
+        inventories.named_inventory[name] = invdata
+        for objtype, objects in invdata.items():
+            inventories.main_inventory.setdefault(objtype, {}).update(objects)
+
+
+def _reference_key(node: pending_xref) -> str:
+    """Return the key that identifies a reference in the record."""
+    key = ":".join(
+        (
+            node.get("refdomain") or "",
+            node.get("reftype") or "",
+            node.get("reftarget") or "",
+        )
+    )
+    if "intersphinx" in node:
+        return f"external+{node.get('inventory') or ''}:{key}"
+    return key
+
+
+def _record_unresolved(node: pending_xref, key: str) -> None:
+    docname = node.get("refdoc")
+    if docname:
+        document = _documents.setdefault(docname, {})
+        document.setdefault("unresolved", set()).add(key)
+
+
+def _check_missing_reference(
+    app: Sphinx,
+    env: BuildEnvironment,
+    node: pending_xref,
+    contnode: nodes.TextElement,
+) -> nodes.reference | None:
+    """Resolve a reference with intersphinx, falling back to the full
+    inventories if it can't be resolved with the trimmed ones, and record
+    the references it can't resolve.
+
+    This is a ``missing-reference`` handler that takes the place of
+    intersphinx's (see `_connect`), so each reference is resolved once. It
+    returns the resolved reference, or `None` if intersphinx can't resolve
+    it even with the full inventories.
+    """
+    key = _reference_key(node)
+    if key in _known_unresolved:
+        _record_unresolved(node, key)
+        return None
+    resolved = missing_reference(app, env, node, contnode)
+    if resolved is None and _trimmed_inventories:
+        _load_full_inventories(env)
+        resolved = missing_reference(app, env, node, contnode)
+    if resolved is None:
+        _record_unresolved(node, key)
+    return resolved
+
+
+class ExternalRoleFallback(SphinxPostTransform):
+    """Fall back to the full inventories if an ``:external:`` role isn't
+    resolved with the trimmed ones.
+
+    This runs before intersphinx resolves the ``:external:`` roles (which
+    doesn't emit ``missing-reference``).
+    """
+
+    default_priority = IntersphinxRoleResolver.default_priority - 1
+
+    def run(self, **kwargs: Any) -> None:
+        for node in self.document.findall(pending_xref):
+            if "intersphinx" not in node:
+                continue
+            key = _reference_key(node)
+            if key in _known_unresolved:
+                _record_unresolved(node, key)
+                continue
+            if self._resolve(node) is not None:
+                continue
+            if _trimmed_inventories:
+                _load_full_inventories(self.env)
+                if self._resolve(node) is not None:
+                    continue
+            _record_unresolved(node, key)
+
+    def _resolve(self, node: pending_xref) -> nodes.reference | None:
+        contnode = cast("nodes.TextElement", node[0].deepcopy())
+        inv_name = node.get("inventory")
+        if inv_name is not None:
+            return resolve_reference_in_inventory(
+                self.env, inv_name, node, contnode
+            )
+        return resolve_reference_any_inventory(self.env, False, node, contnode)
+
+
+def _objects_for_uri(app: Sphinx, uri: str) -> list[tuple[str, str, str]]:
+    """Return the ``(name, objtype, target)`` of the loaded inventory
+    objects that link to a URI.
+    """
+    if not _objects_by_uri:
+        named_inventory = InventoryAdapter(app.env).named_inventory
+        for name in mapped_target_uris(app):
+            for objtype, objects in named_inventory.get(name, {}).items():
+                for target, item in objects.items():
+                    _objects_by_uri.setdefault(item.uri, []).append(
+                        (name, objtype, target)
+                    )
+    return _objects_by_uri.get(uri, [])
+
+
+def _record_objects(
+    app: Sphinx, doctree: nodes.document, docname: str
+) -> None:
+    """Record the inventory objects that a resolved document links to.
+
+    This is a ``doctree-resolved`` handler.
+    """
+    document = _documents.setdefault(docname, {})
+    objects: dict[str, dict[str, set[str]]] = document.setdefault(
+        "objects", {}
+    )
+    for node in doctree.findall(nodes.reference):
+        if node.get("internal") is not False or "reftitle" not in node:
+            continue
+        for name, objtype, target in _objects_for_uri(
+            app, node.get("refuri", "")
+        ):
+            objects.setdefault(name, {}).setdefault(objtype, set()).add(target)
+
+
+def _write_record(app: Sphinx, exception: Exception | None) -> None:
+    """Write the record of resolved objects.
+
+    This is a ``build-finished`` handler.
+    """
+    if exception is not None:
+        return
+    documents = {
+        docname: document
+        for docname, document in _previous_documents.items()
+        if docname in app.env.all_docs
+    }
+    for docname, document in _documents.items():
+        documents[docname] = {
+            "objects": {
+                name: {
+                    objtype: sorted(targets)
+                    for objtype, targets in sorted(objects.items())
+                }
+                for name, objects in sorted(
+                    document.get("objects", {}).items()
+                )
+            },
+            "unresolved": sorted(document.get("unresolved", ())),
+        }
+    record = {
+        "version": _RECORD_VERSION,
+        "inventories": {
+            name: {"target_uri": target_uri, "sha256": digest}
+            for name, target_uri in sorted(mapped_target_uris(app).items())
+            if (digest := _loaded_digests.get(target_uri)) is not None
+        },
+        "documents": dict(sorted(documents.items())),
+    }
+    path = _record_path(app)
+    try:
+        write_file_atomically(
+            path, (json.dumps(record, indent=2) + "\n").encode()
+        )
+    except OSError as e:
+        logger.info(
+            "Could not write the intersphinx trim record to %s (%s).",
+            path,
+            e,
+        )
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    """Set up the intersphinxtrim extension.
+
+    Parameters
+    ----------
+    app
+        The Sphinx application.
+
+    Returns
+    -------
+    sphinx.util.typing.ExtensionMetadata
+        Extension metadata for Sphinx.
+    """
+    app.add_config_value("documenteer_intersphinx_cache_trim", False, "")
+    app.add_config_value(
+        "documenteer_intersphinx_cache_trim_keep", list(DEFAULT_TRIM_KEEP), ""
+    )
+    app.connect("config-inited", _connect)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -0,0 +1,258 @@
+"""Sphinx extension that reports how much each intersphinx inventory is
+used.
+
+Every entry in ``intersphinx_mapping`` is fetched and loaded on every
+build, whether or not the project links to it. With
+``documenteer_intersphinx_usage_report`` enabled, this extension counts the
+cross-references that each inventory resolves, and writes a report,
+``intersphinx-usage.json``, to the build directory (next to the prefetched
+inventory cache) when the build finishes. Mapping entries that resolved no
+references, or fewer than ``documenteer_intersphinx_usage_threshold``, are
+listed so they can be pruned, and are also summarized in the build log.
+
+``sphinx.ext.intersphinx`` resolves references in its ``missing-reference``
+handler, which ends the event, so the resolved references are counted
+afterwards, on ``doctree-resolved``: a reference that intersphinx created
+(an external reference with a title, such as "(in Python v3.13)") is
+attributed to the mapping entry with the longest target URI that its URI
+starts with. References are resolved in the main process even in a parallel
+build, so every written document is counted. The report keeps the counts of
+each document, so that an incremental build, which only resolves the
+documents it writes, updates the counts of those documents and reuses the
+rest.
+
+Only entries with an absolute (``http`` or ``https``) target URI are
+reported: links into a project with a relative target URI are rewritten
+relative to each page and can't be attributed reliably.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from docutils import nodes
+from sphinx.util import logging
+
+from ..storage.inventorycache import write_file_atomically
+from ..version import __version__
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.util.typing import ExtensionMetadata
+
+__all__ = [
+    "REPORT_FILENAME",
+    "IntersphinxUsage",
+    "mapped_target_uris",
+    "setup",
+]
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILENAME = "intersphinx-usage.json"
+"""Name of the usage report, in the parent of the doctree directory."""
+
+
+def mapped_target_uris(app: Sphinx) -> dict[str, str]:
+    """Return the absolute target URI of each intersphinx mapping entry,
+    by name.
+
+    ``sphinx.ext.intersphinx`` normalizes each entry to
+    ``(name, (target_uri, locations))`` on ``config-inited``. Entries with a
+    local or malformed target URI are left out.
+
+    Parameters
+    ----------
+    app
+        The Sphinx application.
+
+    Returns
+    -------
+    dict
+        The target URI of each mapping entry, by name.
+    """
+    targets: dict[str, str] = {}
+    for name, value in (app.config.intersphinx_mapping or {}).items():
+        try:
+            target_uri = value[1][0]
+        except (IndexError, KeyError, TypeError):
+            continue
+        if isinstance(target_uri, str) and "://" in target_uri:
+            targets[name] = target_uri
+    return targets
+
+
+class IntersphinxUsage:
+    """Counts the references that each intersphinx inventory resolves, and
+    writes the usage report.
+    """
+
+    def __init__(self) -> None:
+        # Reference counts, by mapping name, of each document resolved in
+        # this build.
+        self._documents: dict[str, dict[str, int]] = {}
+        # Mapping names and target URIs, longest target URI first, so a
+        # reference is attributed to the most specific entry.
+        self._targets: list[tuple[str, str]] = []
+
+    def start(self, app: Sphinx) -> None:
+        """Reset the counts at the start of a build.
+
+        This is a ``builder-inited`` handler.
+        """
+        self._documents = {}
+        if not app.config.documenteer_intersphinx_usage_report:
+            self._targets = []
+            return
+        self._targets = sorted(
+            mapped_target_uris(app).items(),
+            key=lambda item: len(item[1]),
+            reverse=True,
+        )
+
+    def count_references(
+        self, app: Sphinx, doctree: nodes.document, docname: str
+    ) -> None:
+        """Count the intersphinx references in a resolved document.
+
+        This is a ``doctree-resolved`` handler.
+        """
+        if not app.config.documenteer_intersphinx_usage_report:
+            return
+        counts: Counter[str] = Counter()
+        for node in doctree.findall(nodes.reference):
+            if node.get("internal") is not False or "reftitle" not in node:
+                continue
+            name = self._match(node.get("refuri", ""))
+            if name is not None:
+                counts[name] += 1
+        self._documents[docname] = dict(counts)
+
+    def _match(self, uri: str) -> str | None:
+        for name, target_uri in self._targets:
+            if uri.startswith(target_uri):
+                return name
+        return None
+
+    def write_report(self, app: Sphinx, exception: Exception | None) -> None:
+        """Write the usage report, and log the unused and rarely used
+        inventories.
+
+        This is a ``build-finished`` handler.
+        """
+        if exception is not None:
+            return
+        if not app.config.documenteer_intersphinx_usage_report:
+            return
+        path = Path(app.doctreedir).parent / REPORT_FILENAME
+        documents = {
+            docname: counts
+            for docname, counts in self._read_documents(path).items()
+            if docname in app.env.all_docs
+        }
+        documents.update(self._documents)
+        report = self._make_report(
+            documents, app.config.documenteer_intersphinx_usage_threshold
+        )
+        try:
+            write_file_atomically(
+                path, (json.dumps(report, indent=2) + "\n").encode()
+            )
+        except OSError as e:
+            logger.info(
+                "Could not write the intersphinx usage report to %s (%s).",
+                path,
+                e,
+            )
+            return
+        if report["unused"]:
+            logger.info(
+                "These intersphinx inventories resolved no references: %s "
+                "(see %s).",
+                ", ".join(report["unused"]),
+                path,
+            )
+        if report["rarely_used"]:
+            logger.info(
+                "These intersphinx inventories resolved fewer than %d "
+                "references: %s (see %s).",
+                report["threshold"],
+                ", ".join(report["rarely_used"]),
+                path,
+            )
+
+    def _make_report(
+        self, documents: dict[str, dict[str, int]], threshold: int
+    ) -> dict:
+        inventories = {}
+        for name, _ in sorted(self._targets):
+            counts = [
+                doc_counts[name]
+                for doc_counts in documents.values()
+                if doc_counts.get(name)
+            ]
+            inventories[name] = {
+                "references": sum(counts),
+                "documents": len(counts),
+            }
+        return {
+            "threshold": threshold,
+            "unused": [
+                name
+                for name, usage in inventories.items()
+                if usage["references"] == 0
+            ],
+            "rarely_used": [
+                name
+                for name, usage in inventories.items()
+                if 0 < usage["references"] < threshold
+            ],
+            "inventories": inventories,
+            "documents": dict(sorted(documents.items())),
+        }
+
+    @staticmethod
+    def _read_documents(path: Path) -> dict[str, dict[str, int]]:
+        """Read the per-document counts of a previous report, or return an
+        empty mapping if there isn't a readable one.
+        """
+        try:
+            documents = json.loads(path.read_text(encoding="utf-8"))[
+                "documents"
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+        if not isinstance(documents, dict):
+            return {}
+        return documents
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    """Set up the intersphinxusage extension.
+
+    Parameters
+    ----------
+    app
+        The Sphinx application.
+
+    Returns
+    -------
+    sphinx.util.typing.ExtensionMetadata
+        Extension metadata for Sphinx.
+    """
+    app.add_config_value("documenteer_intersphinx_usage_report", False, "")
+    app.add_config_value("documenteer_intersphinx_usage_threshold", 5, "")
+
+    usage = IntersphinxUsage()
+    app.connect("builder-inited", usage.start)
+    app.connect("doctree-resolved", usage.count_references)
+    app.connect("build-finished", usage.write_report)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
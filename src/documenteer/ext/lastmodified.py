@@ -3,7 +3,9 @@ on the page's Git commit history.
 
 For each HTML output page, this extension computes the most recent commit
 datetime across the page's source file *and* any files that the page pulls in
-via ``include``/``literalinclude`` directives.
+via ``include``/``literalinclude`` directives. For API reference pages, the
+source files of the Python modules whose objects autodoc documented on the
+page count too.
 
 That datetime is exposed to the page template in three forms:
 
@@ -32,6 +34,13 @@ extension is the single source of truth for the page's last-modified date.
 Using Git commit dates (rather than filesystem modification times) means the
 timestamps are meaningful in CI builds, where checkouts have arbitrary mtimes.
 
+With ``documenteer_last_modified_sitemap`` enabled, the same dates also supply
+sphinx-sitemap's ``<lastmod>`` entries, so sphinx-sitemap doesn't need to load
+sphinx-last-updated-by-git to compute them a second time. With
+``documenteer_last_modified_manifest`` enabled, the extension also writes
+``last-modified.json`` to the output directory, listing each page's URL, UTC
+last-modified timestamp, and commit SHA for deployment and indexing tools.
+
 .. important::
 
    The date is derived from the Git history, so CI checkouts must fetch the
@@ -42,22 +51,43 @@ timestamps are meaningful in CI builds, where checkouts have arbitrary mtimes.
 from __future__ import annotations
 
 import json
+import sys
+from collections.abc import Mapping
 from datetime import UTC, datetime
 from pathlib import Path
+from types import MappingProxyType
+from urllib.parse import urljoin
 
 import git
 from sphinx.application import Sphinx
+from sphinx.builders import Builder
+from sphinx.config import ENUM, Config
+from sphinx.environment import BuildEnvironment
 from sphinx.util import logging
 from sphinx.util.i18n import format_date
 from sphinx.util.typing import ExtensionMetadata
 
-from ..conf._utils import GitRepository
+from ..conf._utils import GitRepository, LastCommit, get_git_repository
 from ..version import __version__
 
 __all__ = ["LastModified", "setup"]
 
 logger = logging.getLogger(__name__)
 
+HISTORY_INDEX_CACHE_FILENAME = ".documenteer_last_modified_index.json"
+"""Name of the file, in the doctree cache directory, that persists the Git
+history index between builds. Keeping it inside Sphinx's own cache keeps it
+out of a published site even when the doctree cache defaults to
+``outdir/.doctrees`` (a build without ``-d``), and clears it with that
+cache."""
+
+MANIFEST_FILENAME = "last-modified.json"
+"""Name of the per-page last-modified manifest written to the output
+directory."""
+
+MANIFEST_VERSION = 1
+"""Format version of the last-modified manifest."""
+
 
 class LastModified:
     """Computes per-page "last modified" timestamps from Git commit history.
@@ -71,18 +101,33 @@ class LastModified:
       drops it unless these variables already exist when it runs, so they must
       be set first.
     - `add_last_modified` (late, after sphinx-last-updated-by-git's own
-      handler) sets the human-readable ``last_updated`` value and appends the
-      machine-readable ``<head>`` metadata.
-
-    Both handlers share a single per-page Git computation via
-    `get_last_modified_datetime`, which is memoized in ``_date_cache``.
-
-    The instance lazily constructs a ``GitRepository`` on first use and
+      handler, if that extension is loaded) sets the human-readable
+      ``last_updated`` value and appends the machine-readable ``<head>``
+      metadata.
+
+    The dates themselves are computed once, at the end of the read phase, by
+    `update_dates` (an ``env-updated`` handler), and stored in the build
+    environment (see `get_date_table`) so they are pickled with it. An
+    incremental build only recomputes dates for the documents Sphinx re-read
+    -- which includes documents whose ``include``/``literalinclude``
+    dependencies changed -- unless ``HEAD`` moved, in which case every date
+    is refreshed from the (cheap) history index. Both page-context handlers
+    only read that table -- through a read-only snapshot that `share_dates`
+    takes before a parallel build forks its writers -- so writing pages does
+    no Git work. The same snapshot feeds sphinx-sitemap's ``<lastmod>``
+    entries when ``documenteer_last_modified_sitemap`` is enabled (see
+    `configure_sitemap`), and `write_manifest` (a ``build-finished`` handler)
+    writes the table to ``last-modified.json`` when
+    ``documenteer_last_modified_manifest`` is enabled.
+
+    The instance looks up the shared ``GitRepository`` on first use and
     remembers when timestamps can't be produced, so that those builds are a
     clean no-op. Timestamps are disabled when the source directory isn't a Git
     repository (including the pytest temporary source directory) and when the
     repository is a shallow clone (whose truncated history would yield
-    misleading dates -- a warning is emitted in that case).
+    misleading dates -- a warning is emitted in that case), unless
+    ``documenteer_last_modified_history_manifest`` provides the history that
+    the clone lacks.
     """
 
     def __init__(self) -> None:
@@ -90,20 +135,27 @@ class LastModified:
         # True once we've determined the srcdir isn't a usable Git repository,
         # so we don't retry (and re-log) on every page.
         self._disabled = False
-        # Per-page memo of the computed last-modified datetime, so the two
-        # html-page-context handlers don't each run the Git computation.
-        self._date_cache: dict[str, datetime | None] = {}
+        # Read-only snapshot of the date table, taken in the main process at
+        # write-started, before a parallel build forks its writer processes.
+        self._shared_dates: Mapping[str, LastCommit | None] | None = None
+        # Source files of the modules autodoc documented, by module name.
+        self._module_sources: dict[str, Path | None] = {}
 
     def _get_repository(self, app: Sphinx) -> GitRepository | None:
-        """Get the cached ``GitRepository``, constructing it on first use.
+        """Get the ``GitRepository``, looking up the shared instance (see
+        `~documenteer.conf._utils.get_git_repository`) on first use.
 
         Returns `None` if the source directory isn't a Git repository.
         """
         if self._disabled:
             return None
         if self._repo is None:
+            manifest = app.config.documenteer_last_modified_history_manifest
+            manifest_path = (
+                Path(app.confdir) / manifest if manifest is not None else None
+            )
             try:
-                self._repo = GitRepository(Path(app.srcdir))
+                repo = get_git_repository(Path(app.srcdir))
             except (git.InvalidGitRepositoryError, git.NoSuchPathError):
                 self._disabled = True
                 logger.debug(
@@ -112,25 +164,103 @@ class LastModified:
                     app.srcdir,
                 )
                 return None
+            # A build looks up every page (and its includes), so answer from
+            # a single pass over the history rather than running one git
+            # rev-list per path. The index is persisted in the doctree cache,
+            # keyed by HEAD, so a later build that restores the build
+            # directory only scans new commits.
+            repo.enable_history_index(
+                history_index_cache=(
+                    Path(app.doctreedir) / HISTORY_INDEX_CACHE_FILENAME
+                ),
+                backend=app.config.documenteer_last_modified_git_backend,
+                history_manifest=manifest_path,
+            )
+            self._repo = repo
             if self._repo.is_shallow:
+                manifest_head = self._repo.history_manifest_head
+                if manifest_head is not None:
+                    # The manifest supplies the history that the shallow
+                    # clone lacks.
+                    logger.info(
+                        "documenteer.ext.lastmodified: the Git repository "
+                        "is a shallow clone; dating pages from the history "
+                        "manifest for %s and the commits since.",
+                        manifest_head[:12],
+                    )
+                    return self._repo
                 # A shallow clone lacks the full history, so commit dates
                 # collapse to the boundary commit's date. Rather than publish
                 # misleading timestamps, disable the feature entirely (and warn
                 # once) until the repository is fetched with full history.
                 self._disabled = True
                 self._repo = None
+                if manifest_path is not None:
+                    logger.warning(
+                        "documenteer.ext.lastmodified: the Git repository is "
+                        "a shallow clone and the history manifest %s can't "
+                        "be read, so 'last updated' page timestamps would be "
+                        "inaccurate and have been omitted.",
+                        manifest_path,
+                        type="documenteer",
+                        subtype="git_shallow",
+                    )
+                    return None
                 logger.warning(
                     "documenteer.ext.lastmodified: the Git repository is a "
                     "shallow clone, so 'last updated' page timestamps would "
                     "be inaccurate and have been omitted. In CI, configure "
                     "actions/checkout with fetch-depth: 0 to fetch the full "
-                    "history and enable them.",
+                    "history, or set "
+                    "documenteer_last_modified_history_manifest, to enable "
+                    "them.",
                     type="documenteer",
                     subtype="git_shallow",
                 )
                 return None
         return self._repo
 
+    @staticmethod
+    def _dates_needed(app: Sphinx) -> bool:
+        """Whether dates are computed: for the page footer, the sitemap, the
+        manifest, or any combination.
+        """
+        config = app.config
+        return bool(
+            config.documenteer_last_modified_enabled
+            or config.documenteer_last_modified_sitemap
+            or config.documenteer_last_modified_manifest
+        )
+
+    def configure_sitemap(self, app: Sphinx, config: Config) -> None:
+        """Turn on sphinx-sitemap's ``<lastmod>`` entries, to be filled in
+        from this extension's dates.
+
+        This ``config-inited`` handler runs after every extension is set up.
+        sphinx-sitemap decides whether to load sphinx-last-updated-by-git
+        (which runs its own Git scan) from ``sitemap_show_lastmod`` during its
+        setup, so a project leaves ``sitemap_show_lastmod`` unset and enables
+        ``documenteer_last_modified_sitemap`` instead; this handler then sets
+        ``sitemap_show_lastmod`` so that sphinx-sitemap reads the dates that
+        `share_dates` provides.
+
+        Parameters
+        ----------
+        app
+            The Sphinx application.
+        config
+            The Sphinx configuration.
+        """
+        if not config.documenteer_last_modified_sitemap:
+            return
+        if "sitemap_show_lastmod" not in config:
+            logger.debug(
+                "documenteer.ext.lastmodified: sphinx_sitemap isn't loaded; "
+                "there are no sitemap lastmod dates to provide."
+            )
+            return
+        config.sitemap_show_lastmod = True
+
     def get_last_modified_datetime(
         self, app: Sphinx, pagename: str
     ) -> datetime | None:
@@ -151,6 +281,29 @@ class LastModified:
             dependencies, or `None` if there's no Git repository or none of
             those files are tracked.
         """
+        last_commit = self.get_last_commit(app, pagename)
+        return None if last_commit is None else last_commit.date
+
+    def get_last_commit(self, app: Sphinx, pagename: str) -> LastCommit | None:
+        """Find the most recent Git commit for a page.
+
+        Parameters
+        ----------
+        app
+            The Sphinx application.
+        pagename
+            The docname of the page.
+
+        Returns
+        -------
+        documenteer.conf._utils.LastCommit or None
+            The SHA and datetime of the most recent commit touching the
+            page's own source file or any of its
+            ``include``/``literalinclude`` dependencies, or `None` if there's
+            no Git repository or none of those files are tracked. With
+            ``documenteer_last_modified_uncommitted`` set, uncommitted changes
+            to those files count too, as a date without a SHA.
+        """
         repo = self._get_repository(app)
         if repo is None:
             return None
@@ -161,22 +314,242 @@ class LastModified:
         # Files the page depends on (includes/literalinclude). Sphinx records
         # these as forward-slash paths that are either srcdir-relative or
         # absolute; the ``/`` operator handles both (an absolute dependency
-        # replaces srcdir, mirroring os.path.join). compute_last_modified
+        # replaces srcdir, mirroring os.path.join). compute_last_commit
         # resolves each path, so no explicit normalization is needed here.
         srcdir = Path(app.env.srcdir)
         dependencies = app.env.dependencies.get(pagename, set())
         paths: list[Path] = [source, *(srcdir / dep for dep in dependencies)]
 
-        return repo.compute_last_modified(paths)
+        # The sources of the Python modules that autodoc documented on the
+        # page. autodoc only records the module it imported each object from,
+        # which for a package's re-exported API is the package's __init__.py
+        # rather than the module that defines the object.
+        for modname in self.get_module_table(app.env).get(pagename, ()):
+            if modname not in self._module_sources:
+                self._module_sources[modname] = _find_module_source(
+                    repo, modname
+                )
+            module_source = self._module_sources[modname]
+            if module_source is not None:
+                paths.append(module_source)
+
+        return repo.compute_last_commit(
+            paths,
+            uncommitted=app.config.documenteer_last_modified_uncommitted,
+        )
+
+    @staticmethod
+    def get_date_table(
+        env: BuildEnvironment,
+    ) -> dict[str, LastCommit | None]:
+        """Get the table of computed last-modified commits, stored in the
+        build environment.
+
+        The table maps each docname to its most recent commit (`None` when
+        none of the page's files are tracked). It is created on first
+        use and pickled with the environment, so an incremental build starts
+        with the dates computed by the previous build.
+
+        Parameters
+        ----------
+        env
+            The Sphinx build environment.
+
+        Returns
+        -------
+        dict
+            The table, which callers may modify in place.
+        """
+        if not hasattr(env, "documenteer_last_modified"):
+            env.documenteer_last_modified = {}  # type: ignore[attr-defined]
+        return env.documenteer_last_modified  # type: ignore[attr-defined]
+
+    @staticmethod
+    def get_module_table(env: BuildEnvironment) -> dict[str, set[str]]:
+        """Get the table of Python modules that autodoc documented on each
+        page, stored in the build environment.
+
+        The table maps each docname to the names of the modules that define
+        the objects autodoc documented on the page (see `note_module`). The
+        modules' source files count as the page's files in
+        `get_last_commit`.
+
+        Parameters
+        ----------
+        env
+            The Sphinx build environment.
+
+        Returns
+        -------
+        dict
+            The table, which callers may modify in place.
+        """
+        if not hasattr(env, "documenteer_last_modified_modules"):
+            env.documenteer_last_modified_modules = {}  # type: ignore[attr-defined]
+        return env.documenteer_last_modified_modules  # type: ignore[attr-defined]
+
+    def connect_autodoc(self, app: Sphinx) -> None:
+        """Connect `note_module` to autodoc, if autodoc is loaded.
+
+        This ``builder-inited`` handler runs once every extension is set up,
+        so autodoc is loaded by then even when another extension (such as
+        automodapi) loads it.
+        """
+        if "sphinx.ext.autodoc" in app.extensions and self._dates_needed(app):
+            app.connect("autodoc-process-docstring", self.note_module)
+
+    def note_module(
+        self,
+        app: Sphinx,
+        what: str,
+        name: str,
+        obj: object,
+        options: object,
+        lines: list[str],
+    ) -> None:
+        """Record the module that defines an object autodoc documents.
+
+        This ``autodoc-process-docstring`` handler runs for each object as
+        the page documenting it is read. Only the module's name is recorded;
+        it is resolved to a source file once per module, in `update_dates`.
+        """
+        if what == "module":
+            modname: object = name
+        else:
+            # A property's module is that of its getter.
+            modname = getattr(getattr(obj, "fget", obj), "__module__", None)
+        if isinstance(modname, str) and modname in sys.modules:
+            table = self.get_module_table(app.env)
+            table.setdefault(app.env.docname, set()).add(modname)
+
+    def merge_modules(
+        self,
+        app: Sphinx,
+        env: BuildEnvironment,
+        docnames: set[str],
+        other: BuildEnvironment,
+    ) -> None:
+        """Merge the module table of a parallel reader into the main
+        environment (an ``env-merge-info`` handler).
+        """
+        table = self.get_module_table(env)
+        other_table = self.get_module_table(other)
+        for docname in docnames:
+            if docname in other_table:
+                table[docname] = other_table[docname]
+
+    def purge_doc(
+        self, app: Sphinx, env: BuildEnvironment, docname: str
+    ) -> None:
+        """Drop a document's date and modules before it is re-read (or
+        removed).
+
+        This ``env-purge-doc`` handler runs for every document Sphinx
+        considers outdated, so `update_dates` recomputes exactly those.
+        """
+        self.get_date_table(env).pop(docname, None)
+        self.get_module_table(env).pop(docname, None)
+
+    def update_dates(self, app: Sphinx, env: BuildEnvironment) -> list[str]:
+        """Compute last-modified dates for documents that need one.
+
+        This ``env-updated`` handler runs once in the main process after all
+        documents are read (and, in a parallel build, merged), so the page
+        dependencies are complete. Documents that were purged and re-read
+        get a new date. When ``HEAD`` has moved since the dates were last
+        computed, a commit can change a page's date without changing its
+        source files, so every date is recomputed; pages whose date changed
+        that way are returned so that Sphinx rewrites them.
+
+        Parameters
+        ----------
+        app
+            The Sphinx application.
+        env
+            The Sphinx build environment.
+
+        Returns
+        -------
+        list of str
+            Docnames that weren't re-read but whose date changed, which
+            Sphinx adds to the documents to write.
+        """
+        if not self._dates_needed(app):
+            return []
+        if app.builder.format != "html":
+            # The dates are only rendered by HTML builders. Documents read by
+            # another builder keep no entry, so a later HTML build that reuses
+            # this environment computes them.
+            return []
+        repo = self._get_repository(app)
+        if repo is None:
+            return []
+
+        # Modules are resolved to their sources afresh in each build.
+        self._module_sources.clear()
+        if app.config.documenteer_last_modified_uncommitted != "ignore":
+            # One git status per build finds every uncommitted change.
+            repo.refresh_dirty_paths()
+        table = self.get_date_table(env)
+        head = repo.head_sha
+        previous_head = getattr(env, "documenteer_last_modified_head", None)
+        head_moved = previous_head != head
+        changed: list[str] = []
+        for docname in sorted(env.all_docs):
+            if docname in table and not head_moved:
+                continue
+            last_commit = self.get_last_commit(app, docname)
+            if docname in table and _get_date(table[docname]) != _get_date(
+                last_commit
+            ):
+                changed.append(docname)
+            table[docname] = last_commit
+        env.documenteer_last_modified_head = head  # type: ignore[attr-defined]
+        return changed
+
+    def share_dates(self, app: Sphinx, builder: Builder) -> None:
+        """Hand the computed date table to the page writers, read-only.
+
+        This ``write-started`` handler runs in the main process after the
+        read phase (when `update_dates` has filled in the table) and before
+        any pages are written. Under ``sphinx-build -j N``, Sphinx forks the
+        writer processes after this point, so each worker inherits the
+        snapshot rather than repeating the Git queries. The Git cost of a
+        build is therefore the same whatever the number of processes.
+
+        With ``documenteer_last_modified_sitemap`` enabled, the dates are
+        also published as ``env.git_last_updated``, the per-page
+        ``(timestamp, show_sourcelink)`` table that sphinx-sitemap reads for
+        ``<lastmod>`` (and that sphinx-last-updated-by-git would otherwise
+        compute). It is set after the environment is pickled, so it isn't
+        saved with it.
+
+        Parameters
+        ----------
+        app
+            The Sphinx application.
+        builder
+            The builder that is about to write pages.
+        """
+        self._shared_dates = MappingProxyType(
+            dict(self.get_date_table(app.env))
+        )
+        if app.config.documenteer_last_modified_sitemap:
+            app.env.git_last_updated = {  # type: ignore[attr-defined]
+                docname: (int(last_commit.date.timestamp()), True)
+                for docname, last_commit in self._shared_dates.items()
+                if last_commit is not None
+            }
 
     def _resolve(
         self, app: Sphinx, pagename: str, doctree: object | None
     ) -> datetime | None:
         """Return the page's last-modified datetime, applying the gates once.
 
-        Shared by both ``html-page-context`` handlers. The result is memoized
-        per page so the (potentially expensive) Git computation runs only once
-        even though two handlers consult it.
+        Shared by both ``html-page-context`` handlers. The date is read from
+        the snapshot that `share_dates` took of the table `update_dates`
+        filled in during the read phase, so no Git computation happens while
+        pages are written, in the main process or in a parallel writer.
 
         Returns `None` -- so the caller emits nothing -- when the page has no
         source document, the feature is disabled, or no commit date is
@@ -198,11 +571,11 @@ class LastModified:
             return None
         if not app.config.documenteer_last_modified_enabled:
             return None
-        if pagename not in self._date_cache:
-            self._date_cache[pagename] = self.get_last_modified_datetime(
-                app, pagename
-            )
-        return self._date_cache[pagename]
+        if self._shared_dates is None:
+            # Only reachable if a builder renders pages without emitting
+            # write-started; the environment's table is then read directly.
+            return _get_date(self.get_date_table(app.env).get(pagename))
+        return _get_date(self._shared_dates.get(pagename))
 
     def add_time_context(
         self,
@@ -262,9 +635,10 @@ class LastModified:
         """Populate the ``last_updated`` value and ``<head>`` metadata.
 
         This ``html-page-context`` handler runs *late* -- after
-        sphinx-last-updated-by-git's own handler (which the user-guide preset
-        auto-loads through sphinx-sitemap and which resets ``last_updated`` to
-        `None` when ``html_last_updated_fmt`` is unset) and after
+        sphinx-last-updated-by-git's own handler (which sphinx-sitemap
+        auto-loads when ``sitemap_show_lastmod`` is set in ``conf.py``, and
+        which resets ``last_updated`` to `None` when ``html_last_updated_fmt``
+        is unset) and after
         pydata-sphinx-theme's ``_fix_canonical_url`` (so the JSON-LD metadata
         sees the corrected ``pageurl``). It sets the ``last_updated`` context
         value -- formatted in the commit's own timezone offset and emitted by
@@ -305,6 +679,80 @@ class LastModified:
 
         self._add_metadata(context, date.astimezone(UTC).isoformat())
 
+    def write_manifest(self, app: Sphinx, exception: Exception | None) -> None:
+        """Write the per-page last-modified manifest to the output directory.
+
+        This ``build-finished`` handler writes ``last-modified.json`` when
+        ``documenteer_last_modified_manifest`` is enabled. The manifest
+        lists every page, so deployment and indexing tools can diff it
+        against the previous build's manifest and only process the pages
+        whose entries changed:
+
+        .. code-block:: json
+
+           {
+             "version": 1,
+             "head": "<HEAD commit SHA>",
+             "base_url": "https://example.lsst.io/",
+             "pages": {
+               "index": {
+                 "path": "index.html",
+                 "url": "https://example.lsst.io/index.html",
+                 "modified": "2024-06-01T00:00:00+00:00",
+                 "commit": "<commit SHA>"
+               }
+             }
+           }
+
+        ``path`` is the page's URL relative to the site root; ``base_url``
+        and the absolute ``url`` are included when ``html_baseurl`` is set.
+        ``modified`` (UTC) and ``commit`` are `None` for a page whose files
+        aren't tracked. Nothing is written when the build failed, for
+        non-HTML builders, or when there's no usable Git repository.
+
+        Parameters
+        ----------
+        app
+            The Sphinx application.
+        exception
+            The exception that stopped the build, if any.
+        """
+        if exception is not None:
+            return
+        if not app.config.documenteer_last_modified_manifest:
+            return
+        if app.builder.format != "html" or self._get_repository(app) is None:
+            return
+
+        base_url = app.config.html_baseurl or None
+        table = self.get_date_table(app.env)
+        pages: dict[str, dict[str, str | None]] = {}
+        for docname in sorted(app.env.all_docs):
+            path = app.builder.get_target_uri(docname)
+            last_commit = table.get(docname)
+            entry: dict[str, str | None] = {"path": path}
+            if base_url:
+                entry["url"] = urljoin(base_url, path)
+            entry["modified"] = (
+                None
+                if last_commit is None
+                else last_commit.date.astimezone(UTC).isoformat()
+            )
+            entry["commit"] = None if last_commit is None else last_commit.sha
+            pages[docname] = entry
+
+        manifest: dict[str, object] = {
+            "version": MANIFEST_VERSION,
+            "head": getattr(app.env, "documenteer_last_modified_head", None),
+        }
+        if base_url:
+            manifest["base_url"] = base_url
+        manifest["pages"] = pages
+        Path(app.outdir, MANIFEST_FILENAME).write_text(
+            json.dumps(manifest, separators=(",", ":")) + "\n",
+            encoding="utf-8",
+        )
+
     @staticmethod
     def _add_metadata(context: dict, iso: str) -> None:
         """Append machine-readable last-modified metadata to the page head.
@@ -363,6 +811,38 @@ class LastModified:
         context["metatags"] = metatags
 
 
+def _get_date(last_commit: LastCommit | None) -> datetime | None:
+    """Get the date of a commit that may be `None`."""
+    return None if last_commit is None else last_commit.date
+
+
+def _find_module_source(repo: GitRepository, modname: str) -> Path | None:
+    """Find the source file in the repository of an imported module.
+
+    A module imported from the working tree (as with an editable install)
+    is found by its ``__file__``. A module installed into a
+    ``site-packages`` directory is matched to the one file in the repository
+    whose path ends with the module's package path (``pkg/mod.py``), if
+    there is exactly one. Returns `None` for other modules, such as those of
+    the standard library or third-party packages.
+    """
+    filename = getattr(sys.modules.get(modname), "__file__", None)
+    if not isinstance(filename, str) or not filename.endswith(".py"):
+        return None
+    path = Path(filename).resolve()
+    if repo.compute_relative_path(path) is not None:
+        return path
+    if not {"site-packages", "dist-packages"} & set(path.parts):
+        return None
+    depth = modname.count(".") + 1
+    if path.name == "__init__.py":
+        depth += 1
+    matches = repo.find_paths_by_suffix("/".join(path.parts[-depth:]))
+    if len(matches) != 1:
+        return None
+    return repo.working_tree_dir / matches[0]
+
+
 def setup(app: Sphinx) -> ExtensionMetadata:
     """Set up the ``documenteer.ext.lastmodified`` Sphinx extension."""
     app.add_config_value(
@@ -371,11 +851,46 @@ def setup(app: Sphinx) -> ExtensionMetadata:
     app.add_config_value(
         "documenteer_last_modified_date_format", "%b %d, %Y", "html", [str]
     )
+    app.add_config_value(
+        "documenteer_last_modified_git_backend",
+        "subprocess",
+        "",
+        ENUM("subprocess", "objects"),
+    )
+    app.add_config_value(
+        "documenteer_last_modified_sitemap", False, "html", [bool]
+    )
+    app.add_config_value(
+        "documenteer_last_modified_manifest", False, "", [bool]
+    )
+    app.add_config_value(
+        "documenteer_last_modified_history_manifest", None, "", [str]
+    )
+    app.add_config_value(
+        "documenteer_last_modified_uncommitted",
+        "ignore",
+        "env",
+        ENUM("ignore", "now", "mtime"),
+    )
 
-    # A single instance carries the cached Git repository and per-page date
-    # memo across all pages in a build.
+    # A single instance carries the cached Git repository across the build;
+    # the per-page dates live in the build environment.
     last_modified = LastModified()
 
+    app.connect("config-inited", last_modified.configure_sitemap)
+
+    # Dates are computed at the end of the read phase, for the documents that
+    # were (re-)read, and stored in the environment.
+    app.connect("env-purge-doc", last_modified.purge_doc)
+    app.connect("env-merge-info", last_modified.merge_modules)
+    app.connect("env-updated", last_modified.update_dates)
+    # API pages are also dated by the modules that define what they document.
+    app.connect("builder-inited", last_modified.connect_autodoc)
+    # The computed table is snapshotted before pages are written, so that the
+    # writer processes of a parallel build share it rather than querying Git.
+    app.connect("write-started", last_modified.share_dates)
+    app.connect("build-finished", last_modified.write_manifest)
+
     # The two handlers bracket the default-priority (500) html-page-context
     # handlers of the themes/extensions we coexist with (lower numbers run
     # earlier):
@@ -387,8 +902,9 @@ def setup(app: Sphinx) -> ExtensionMetadata:
     #   this, that component renders empty and pydata drops it from the footer.
     # - add_last_modified runs late (priority 600) so it deterministically
     #   wins ``last_updated`` over sphinx_last_updated_by_git's priority-500
-    #   handler (which resets it to None) and so the JSON-LD metadata sees the
-    #   pageurl that pydata's _fix_canonical_url (priority 500) corrects.
+    #   handler (which resets it to None), if that extension is loaded, and
+    #   so the JSON-LD metadata sees the pageurl that pydata's
+    #   _fix_canonical_url (priority 500) corrects.
     app.connect(
         "html-page-context", last_modified.add_time_context, priority=400
     )
@@ -398,6 +914,9 @@ def setup(app: Sphinx) -> ExtensionMetadata:
 
     return {
         "version": __version__,
+        # Bumped when the tables stored in the environment change shape,
+        # so that Sphinx discards an environment pickled with the old shape.
+        "env_version": 2,
         "parallel_read_safe": True,
         "parallel_write_safe": True,
     }
@@ -0,0 +1,154 @@
+"""A service for finding the documentation pages that a change affects."""
+
+from __future__ import annotations
+
+import os
+import pickle
+from collections.abc import Iterable
+from pathlib import Path
+
+from sphinx.application import ENV_PICKLE_FILENAME
+from sphinx.environment import BuildEnvironment
+
+from documenteer.conf._utils import GitRepository, get_git_repository
+
+__all__ = ["ChangedPagesService"]
+
+
+class ChangedPagesService:
+    """A service for finding the pages whose sources, or whose included
+    files, changed between two Git revisions.
+
+    Pages are matched against the environment saved by an earlier Sphinx
+    build (:file:`environment.pickle` in the doctree directory): a page is
+    affected if its source file changed, or if any file that Sphinx records
+    as one of its dependencies (``include`` and ``literalinclude`` targets,
+    images, and files noted by extensions) changed. Source files added since
+    that build are reported by the docname they would have.
+
+    Parameters
+    ----------
+    env
+        The saved build environment.
+    repo
+        The Git repository that contains the source directory.
+    srcdir
+        The source directory's current location, if it differs from the
+        location it was built from (for example, when the environment was
+        restored from a CI cache into a different checkout path). Paths
+        recorded in the environment are re-anchored to it.
+    """
+
+    def __init__(
+        self,
+        env: BuildEnvironment,
+        repo: GitRepository,
+        *,
+        srcdir: Path | None = None,
+    ) -> None:
+        self.env = env
+        self.repo = repo
+        self.srcdir = Path(srcdir if srcdir is not None else env.srcdir)
+
+    @classmethod
+    def from_doctree_dir(
+        cls, doctreedir: Path, *, srcdir: Path | None = None
+    ) -> ChangedPagesService:
+        """Create the service from a build's doctree directory.
+
+        Parameters
+        ----------
+        doctreedir
+            The doctree directory of a completed Sphinx build, containing its
+            :file:`environment.pickle`.
+        srcdir
+            The source directory's current location, if it differs from the
+            location it was built from.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the doctree directory has no saved environment.
+        git.InvalidGitRepositoryError
+            Raised if the source directory isn't in a Git working tree.
+        """
+        with (doctreedir / ENV_PICKLE_FILENAME).open("rb") as f:
+            env = pickle.load(f)  # noqa: S301
+        repo = get_git_repository(
+            Path(srcdir if srcdir is not None else env.srcdir)
+        )
+        return cls(env, repo, srcdir=srcdir)
+
+    def compute_changed_paths(
+        self, base: str, head: str = "HEAD"
+    ) -> list[str]:
+        """List the repository paths changed between two revisions (see
+        `~documenteer.conf._utils.GitRepository.compute_changed_paths`).
+        """
+        return self.repo.compute_changed_paths(base, head)
+
+    def find_docnames(self, changed_paths: Iterable[str]) -> list[str]:
+        """Find the docnames affected by changes to a set of files.
+
+        Parameters
+        ----------
+        changed_paths
+            POSIX-style paths, relative to the root of the Git working tree.
+
+        Returns
+        -------
+        list of str
+            The sorted docnames whose source or dependencies are among
+            ``changed_paths``, including pages whose sources were added
+            or deleted.
+        """
+        changed = set(changed_paths)
+        if not changed:
+            return []
+
+        # Map each file back to the pages that read it, in a single pass over
+        # the environment.
+        readers: dict[str, set[str]] = {}
+        for docname in self.env.found_docs:
+            source = self.env.doc2path(docname, False)
+            readers.setdefault(self._to_repo_path(source), set()).add(docname)
+        for docname, dependencies in self.env.dependencies.items():
+            for dependency in dependencies:
+                key = self._to_repo_path(dependency)
+                readers.setdefault(key, set()).add(docname)
+        readers.pop("", None)
+
+        docnames: set[str] = set()
+        for path in changed:
+            if path in readers:
+                docnames.update(readers[path])
+                continue
+            # A source file that didn't exist at the time of the build.
+            new_source = self._to_source_path(path)
+            if new_source is not None:
+                new_docname = self.env.project.path2doc(new_source)
+                if new_docname is not None:
+                    docnames.add(new_docname)
+        return sorted(docnames)
+
+    def _to_repo_path(self, path: str | os.PathLike[str]) -> str:
+        """Convert a path recorded in the environment (absolute, or relative
+        to the source directory it was built from) to a repository path, or
+        the empty string if it's outside the working tree.
+        """
+        # Dependencies are stored as srcdir / filename without normalization,
+        # so an include of ../README.rst keeps its "..".
+        built = os.path.normpath(Path(self.env.srcdir) / path)
+        relative = os.path.relpath(built, self.env.srcdir)
+        current = Path(os.path.normpath(self.srcdir / relative))
+        return self.repo.compute_relative_path(current) or ""
+
+    def _to_source_path(self, repo_path: str) -> Path | None:
+        """Convert a repository path to a path relative to the source
+        directory, or `None` if it's outside the source directory.
+        """
+        absolute = (self.repo.working_tree_dir / repo_path).resolve()
+        try:
+            return absolute.relative_to(self.srcdir.resolve())
+        except ValueError:
+            return None
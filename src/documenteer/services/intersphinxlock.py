@@ -0,0 +1,225 @@
+"""A service for pinning a project's intersphinx inventories in a
+lockfile.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Mapping
+from pathlib import Path
+
+from pydantic import ValidationError
+from sphinx.config import eval_config_file
+from sphinx.util.tags import Tags
+
+from documenteer._requestsutils import requests_retry_session
+from documenteer.ext.intersphinxcache import (
+    DEFAULT_CONCURRENCY,
+    resolve_prefetch_target,
+)
+from documenteer.storage.intersphinxcacheclient import (
+    DEFAULT_BASE_URL,
+    IntersphinxCacheClient,
+    IntersphinxCacheError,
+    InventoryRequest,
+)
+from documenteer.storage.inventorycache import (
+    DEFAULT_MAX_SIZE,
+    SharedInventoryCache,
+    default_shared_cache_dir,
+    resolve_shared_cache_dir,
+)
+from documenteer.storage.inventorylock import (
+    DEFAULT_LOCKFILE_NAME,
+    InventoryLockfile,
+    LockedInventory,
+)
+
+__all__ = ["IntersphinxLockService"]
+
+
+class IntersphinxLockService:
+    """A service for pinning a project's intersphinx inventories in a
+    lockfile.
+
+    Each intersphinx mapping entry that ``documenteer.ext.intersphinxcache``
+    prefetches is fetched from Ook and pinned, by its content digest, in the
+    lockfile. The pinned inventories are stored in the shared inventory
+    cache, where a locked build finds them without contacting Ook or the
+    origin sites.
+
+    Parameters
+    ----------
+    mapping
+        The project's ``intersphinx_mapping``.
+    lockfile_path
+        Path of the lockfile.
+    cache
+        The inventory cache that holds the pinned inventories.
+    client
+        The client for Ook's intersphinx inventory cache API.
+    concurrency
+        Maximum number of inventories fetched at the same time, if Ook can't
+        answer them in one batch request.
+    """
+
+    def __init__(
+        self,
+        mapping: Mapping[str, object],
+        *,
+        lockfile_path: Path,
+        cache: SharedInventoryCache,
+        client: IntersphinxCacheClient,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.mapping = mapping
+        self.lockfile_path = lockfile_path
+        self.cache = cache
+        self.client = client
+        self.concurrency = max(1, concurrency)
+
+    @classmethod
+    def from_conf_dir(
+        cls, confdir: Path, *, lockfile_path: Path | None = None
+    ) -> IntersphinxLockService:
+        """Create the service from a project's Sphinx configuration.
+
+        The lockfile, the inventory cache, and the Ook API are those that
+        the project's builds use (``documenteer_intersphinx_cache_lockfile``,
+        ``documenteer_intersphinx_cache_shared_dir``, and
+        ``documenteer_intersphinx_cache_service_url``). Without a shared
+        cache directory, the pinned inventories are stored in the default
+        one (see `default_shared_cache_dir`).
+
+        Parameters
+        ----------
+        confdir
+            The directory containing the project's :file:`conf.py`.
+        lockfile_path
+            Path of the lockfile, overriding the configuration.
+
+        Raises
+        ------
+        sphinx.errors.ConfigError
+            Raised if :file:`conf.py` can't be evaluated.
+        """
+        namespace = eval_config_file(confdir / "conf.py", Tags())
+        if lockfile_path is None:
+            lockfile_path = confdir / (
+                namespace.get("documenteer_intersphinx_cache_lockfile")
+                or DEFAULT_LOCKFILE_NAME
+            )
+        cache_dir = resolve_shared_cache_dir(
+            namespace.get("documenteer_intersphinx_cache_shared_dir"),
+            base=confdir,
+        )
+        max_size = namespace.get(
+            "documenteer_intersphinx_cache_shared_max_size",
+            DEFAULT_MAX_SIZE // (1024 * 1024),
+        )
+        concurrency = namespace.get(
+            "documenteer_intersphinx_cache_concurrency", DEFAULT_CONCURRENCY
+        )
+        return cls(
+            namespace.get("intersphinx_mapping") or {},
+            lockfile_path=lockfile_path,
+            cache=SharedInventoryCache(
+                cache_dir
+                if cache_dir is not None
+                else default_shared_cache_dir(),
+                max_size=max_size * 1024 * 1024,
+            ),
+            client=IntersphinxCacheClient(
+                base_url=namespace.get(
+                    "documenteer_intersphinx_cache_service_url",
+                    DEFAULT_BASE_URL,
+                ),
+                session=requests_retry_session(pool_maxsize=concurrency),
+            ),
+            concurrency=concurrency,
+        )
+
+    def read_lockfile(self) -> InventoryLockfile:
+        """Read the current lockfile, or return an empty one if there isn't
+        a valid lockfile yet.
+        """
+        try:
+            return InventoryLockfile.read(self.lockfile_path)
+        except (OSError, ValidationError):
+            return InventoryLockfile()
+
+    def lock(self) -> list[str]:
+        """Pin the project's inventories and write the lockfile.
+
+        Inventories pinned by the current lockfile are revalidated with their
+        entity tags, so an unchanged inventory isn't downloaded again (unless
+        it's missing from the cache).
+
+        Returns
+        -------
+        list of str
+            The names of the mapping entries whose pins were added, changed,
+            or removed.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if any inventory can't be fetched from Ook. The lockfile
+            isn't changed.
+        OSError
+            Raised if an inventory or the lockfile can't be written.
+        """
+        previous = self.read_lockfile()
+        targets = {
+            name: target[1]
+            for name, value in sorted(self.mapping.items())
+            if (target := resolve_prefetch_target(value)) is not None
+        }
+        pins = {
+            name: pin
+            for name, url in targets.items()
+            if (pin := previous.inventories.get(name)) is not None
+            and pin.url == url
+            and self.cache.find_blob(pin.sha256) is not None
+        }
+        results = self.client.get_inventories(
+            [
+                InventoryRequest(
+                    url=url,
+                    etag=pins[name].etag if name in pins else None,
+                )
+                for name, url in targets.items()
+            ],
+            max_workers=self.concurrency,
+        )
+
+        errors: list[str] = []
+        inventories: dict[str, LockedInventory] = {}
+        for (name, url), result in zip(targets.items(), results, strict=True):
+            if isinstance(result, IntersphinxCacheError):
+                errors.append(f"{name} ({url}): {result}")
+            elif result.not_modified and name in pins:
+                self.cache.touch(url)
+                inventories[name] = pins[name]
+            elif result.content is None:
+                errors.append(f"{name} ({url}): Ook returned no inventory")
+            else:
+                self.cache.store(url, result.content, result.etag)
+                inventories[name] = LockedInventory(
+                    url=url,
+                    etag=result.etag,
+                    sha256=hashlib.sha256(result.content).hexdigest(),
+                )
+        if errors:
+            raise RuntimeError(
+                "Could not fetch intersphinx inventories from Ook:\n"
+                + "\n".join(f"- {error}" for error in errors)
+            )
+
+        lockfile = InventoryLockfile(inventories=inventories)
+        lockfile.write(self.lockfile_path)
+        return sorted(
+            name
+            for name in inventories.keys() | previous.inventories.keys()
+            if inventories.get(name) != previous.inventories.get(name)
+        )
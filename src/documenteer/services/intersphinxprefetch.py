@@ -0,0 +1,146 @@
+"""A service for prefetching a project's intersphinx inventories outside a
+Sphinx build.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from documenteer.conf._toml import DocumenteerConfig
+from documenteer.ext.intersphinxcache import (
+    CACHE_DIRNAME,
+    TOKEN_ENV_VAR,
+    PrefetchSettings,
+    prefetch_inventories,
+    resolve_prefetch_target,
+    wait_for_background_revalidations,
+)
+from documenteer.storage.inventorycache import resolve_shared_cache_dir
+
+__all__ = ["IntersphinxPrefetchService"]
+
+
+class IntersphinxPrefetchService:
+    """A service for prefetching a project's intersphinx inventories outside
+    a Sphinx build.
+
+    The inventories are fetched from Ook (or, in direct mode, from their
+    origins) into the same cache directory, and with the same settings,
+    that ``documenteer.ext.intersphinxcache`` uses in the build, so a build
+    that follows within the ``disk_cache_ttl`` reuses them without
+    fetching them again.
+
+    Parameters
+    ----------
+    mapping
+        The project's intersphinx mapping, as
+        ``{name: (target_uri, location)}``.
+    cache_dir
+        The build's prefetched inventory directory.
+    settings
+        The prefetch settings.
+    """
+
+    def __init__(
+        self,
+        mapping: dict[str, tuple[str, str | None]],
+        *,
+        cache_dir: Path,
+        settings: PrefetchSettings,
+    ) -> None:
+        self.mapping = mapping
+        self.cache_dir = cache_dir
+        self.settings = settings
+
+    @classmethod
+    def from_toml(
+        cls, toml_path: Path, *, doctree_dir: Path
+    ) -> IntersphinxPrefetchService:
+        """Create the service from a user guide's :file:`documenteer.toml`.
+
+        The mapping is the ``[sphinx.intersphinx.projects]`` table, and the
+        settings are from the ``[sphinx.intersphinx_cache]`` table. A
+        relative shared cache directory is relative to the directory of the
+        :file:`documenteer.toml` file. As in the build, the inventories are
+        fetched from their origins when the ``OOK_TOKEN`` environment
+        variable is unset, if ``direct`` is enabled.
+
+        Parameters
+        ----------
+        toml_path
+            Path of the :file:`documenteer.toml` file.
+        doctree_dir
+            The doctree directory of the build, whose parent directory holds
+            the prefetched inventories.
+
+        Raises
+        ------
+        OSError
+            Raised if the file can't be read.
+        sphinx.errors.ConfigError
+            Raised if the file isn't valid.
+        """
+        config = DocumenteerConfig.load(toml_path.read_text())
+        mapping: dict[str, tuple[str, str | None]] = {}
+        config.extend_intersphinx_mapping(mapping)
+        settings = PrefetchSettings(
+            service_url=config.intersphinx_cache_service_url,
+            disk_cache_ttl=config.intersphinx_cache_disk_cache_ttl,
+            concurrency=config.intersphinx_cache_concurrency,
+            stale_while_revalidate=(
+                config.intersphinx_cache_stale_while_revalidate
+            ),
+            circuit_breaker_threshold=(
+                config.intersphinx_cache_circuit_breaker_threshold
+            ),
+            shared_dir=resolve_shared_cache_dir(
+                config.intersphinx_cache_shared_dir, base=toml_path.parent
+            ),
+            shared_max_size=(
+                config.intersphinx_cache_shared_max_size * 1024 * 1024
+            ),
+            direct=(
+                not os.getenv(TOKEN_ENV_VAR)
+                and config.intersphinx_cache_direct
+            ),
+        )
+        return cls(
+            mapping if config.intersphinx_cache_use_service else {},
+            cache_dir=doctree_dir.parent / CACHE_DIRNAME,
+            settings=settings,
+        )
+
+    def prefetch(self) -> dict[str, Path | None]:
+        """Prefetch the inventories.
+
+        Inventories that are younger than the ``disk_cache_ttl`` are kept as
+        they are, and the others are revalidated with Ook (or their
+        origins). Inventories revalidated in the background, with
+        ``stale_while_revalidate``, are waited for.
+
+        Returns
+        -------
+        dict
+            The cached inventory file of each prefetched mapping entry, by
+            name, or `None` for an entry whose inventory couldn't be
+            prefetched (so the build fetches it).
+        """
+        mapping: dict = dict(self.mapping)
+        names = [
+            name
+            for name, value in mapping.items()
+            if resolve_prefetch_target(value) is not None
+        ]
+        prefetch_inventories(mapping, self.cache_dir, self.settings)
+        wait_for_background_revalidations()
+        results: dict[str, Path | None] = {}
+        for name in names:
+            # An entry whose origin is unreachable in direct mode is removed.
+            location = mapping[name][1] if name in mapping else None
+            results[name] = (
+                Path(location)
+                if isinstance(location, str) and "://" not in location
+                else None
+            )
+        return results
@@ -0,0 +1,606 @@
+"""In-process reader for a Git repository's object database.
+
+`GitObjectReader` answers the history questions that
+`documenteer.conf._utils.GitRepository` asks of ``git log`` -- which paths
+each commit touched, and when -- by reading the repository's ``.git``
+directory directly instead of running Git subprocesses:
+
+- Objects (commits and trees) are read from loose objects and from packfiles
+  through their ``.idx`` indexes, using the pure-Python object database that
+  GitPython ships (`git.db.GitDB`), including packs of alternate object
+  stores.
+- When ``objects/info/commit-graph`` is present, commit parents, root trees,
+  and commit times come from that file (see `CommitGraph`), so walking the
+  history doesn't inflate every commit object.
+
+Tree diffs are computed by comparing tree objects, descending only into
+subtrees whose object IDs differ, so each commit costs a handful of object
+reads rather than a process spawn.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import mmap
+import struct
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from git.db import GitDB
+from gitdb.exc import ODBError
+
+__all__ = ["CommitGraph", "GitObjectReader", "GitObjectReaderError"]
+
+_TREE_MODE = 0o40000
+"""Mode of a tree (subdirectory) entry in a Git tree object."""
+
+_OID_LENGTH = 20
+"""Length of a binary SHA-1 object ID."""
+
+
+class GitObjectReaderError(Exception):
+    """Raised when the object database can't answer a query, such as when
+    an object is missing (e.g. in a partial clone) or malformed.
+    """
+
+
+class _Commit(NamedTuple):
+    """The parts of a commit needed to walk history and diff trees."""
+
+    tree: bytes
+    """Binary object ID of the commit's root tree."""
+
+    parents: tuple[bytes, ...]
+    """Binary object IDs of the parent commits, in order."""
+
+    timestamp: int
+    """Committer time, in seconds since the epoch."""
+
+    generation: int | None = None
+    """Topological level of the commit (one more than the highest level of
+    its parents), or `None` if it isn't known.
+    """
+
+
+class CommitGraph:
+    """Reader for a Git ``commit-graph`` file.
+
+    The commit-graph file (written by ``git commit-graph write`` and by
+    ``git gc`` or ``git maintenance``) stores, for each commit it covers,
+    the root tree, the parents, and the commit time, so history can be
+    walked without decompressing commit objects.
+
+    Only a single, self-contained SHA-1 graph file is supported; a split
+    graph chain (``objects/info/commit-graphs/``) isn't read, and commits
+    that the graph doesn't cover are simply read from the object database.
+
+    Parameters
+    ----------
+    data
+        The contents of the commit-graph file.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``data`` isn't a supported commit-graph file.
+    """
+
+    _PARENT_NONE = 0x70000000
+    _EXTRA_EDGES = 0x80000000
+    _LAST_EDGE = 0x80000000
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        if len(data) < 8 or data[:4] != b"CGPH":
+            raise ValueError("Not a commit-graph file.")
+        version, hash_version, num_chunks, num_bases = data[4:8]
+        if version != 1 or hash_version != 1:
+            raise ValueError(
+                f"Unsupported commit-graph version {version} "
+                f"(hash version {hash_version})."
+            )
+        if num_bases != 0:
+            raise ValueError("Split commit-graph chains are not supported.")
+
+        # The chunk lookup table lists each chunk's ID and byte offset.
+        chunks: dict[bytes, int] = {}
+        for i in range(num_chunks):
+            entry = 8 + 12 * i
+            (offset,) = struct.unpack_from(">Q", data, entry + 4)
+            chunks[bytes(data[entry : entry + 4])] = offset
+        for required in (b"OIDF", b"OIDL", b"CDAT"):
+            if required not in chunks:
+                raise ValueError(f"Commit-graph lacks the {required!r} chunk.")
+
+        self._data = data
+        self._fanout_offset = chunks[b"OIDF"]
+        self._oids_offset = chunks[b"OIDL"]
+        self._commits_offset = chunks[b"CDAT"]
+        self._edges_offset = chunks.get(b"EDGE", 0)
+        (self._count,) = struct.unpack_from(
+            ">I", data, self._fanout_offset + 4 * 255
+        )
+
+    @classmethod
+    def open(cls, path: Path) -> CommitGraph | None:
+        """Open a commit-graph file, if there is a usable one.
+
+        Parameters
+        ----------
+        path
+            Path of the ``commit-graph`` file.
+
+        Returns
+        -------
+        CommitGraph or None
+            The graph, or `None` if the file doesn't exist or isn't a
+            supported commit-graph file.
+        """
+        try:
+            with path.open("rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # ValueError is raised for an empty file, which can't be mapped.
+            return None
+        try:
+            return cls(data)
+        except (ValueError, struct.error):
+            data.close()
+            return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _oid(self, position: int) -> bytes:
+        start = self._oids_offset + _OID_LENGTH * position
+        return bytes(self._data[start : start + _OID_LENGTH])
+
+    def _find(self, oid: bytes) -> int | None:
+        """Binary-search the graph for a commit's position."""
+        first = oid[0]
+        if first == 0:
+            low = 0
+        else:
+            (low,) = struct.unpack_from(
+                ">I", self._data, self._fanout_offset + 4 * (first - 1)
+            )
+        (high,) = struct.unpack_from(
+            ">I", self._data, self._fanout_offset + 4 * first
+        )
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self._oid(middle)
+            if candidate == oid:
+                return middle
+            if candidate < oid:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, oid: bytes) -> _Commit | None:
+        """Get a commit's tree, parents, and commit time from the graph.
+
+        Parameters
+        ----------
+        oid
+            Binary object ID of the commit.
+
+        Returns
+        -------
+        _Commit or None
+            The commit, or `None` if the graph doesn't cover it.
+        """
+        position = self._find(oid)
+        if position is None:
+            return None
+        start = self._commits_offset + (_OID_LENGTH + 16) * position
+        tree = bytes(self._data[start : start + _OID_LENGTH])
+        parent1, parent2, generation_and_time, time_low = struct.unpack_from(
+            ">IIII", self._data, start + _OID_LENGTH
+        )
+        # The lowest two bits of the generation word hold bits 33 and 34 of
+        # the commit time, and the upper 30 bits the topological level (zero
+        # in graphs written before Git computed levels).
+        timestamp = ((generation_and_time & 0x3) << 32) | time_low
+        generation = (generation_and_time >> 2) or None
+
+        parents: list[bytes] = []
+        if parent1 != self._PARENT_NONE:
+            parents.append(self._oid(parent1))
+        if parent2 & self._EXTRA_EDGES:
+            # An octopus merge: the second and later parents are listed in
+            # the extra edges chunk, the last one flagged with the high bit.
+            edge = parent2 & ~self._EXTRA_EDGES
+            while True:
+                (value,) = struct.unpack_from(
+                    ">I", self._data, self._edges_offset + 4 * edge
+                )
+                parents.append(self._oid(value & ~self._LAST_EDGE))
+                if value & self._LAST_EDGE:
+                    break
+                edge += 1
+        elif parent2 != self._PARENT_NONE:
+            parents.append(self._oid(parent2))
+        return _Commit(
+            tree=tree,
+            parents=tuple(parents),
+            timestamp=timestamp,
+            generation=generation,
+        )
+
+
+class GitObjectReader:
+    """Read commit history directly from a repository's ``.git`` directory.
+
+    Parameters
+    ----------
+    common_dir
+        The repository's common Git directory (the ``.git`` directory, or
+        the main repository's ``.git`` directory for a linked worktree),
+        which holds the ``objects`` directory and the ``shallow`` file.
+    tree_cache_size
+        Number of parsed tree objects to keep in memory. Consecutive commits
+        share most of their trees, so a modest cache avoids re-reading them
+        when diffing a commit against its parent.
+    """
+
+    def __init__(
+        self, common_dir: Path, *, tree_cache_size: int = 4096
+    ) -> None:
+        objects_dir = common_dir / "objects"
+        if not objects_dir.is_dir():
+            raise GitObjectReaderError(
+                f"{common_dir} has no objects directory."
+            )
+        self._odb = GitDB(str(objects_dir))
+        self._graph = CommitGraph.open(objects_dir / "info" / "commit-graph")
+        self._shallow_file = common_dir / "shallow"
+        self._shallow = self._read_shallow_commits()
+        self._commits: dict[bytes, _Commit] = {}
+        self._read_tree = lru_cache(maxsize=tree_cache_size)(self._parse_tree)
+
+    @property
+    def has_commit_graph(self) -> bool:
+        """Whether commits are read from a commit-graph file."""
+        return self._graph is not None
+
+    @property
+    def is_shallow(self) -> bool:
+        """Whether the repository is a shallow clone."""
+        return bool(self._shallow)
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Whether the commit ``ancestor`` is an ancestor of (or the same
+        commit as) ``descendant``.
+
+        Parameters
+        ----------
+        ancestor
+            Hexadecimal SHA of the possible ancestor.
+        descendant
+            Hexadecimal SHA of the possible descendant.
+
+        Returns
+        -------
+        bool
+            Whether ``ancestor`` is reachable from ``descendant``. A commit
+            that isn't in the object database is not an ancestor.
+        """
+        try:
+            # The ancestor is reachable from the descendant when no commit
+            # is left in the ``descendant..ancestor`` range.
+            return not self._walk_range(
+                bytes.fromhex(ancestor), bytes.fromhex(descendant)
+            )
+        except (ValueError, GitObjectReaderError):
+            return False
+
+    def scan_history(
+        self, head: str, since: str | None = None
+    ) -> dict[str, tuple[str, datetime]]:
+        """Map each path touched in the history to its newest commit.
+
+        The result matches ``git log --name-only --no-renames
+        --first-parent --diff-merges=first-parent`` over the same commits:
+        only the first-parent chain of ``head`` is walked, and each commit
+        is compared with its first parent (a root commit, or the boundary
+        commit of a shallow clone, with an empty tree). A merge commit so
+        contributes every path that it changes relative to its first
+        parent, including changes made only in the merge (such as conflict
+        resolutions), while changes that the merge discarded from the merged
+        branches are never seen.
+
+        Parameters
+        ----------
+        head
+            Hexadecimal SHA of the commit whose history is walked.
+        since
+            Hexadecimal SHA of a commit whose history is excluded, like
+            ``git log since..head``.
+
+        Returns
+        -------
+        dict
+            Mapping of repository-relative POSIX paths to the hexadecimal
+            SHA and timezone-aware committer datetime (in the commit's own
+            timezone offset) of their newest commits.
+
+        Raises
+        ------
+        GitObjectReaderError
+            Raised if a commit or tree can't be read.
+        """
+        try:
+            head_oid = bytes.fromhex(head)
+            since_oid = bytes.fromhex(since) if since else None
+        except ValueError as e:
+            raise GitObjectReaderError(f"Invalid commit SHA: {e}") from e
+        commits_in_range = (
+            self._walk_first_parents(head_oid)
+            if since_oid is None
+            else self._walk_range(head_oid, since_oid, first_parent=True)
+        )
+
+        # Track the newest commit for each path by commit time, and only
+        # decode a commit's timezone offset for the commits that won.
+        newest: dict[bytes, tuple[int, bytes]] = {}
+        for oid in commits_in_range:
+            commit = self._get_commit(oid)
+            parents = self._get_parents(oid, commit)
+            parent_tree = (
+                self._get_commit(parents[0]).tree if parents else None
+            )
+            for path in self._diff_trees(parent_tree, commit.tree, b""):
+                previous = newest.get(path)
+                if previous is None or commit.timestamp > previous[0]:
+                    newest[path] = (commit.timestamp, oid)
+
+        commits: dict[bytes, tuple[str, datetime]] = {}
+        index: dict[str, tuple[str, datetime]] = {}
+        for path, (_, oid) in newest.items():
+            if oid not in commits:
+                commits[oid] = (oid.hex(), self._get_committed_datetime(oid))
+            index[path.decode("utf-8", "surrogateescape")] = commits[oid]
+        return index
+
+    def _read_shallow_commits(self) -> frozenset[bytes]:
+        """Read the boundary commits of a shallow clone."""
+        try:
+            text = self._shallow_file.read_text(encoding="ascii")
+        except OSError:
+            return frozenset()
+        return frozenset(bytes.fromhex(line) for line in text.split())
+
+    def _get_parents(self, oid: bytes, commit: _Commit) -> tuple[bytes, ...]:
+        """Get a commit's parents, treating the boundary commits of a
+        shallow clone as root commits (as Git does).
+        """
+        if oid in self._shallow:
+            return ()
+        return commit.parents
+
+    def _walk_first_parents(self, head: bytes) -> Iterable[bytes]:
+        """Yield the commits of the first-parent chain of ``head``."""
+        oid: bytes | None = head
+        while oid is not None:
+            yield oid
+            parents = self._get_parents(oid, self._get_commit(oid))
+            oid = parents[0] if parents else None
+
+    def _walk_range(  # noqa: C901
+        self, head: bytes, since: bytes, *, first_parent: bool = False
+    ) -> list[bytes]:
+        """Get the commits reachable from ``head`` but not from ``since``,
+        like ``git rev-list since..head`` (with ``--first-parent`` if
+        ``first_parent`` is set, so only the first parents of the included
+        commits are followed).
+
+        Both histories are walked together, highest commit first, marking
+        the commits reachable from ``since`` as excluded, and the walk stops
+        once no excluded commit left to visit can reach an included one.
+        The history below both commits is never read, so the cost follows
+        the size of the range rather than of the whole history.
+
+        Commits are ordered by their commit-graph generation numbers, which
+        strictly decrease from a commit to its parents, so the range is
+        exact. Commits that the graph doesn't cover are visited before any
+        that it does, and without a commit-graph the walk falls back to
+        commit times, which, like ``git rev-list``, assumes that a commit
+        isn't older than its parents.
+        """
+        excluded_flags: dict[bytes, bool] = {since: True}
+        if head not in excluded_flags:
+            excluded_flags[head] = False
+        # A max-heap of the commits to visit, with the flag each was queued
+        # with, and a min-heap of the included commits' keys.
+        queue: list[tuple[float, bytes, bool]] = []
+        included: list[tuple[float, bytes]] = []
+        queued_included = 0
+
+        def enqueue(oid: bytes, *, excluded: bool) -> None:
+            nonlocal queued_included
+            key = self._walk_key(oid)
+            heapq.heappush(queue, (-key, oid, excluded))
+            if not excluded:
+                queued_included += 1
+                heapq.heappush(included, (key, oid))
+
+        for oid, excluded in excluded_flags.items():
+            enqueue(oid, excluded=excluded)
+        visited: set[tuple[bytes, bool]] = set()
+        while queue:
+            if queued_included == 0:
+                # Only excluded commits are left to visit: stop once none of
+                # them is high enough to reach a commit still included.
+                while included and excluded_flags[included[0][1]]:
+                    heapq.heappop(included)
+                if not included or -queue[0][0] < included[0][0]:
+                    break
+            _, oid, excluded = heapq.heappop(queue)
+            if not excluded:
+                queued_included -= 1
+            if excluded != excluded_flags[oid] or (oid, excluded) in visited:
+                # Marked as excluded after it was queued as included.
+                continue
+            visited.add((oid, excluded))
+            parents = self._get_parents(oid, self._get_commit(oid))
+            if first_parent and not excluded:
+                parents = parents[:1]
+            for parent in parents:
+                if parent not in excluded_flags:
+                    excluded_flags[parent] = excluded
+                    enqueue(parent, excluded=excluded)
+                elif excluded and not excluded_flags[parent]:
+                    excluded_flags[parent] = True
+                    enqueue(parent, excluded=True)
+        return [
+            oid for oid, excluded in excluded_flags.items() if not excluded
+        ]
+
+    def _walk_key(self, oid: bytes) -> float:
+        """Get the key that orders a commit in `_walk_range`, which is never
+        lower than the keys of the commit's parents.
+        """
+        commit = self._get_commit(oid)
+        if self._graph is None:
+            return commit.timestamp
+        if commit.generation is None:
+            return math.inf
+        return commit.generation
+
+    def _read_object(self, oid: bytes, expected_type: bytes) -> bytes:
+        """Read and decompress an object from the object database."""
+        try:
+            stream = self._odb.stream(oid)
+            object_type = stream.type
+            data = stream.read()
+        except (ODBError, OSError, ValueError) as e:
+            raise GitObjectReaderError(
+                f"Cannot read Git object {oid.hex()}: {e}"
+            ) from e
+        if object_type != expected_type:
+            raise GitObjectReaderError(
+                f"Git object {oid.hex()} is a {object_type.decode()}, "
+                f"not a {expected_type.decode()}."
+            )
+        return data
+
+    def _get_commit(self, oid: bytes) -> _Commit:
+        """Get a commit, from the commit-graph when it covers the commit and
+        otherwise from the object database.
+        """
+        commit = self._commits.get(oid)
+        if commit is None:
+            if self._graph is not None:
+                commit = self._graph.get(oid)
+            if commit is None:
+                tree, parents, timestamp, _ = self._parse_commit(oid)
+                commit = _Commit(tree, parents, timestamp)
+            self._commits[oid] = commit
+        return commit
+
+    def _get_committed_datetime(self, oid: bytes) -> datetime:
+        """Get a commit's committer datetime in its own timezone offset.
+
+        The commit-graph only records the time, not the offset, so the
+        commit object is read for the offset.
+        """
+        _, _, timestamp, offset = self._parse_commit(oid)
+        return datetime.fromtimestamp(timestamp, timezone(offset))
+
+    def _parse_commit(
+        self, oid: bytes
+    ) -> tuple[bytes, tuple[bytes, ...], int, timedelta]:
+        """Parse a commit object's tree, parents, committer time, and
+        committer timezone offset.
+        """
+        data = self._read_object(oid, b"commit")
+        tree: bytes | None = None
+        parents: list[bytes] = []
+        committer: bytes | None = None
+        # Header lines end at the first blank line. Continuation lines of
+        # multi-line headers (such as gpgsig) start with a space.
+        for line in data.split(b"\n\n", 1)[0].split(b"\n"):
+            key, _, value = line.partition(b" ")
+            if key == b"tree":
+                tree = bytes.fromhex(value.decode("ascii"))
+            elif key == b"parent":
+                parents.append(bytes.fromhex(value.decode("ascii")))
+            elif key == b"committer":
+                committer = value
+        if tree is None or committer is None:
+            raise GitObjectReaderError(f"Malformed commit {oid.hex()}.")
+        try:
+            # "Name <email> <seconds> <+hhmm>"
+            _, seconds, zone = committer.rsplit(b" ", 2)
+            timestamp = int(seconds)
+            sign = -1 if zone.startswith(b"-") else 1
+            hours, minutes = int(zone[1:3]), int(zone[3:5])
+        except ValueError as e:
+            raise GitObjectReaderError(
+                f"Malformed committer in commit {oid.hex()}."
+            ) from e
+        offset = sign * timedelta(hours=hours, minutes=minutes)
+        return tree, tuple(parents), timestamp, offset
+
+    def _parse_tree(self, oid: bytes) -> dict[bytes, tuple[int, bytes]]:
+        """Parse a tree object into a mapping of entry names to their modes
+        and object IDs.
+        """
+        data = self._read_object(oid, b"tree")
+        entries: dict[bytes, tuple[int, bytes]] = {}
+        position = 0
+        # Each entry is "<octal mode> <name>\0<binary object ID>".
+        while position < len(data):
+            space = data.index(b" ", position)
+            nul = data.index(b"\0", space)
+            mode = int(data[position:space], 8)
+            entry_oid = data[nul + 1 : nul + 1 + _OID_LENGTH]
+            entries[data[space + 1 : nul]] = (mode, entry_oid)
+            position = nul + 1 + _OID_LENGTH
+        return entries
+
+    def _diff_trees(
+        self, old: bytes | None, new: bytes | None, prefix: bytes
+    ) -> list[bytes]:
+        """List the paths of the non-tree entries that differ between two
+        trees (`None` standing for an empty tree).
+
+        Like ``git diff --name-only --no-renames``, an added, deleted, or
+        modified file is listed by its path, as is a file whose mode or type
+        changed. Subtrees with identical object IDs are skipped without
+        being read.
+        """
+        if old == new:
+            return []
+        old_entries = self._read_tree(old) if old is not None else {}
+        new_entries = self._read_tree(new) if new is not None else {}
+        paths: list[bytes] = []
+        for name in old_entries.keys() | new_entries.keys():
+            old_entry = old_entries.get(name)
+            new_entry = new_entries.get(name)
+            if old_entry == new_entry:
+                continue
+            path = prefix + name
+            old_subtree = _subtree(old_entry)
+            new_subtree = _subtree(new_entry)
+            if old_subtree is not None or new_subtree is not None:
+                paths.extend(
+                    self._diff_trees(old_subtree, new_subtree, path + b"/")
+                )
+            if (old_entry is not None and old_subtree is None) or (
+                new_entry is not None and new_subtree is None
+            ):
+                paths.append(path)
+        return paths
+
+
+def _subtree(entry: tuple[int, bytes] | None) -> bytes | None:
+    """Get the object ID of a tree entry if it is a subtree."""
+    if entry is not None and entry[0] == _TREE_MODE:
+        return entry[1]
+    return None
@@ -3,21 +3,39 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
 
 import requests
+from pydantic import Base64Bytes, BaseModel, Field, ValidationError
+from urllib3.util.request import ACCEPT_ENCODING as URLLIB3_ACCEPT_ENCODING
 
-from documenteer._requestsutils import requests_retry_session
+from documenteer._requestsutils import (
+    max_retries,
+    requests_retry_session,
+    response_retries,
+    retries_exhausted,
+)
+from documenteer.storage.inventorycache import write_chunks_atomically
 
 __all__ = [
     "DEFAULT_BASE_URL",
     "TOKEN_ENV_VAR",
+    "IntersphinxCacheCircuitOpenError",
     "IntersphinxCacheClient",
     "IntersphinxCacheError",
     "IntersphinxCacheServerError",
     "IntersphinxCacheUnauthorizedError",
     "IntersphinxCacheUnreachableError",
+    "InventoryBatchItem",
+    "InventoryBatchRequest",
+    "InventoryBatchResponse",
     "InventoryFetchResult",
+    "InventoryRequest",
 ]
 
 DEFAULT_BASE_URL = "https://roundtable.lsst.cloud/ook"
@@ -26,6 +44,15 @@ DEFAULT_BASE_URL = "https://roundtable.lsst.cloud/ook"
 TOKEN_ENV_VAR = "OOK_TOKEN"
 """Environment variable holding the bearer token for the Ook API."""
 
+_ACCEPT_ENCODING = (
+    "zstd, gzip" if "zstd" in URLLIB3_ACCEPT_ENCODING.split(",") else "gzip"
+)
+"""The transfer compression requested from Ook: gzip, and zstd if urllib3
+can decode it (with the ``zstandard`` package installed)."""
+
+_CHUNK_SIZE = 64 * 1024
+"""Size of the chunks that a streamed inventory is written in."""
+
 
 @dataclass(frozen=True)
 class InventoryFetchResult:
@@ -33,10 +60,13 @@ class InventoryFetchResult:
 
     A ``304 Not Modified`` response is signaled by ``not_modified`` being
     `True` with ``content`` `None`; a ``200 OK`` carries the fetched bytes in
-    ``content`` with ``not_modified`` `False`. ``etag`` is the entity tag the
-    caller should persist alongside the inventory: on a 200 it is the ETag
-    from the response (or `None` when the server sent no ``ETag`` header), and
-    on a 304 it is the ETag that was revalidated.
+    ``content`` with ``not_modified`` `False`, unless the inventory was
+    streamed to a file, in which case ``content`` is `None` and ``path`` is
+    the file. ``etag`` is the entity tag the caller should persist alongside
+    the inventory: on a 200 it is the ETag from the response (or `None` when
+    the server sent no ``ETag`` header), and on a 304 it is the ETag that was
+    revalidated. ``elapsed`` and ``retries`` describe the request that
+    answered it, and aren't compared.
     """
 
     not_modified: bool
@@ -48,10 +78,91 @@ class InventoryFetchResult:
     etag: str | None
     """The entity tag to persist, or `None` when the server sent none."""
 
+    path: Path | None = None
+    """The file the inventory was streamed to on a 200, if the caller gave
+    one.
+    """
+
+    last_modified: str | None = None
+    """The ``Last-Modified`` date to persist, or `None` (Ook answers with
+    entity tags only; see `OriginInventoryClient`).
+    """
+
+    elapsed: float = field(default=0.0, compare=False)
+    """Seconds the request took, including its retries and reading the
+    body (for a batch request, the whole batch).
+    """
+
+    retries: int = field(default=0, compare=False)
+    """Number of times the request was retried."""
+
+
+class InventoryRequest(BaseModel):
+    """An inventory to fetch, with the entity tag of a cached copy."""
+
+    url: str = Field(description="The origin ``objects.inv`` URL.")
+
+    etag: str | None = Field(
+        None,
+        description=(
+            "Entity tag of a previously cached copy, so an unchanged "
+            "inventory can be answered with a 304 and no body."
+        ),
+    )
+
+
+class InventoryBatchRequest(BaseModel):
+    """The payload for revalidating several inventories in one request."""
+
+    inventories: list[InventoryRequest] = Field(
+        description="The inventories to fetch or revalidate."
+    )
+
+
+class InventoryBatchItem(BaseModel):
+    """The result for one inventory within a batch response."""
+
+    url: str = Field(description="The origin ``objects.inv`` URL.")
+
+    status: int = Field(
+        description=(
+            "HTTP status the single-inventory endpoint would have returned "
+            "for this inventory (200, 304, or an error status)."
+        )
+    )
+
+    etag: str | None = Field(
+        None, description="Entity tag of the inventory, on a 200."
+    )
+
+    content: Base64Bytes | None = Field(
+        None, description="Base64-encoded inventory bytes, on a 200."
+    )
+
+    detail: str | None = Field(
+        None, description="Description of the failure, on an error status."
+    )
+
+
+class InventoryBatchResponse(BaseModel):
+    """The response to a batch revalidation request."""
+
+    inventories: list[InventoryBatchItem] = Field(
+        description="Per-inventory results, in the order requested."
+    )
+
 
 class IntersphinxCacheError(ValueError):
     """An error interacting with Ook's intersphinx inventory cache."""
 
+    elapsed: float = 0.0
+    """Seconds the failed request took, including its retries (set by
+    `IntersphinxCacheClient` for an error from an inventory request).
+    """
+
+    retries: int = 0
+    """Number of times the failed request was retried."""
+
 
 class IntersphinxCacheUnreachableError(IntersphinxCacheError):
     """The Ook intersphinx inventory cache could not be reached.
@@ -62,6 +173,16 @@ class IntersphinxCacheUnreachableError(IntersphinxCacheError):
     """
 
 
+class IntersphinxCacheCircuitOpenError(IntersphinxCacheUnreachableError):
+    """The request to the Ook intersphinx inventory cache was skipped
+    because the client's circuit breaker is open.
+
+    Raised without contacting the service after several consecutive
+    requests found it unreachable or failing (see the
+    ``circuit_breaker_threshold`` parameter of `IntersphinxCacheClient`).
+    """
+
+
 class IntersphinxCacheUnauthorizedError(IntersphinxCacheError):
     """The request to the Ook intersphinx inventory cache was not authorized.
 
@@ -97,6 +218,18 @@ class IntersphinxCacheClient:
         An existing requests session to use. By default a session with
         retries is created with
         `documenteer._requestsutils.requests_retry_session`.
+    circuit_breaker_threshold
+        Number of consecutive requests that find the service unreachable or
+        failing (`IntersphinxCacheUnreachableError` or
+        `IntersphinxCacheServerError`) after which the client stops
+        contacting the service and raises
+        `IntersphinxCacheCircuitOpenError` instead. Each such request pays
+        the session's retries and timeout, so this bounds what an outage
+        costs. ``0`` (the default) disables the circuit breaker.
+    batch_supported
+        Whether to try the service's batch endpoint. Pass `False` when an
+        earlier client found that the service has none (see
+        `batch_supported`), so that no request is spent finding out again.
     """
 
     def __init__(
@@ -105,15 +238,261 @@ class IntersphinxCacheClient:
         base_url: str = DEFAULT_BASE_URL,
         token: str | None = None,
         session: requests.Session | None = None,
+        circuit_breaker_threshold: int = 0,
+        batch_supported: bool = True,
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._token = token if token is not None else os.getenv(TOKEN_ENV_VAR)
         self._session = (
             session if session is not None else requests_retry_session()
         )
+        # Cleared when the service reports that it has no batch endpoint, so
+        # later calls go straight to per-inventory requests.
+        self._batch_supported = batch_supported
+        self._circuit_breaker_threshold = circuit_breaker_threshold
+        # Consecutive requests that found the service unreachable or
+        # failing, counted across the threads of an individual fetch.
+        self._consecutive_failures = 0
+        self._failures_lock = threading.Lock()
+
+    @property
+    def batch_supported(self) -> bool:
+        """Whether the batch endpoint is tried, which stops once the service
+        answers that it has none.
+        """
+        return self._batch_supported
+
+    @property
+    def circuit_open(self) -> bool:
+        """Whether the circuit breaker is open, so requests are skipped."""
+        return (
+            self._circuit_breaker_threshold > 0
+            and self._consecutive_failures >= self._circuit_breaker_threshold
+        )
+
+    def _record_outcome(self, error: IntersphinxCacheError | None) -> None:
+        """Count a request towards the circuit breaker.
+
+        A request that found the service unreachable or failing adds to the
+        consecutive failures, and any other response from the service
+        (including an error such as a 404) resets them.
+        """
+        with self._failures_lock:
+            if isinstance(
+                error,
+                IntersphinxCacheUnreachableError | IntersphinxCacheServerError,
+            ):
+                self._consecutive_failures += 1
+            else:
+                self._consecutive_failures = 0
+
+    def _check_circuit(self, api_url: str) -> None:
+        """Raise `IntersphinxCacheCircuitOpenError` if the circuit breaker
+        is open.
+        """
+        if self.circuit_open:
+            raise IntersphinxCacheCircuitOpenError(
+                f"Skipped the Ook intersphinx inventory cache at {api_url} "
+                f"after {self._consecutive_failures} consecutive failed "
+                f"requests."
+            )
+
+    def get_inventories(
+        self,
+        inventories: Sequence[InventoryRequest],
+        *,
+        max_workers: int = 1,
+        destinations: Sequence[Path] | None = None,
+    ) -> list[InventoryFetchResult | IntersphinxCacheError]:
+        """Fetch or revalidate several cached inventories, in one request
+        when the service supports it.
+
+        The inventories are sent to the service's batch endpoint
+        (``POST /intersphinx/inventories``) in a single request, and each is
+        answered as `get_inventory` would answer it, so a build whose
+        inventories are all unchanged needs one round-trip. If the batch
+        request fails for any reason (including a service without the batch
+        endpoint), each inventory is instead requested individually with
+        `get_inventory`, so batching never makes a fetch fail that would
+        otherwise have succeeded.
+
+        Parameters
+        ----------
+        inventories
+            The inventories to fetch, with the entity tags of any cached
+            copies.
+        max_workers
+            Maximum number of individual requests in flight at once when
+            falling back to per-inventory requests.
+        destinations
+            For each requested inventory, the file that an individually
+            requested inventory is streamed to (see `get_inventory`).
+            Inventories in a batch response are returned as ``content``, and
+            the caller writes them.
+
+        Returns
+        -------
+        list
+            For each requested inventory, in order, either its fetch result
+            or the `IntersphinxCacheError` describing why it couldn't be
+            fetched.
+
+        Notes
+        -----
+        With a circuit breaker (see ``circuit_breaker_threshold``), a failed
+        batch request counts as one failure, and once the breaker opens the
+        remaining inventories fail immediately with
+        `IntersphinxCacheCircuitOpenError`. Requests that are already in
+        flight when it opens still finish.
+        """
+        if len(inventories) > 1 and self._batch_supported:
+            try:
+                return self._get_inventories_batch(inventories)
+            except IntersphinxCacheError:
+                pass
+        return self._get_inventories_individually(
+            inventories,
+            max_workers,
+            destinations
+            if destinations is not None
+            else [None] * len(inventories),
+        )
+
+    def _get_inventories_batch(
+        self, inventories: Sequence[InventoryRequest]
+    ) -> list[InventoryFetchResult | IntersphinxCacheError]:
+        """Fetch inventories with a single request to the batch endpoint.
+
+        Raises
+        ------
+        IntersphinxCacheError
+            Raised if the batch request as a whole fails, or its response
+            doesn't answer each requested inventory in order.
+        """
+        if not self._token:
+            raise IntersphinxCacheUnauthorizedError(
+                "No Ook API token is available. Set the "
+                f"{TOKEN_ENV_VAR} environment variable."
+            )
+        api_url = f"{self._base_url}/intersphinx/inventories"
+        self._check_circuit(api_url)
+        start = time.monotonic()
+        try:
+            results, retries = self._post_inventories_batch(
+                api_url, inventories
+            )
+        except IntersphinxCacheError as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        elapsed = time.monotonic() - start
+        return [
+            _with_metrics(result, elapsed=elapsed, retries=retries)
+            for result in results
+        ]
+
+    def _post_inventories_batch(
+        self, api_url: str, inventories: Sequence[InventoryRequest]
+    ) -> tuple[list[InventoryFetchResult | IntersphinxCacheError], int]:
+        """Send the batch request and parse its response (see
+        `_get_inventories_batch`), returning the results and the number of
+        times the request was retried.
+        """
+        payload = InventoryBatchRequest(inventories=list(inventories))
+        try:
+            r = self._session.post(
+                api_url,
+                headers={
+                    "Authorization": f"Bearer {self._token}",
+                    "Accept-Encoding": _ACCEPT_ENCODING,
+                },
+                json=payload.model_dump(),
+                timeout=30.0,
+            )
+        except requests.RequestException as e:
+            raise IntersphinxCacheUnreachableError(
+                f"Could not reach the Ook intersphinx inventory cache at "
+                f"{api_url}: {e}"
+            ) from e
+        if r.status_code in (404, 405, 501):
+            # An Ook that predates the batch endpoint.
+            self._batch_supported = False
+            raise IntersphinxCacheError(
+                f"The Ook intersphinx inventory cache at {api_url} doesn't "
+                f"support batch requests (HTTP {r.status_code})."
+            )
+        if r.status_code >= 500:
+            raise IntersphinxCacheServerError(
+                f"Server error from the Ook intersphinx inventory cache at "
+                f"{api_url} (HTTP {r.status_code})."
+            )
+        if r.status_code != 200:
+            raise IntersphinxCacheError(
+                f"Error from the Ook intersphinx inventory cache at "
+                f"{api_url} (HTTP {r.status_code})."
+            )
+        try:
+            response = InventoryBatchResponse.model_validate_json(r.text)
+        except ValidationError as e:
+            raise IntersphinxCacheError(
+                f"Malformed batch response from the Ook intersphinx "
+                f"inventory cache at {api_url}: {e}"
+            ) from e
+        items = response.inventories
+        if len(items) != len(inventories) or any(
+            item.url != inventory.url
+            for item, inventory in zip(items, inventories, strict=True)
+        ):
+            raise IntersphinxCacheError(
+                f"The batch response from the Ook intersphinx inventory cache "
+                f"at {api_url} doesn't match the requested inventories."
+            )
+        return [
+            _parse_batch_item(api_url, item, inventory)
+            for item, inventory in zip(items, inventories, strict=True)
+        ], response_retries(r)
+
+    def _get_inventories_individually(
+        self,
+        inventories: Sequence[InventoryRequest],
+        max_workers: int,
+        destinations: Sequence[Path | None],
+    ) -> list[InventoryFetchResult | IntersphinxCacheError]:
+        """Fetch inventories with one request each, ``max_workers`` at a
+        time.
+        """
+
+        def fetch(
+            inventory: InventoryRequest, destination: Path | None
+        ) -> InventoryFetchResult | IntersphinxCacheError:
+            try:
+                return self.get_inventory(
+                    inventory.url,
+                    etag=inventory.etag,
+                    destination=destination,
+                )
+            except IntersphinxCacheError as e:
+                return e
+
+        if len(inventories) <= 1 or max_workers <= 1:
+            return [
+                fetch(inventory, destination)
+                for inventory, destination in zip(
+                    inventories, destinations, strict=True
+                )
+            ]
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(inventories)),
+            thread_name_prefix="intersphinxcache",
+        ) as executor:
+            return list(executor.map(fetch, inventories, destinations))
 
     def get_inventory(
-        self, url: str, *, etag: str | None = None
+        self,
+        url: str,
+        *,
+        etag: str | None = None,
+        destination: Path | None = None,
     ) -> InventoryFetchResult:
         """Fetch the cached intersphinx inventory for an origin URL.
 
@@ -126,6 +505,12 @@ class IntersphinxCacheClient:
             An entity tag from a previously cached copy. When provided, the
             request carries an ``If-None-Match`` header so an unchanged
             inventory can be answered with ``304 Not Modified`` and no body.
+        destination
+            A file to stream a downloaded inventory to, instead of returning
+            its bytes. The response is written in chunks to a temporary file
+            that is renamed to ``destination`` once it's complete, so the
+            inventory is never held in memory and readers of
+            ``destination`` never see a partial inventory.
 
         Returns
         -------
@@ -145,8 +530,18 @@ class IntersphinxCacheClient:
         IntersphinxCacheServerError
             Raised if the service returns a server error (HTTP 5xx),
             including Ook's 502 for a cold miss with the origin down.
+        IntersphinxCacheCircuitOpenError
+            Raised without a request if the circuit breaker is open (see
+            ``circuit_breaker_threshold``).
         IntersphinxCacheError
-            Raised for any other non-2xx response.
+            Raised for any other non-2xx response, or if the inventory can't
+            be written to ``destination``.
+
+        Notes
+        -----
+        The request asks for gzip (and, if urllib3 can decode it, zstd)
+        transfer compression, which the response is decoded from as it's
+        read.
         """
         if not self._token:
             raise IntersphinxCacheUnauthorizedError(
@@ -154,7 +549,36 @@ class IntersphinxCacheClient:
                 f"{TOKEN_ENV_VAR} environment variable."
             )
         api_url = f"{self._base_url}/intersphinx/inventory"
-        headers = {"Authorization": f"Bearer {self._token}"}
+        self._check_circuit(api_url)
+        start = time.monotonic()
+        try:
+            result = self._request_inventory(
+                api_url, url, etag=etag, destination=destination
+            )
+        except IntersphinxCacheError as e:
+            e.elapsed = time.monotonic() - start
+            if retries_exhausted(e.__cause__):
+                e.retries = max_retries(self._session, api_url)
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return replace(result, elapsed=time.monotonic() - start)
+
+    def _request_inventory(
+        self,
+        api_url: str,
+        url: str,
+        *,
+        etag: str | None,
+        destination: Path | None,
+    ) -> InventoryFetchResult:
+        """Send a single-inventory request and read its response (see
+        `get_inventory`).
+        """
+        headers = {
+            "Authorization": f"Bearer {self._token}",
+            "Accept-Encoding": _ACCEPT_ENCODING,
+        }
         if etag is not None:
             # Conditional revalidation: an unchanged inventory is answered
             # with 304 and transfers no body.
@@ -165,6 +589,7 @@ class IntersphinxCacheClient:
                 headers=headers,
                 params={"url": url},
                 timeout=30.0,
+                stream=True,
             )
         except requests.exceptions.RetryError as e:
             # Retries were exhausted against a retryable 5xx status
@@ -180,6 +605,30 @@ class IntersphinxCacheClient:
                 f"Could not reach the Ook intersphinx inventory cache at "
                 f"{api_url} for {url}: {e}"
             ) from e
+        # The response is streamed, so it's closed once its body is read.
+        with r:
+            retries = response_retries(r)
+            try:
+                result = self._handle_inventory_response(
+                    r, api_url, url, etag=etag, destination=destination
+                )
+            except IntersphinxCacheError as e:
+                e.retries = retries
+                raise
+        return replace(result, retries=retries)
+
+    def _handle_inventory_response(
+        self,
+        r: requests.Response,
+        api_url: str,
+        url: str,
+        *,
+        etag: str | None,
+        destination: Path | None,
+    ) -> InventoryFetchResult:
+        """Convert the response to a single-inventory request to its fetch
+        result, or raise the error it signals (see `get_inventory`).
+        """
         if r.status_code in (401, 403):
             raise IntersphinxCacheUnauthorizedError(
                 f"Not authorized to access the Ook intersphinx inventory "
@@ -210,8 +659,94 @@ class IntersphinxCacheClient:
                 f"Error from the Ook intersphinx inventory cache at "
                 f"{api_url} for {url}: {e}"
             ) from e
+        return self._read_inventory(r, api_url, url, destination)
+
+    def _read_inventory(
+        self,
+        r: requests.Response,
+        api_url: str,
+        url: str,
+        destination: Path | None,
+    ) -> InventoryFetchResult:
+        """Read the inventory from a successful response, streaming it to
+        ``destination`` if it's given.
+        """
+        response_etag = r.headers.get("ETag")
+        try:
+            if destination is None:
+                return InventoryFetchResult(
+                    not_modified=False, content=r.content, etag=response_etag
+                )
+            write_chunks_atomically(
+                destination, r.iter_content(chunk_size=_CHUNK_SIZE)
+            )
+        except requests.RequestException as e:
+            # Checked first: requests exceptions are also OSErrors.
+            raise IntersphinxCacheUnreachableError(
+                f"Could not download the inventory for {url} from the Ook "
+                f"intersphinx inventory cache at {api_url}: {e}"
+            ) from e
+        except OSError as e:
+            raise IntersphinxCacheError(
+                f"Could not write the inventory for {url} from the Ook "
+                f"intersphinx inventory cache to {destination}: {e}"
+            ) from e
         return InventoryFetchResult(
             not_modified=False,
-            content=r.content,
-            etag=r.headers.get("ETag"),
+            content=None,
+            etag=response_etag,
+            path=destination,
+        )
+
+
+def _with_metrics(
+    result: InventoryFetchResult | IntersphinxCacheError,
+    *,
+    elapsed: float,
+    retries: int,
+) -> InventoryFetchResult | IntersphinxCacheError:
+    """Set the request metrics of a batch item's result."""
+    if isinstance(result, IntersphinxCacheError):
+        result.elapsed = elapsed
+        result.retries = retries
+        return result
+    return replace(result, elapsed=elapsed, retries=retries)
+
+
+def _parse_batch_item(
+    api_url: str, item: InventoryBatchItem, inventory: InventoryRequest
+) -> InventoryFetchResult | IntersphinxCacheError:
+    """Convert one batch response item to the result, or error, that
+    `IntersphinxCacheClient.get_inventory` would give for it.
+    """
+    detail = f" ({item.detail})" if item.detail else ""
+    if item.status == 304:
+        # As with a single conditional request, echo back the ETag the
+        # inventory was revalidated with.
+        return InventoryFetchResult(
+            not_modified=True, content=None, etag=inventory.etag
+        )
+    if item.status == 200:
+        if item.content is None:
+            return IntersphinxCacheError(
+                f"The Ook intersphinx inventory cache at {api_url} returned "
+                f"no content for {item.url}."
+            )
+        return InventoryFetchResult(
+            not_modified=False, content=item.content, etag=item.etag
+        )
+    if item.status in (401, 403):
+        return IntersphinxCacheUnauthorizedError(
+            f"Not authorized to access {item.url} through the Ook "
+            f"intersphinx inventory cache at {api_url} "
+            f"(HTTP {item.status}){detail}."
+        )
+    if item.status >= 500:
+        return IntersphinxCacheServerError(
+            f"Server error from the Ook intersphinx inventory cache at "
+            f"{api_url} for {item.url} (HTTP {item.status}){detail}."
         )
+    return IntersphinxCacheError(
+        f"Error from the Ook intersphinx inventory cache at {api_url} for "
+        f"{item.url} (HTTP {item.status}){detail}."
+    )
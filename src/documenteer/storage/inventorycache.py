@@ -0,0 +1,348 @@
+"""A content-addressed intersphinx inventory cache shared between builds."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+__all__ = [
+    "DEFAULT_MAX_SIZE",
+    "SHARED_CACHE_DIR_ENV_VAR",
+    "SharedInventory",
+    "SharedInventoryCache",
+    "default_shared_cache_dir",
+    "resolve_shared_cache_dir",
+    "write_chunks_atomically",
+    "write_file_atomically",
+]
+
+SHARED_CACHE_DIR_ENV_VAR = "DOCUMENTEER_INTERSPHINX_CACHE_DIR"
+"""Environment variable that enables the shared inventory cache at the given
+directory, overriding the project's configuration.
+"""
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+"""Default size limit of the shared inventory cache, in bytes."""
+
+_CHUNK_SIZE = 64 * 1024
+"""Size of the chunks that files are read in."""
+
+_ORPHAN_GRACE_PERIOD = 3600
+"""Seconds an unreferenced blob is kept, so eviction never deletes a blob
+that a concurrent build has written but not yet indexed.
+"""
+
+
+def default_shared_cache_dir() -> Path:
+    """Return the default shared inventory cache directory.
+
+    This is :file:`documenteer/intersphinx` in the user's XDG cache
+    directory (``$XDG_CACHE_HOME``, or :file:`~/.cache` if it's unset).
+    """
+    xdg_cache_home = os.getenv("XDG_CACHE_HOME")
+    base = (
+        Path(xdg_cache_home)
+        if xdg_cache_home and Path(xdg_cache_home).is_absolute()
+        else Path.home() / ".cache"
+    )
+    return base / "documenteer" / "intersphinx"
+
+
+def resolve_shared_cache_dir(
+    configured: str | None, *, base: Path
+) -> Path | None:
+    """Return the shared inventory cache directory of a project, or `None`
+    if the project doesn't use one.
+
+    The ``DOCUMENTEER_INTERSPHINX_CACHE_DIR`` environment variable takes
+    precedence over the configured directory, so a CI runner can share one
+    cache across every project it builds.
+
+    Parameters
+    ----------
+    configured
+        The configured directory, if any
+        (``documenteer_intersphinx_cache_shared_dir``).
+    base
+        The directory that a relative configured path is relative to.
+    """
+    shared_dir = os.getenv(SHARED_CACHE_DIR_ENV_VAR) or configured
+    if not shared_dir:
+        return None
+    return base / Path(shared_dir).expanduser()
+
+
+def write_file_atomically(path: Path, content: bytes) -> None:
+    """Write a file through a temporary file that is renamed into place.
+
+    Readers never see a partially-written file, and a file that is a hard
+    link to a shared blob is replaced rather than modified in place.
+
+    Raises
+    ------
+    OSError
+        Raised if the file can't be written.
+    """
+    write_chunks_atomically(path, (content,))
+
+
+def write_chunks_atomically(path: Path, chunks: Iterable[bytes]) -> None:
+    """Write a file from chunks of content, such as a streamed download,
+    through a temporary file that is renamed into place.
+
+    Only one chunk is held in memory at a time. If the file can't be
+    written, or iterating over the chunks raises an exception, the temporary
+    file is removed and an existing file is left as it was.
+
+    Raises
+    ------
+    OSError
+        Raised if the file can't be written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    """Read a file in chunks."""
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            yield chunk
+
+
+@dataclass(frozen=True)
+class SharedInventory:
+    """An inventory held in the shared cache."""
+
+    url: str
+    """The origin ``objects.inv`` URL."""
+
+    path: Path
+    """Path of the content-addressed blob holding the inventory."""
+
+    etag: str | None
+    """The entity tag Ook returned for the inventory, if any."""
+
+
+class SharedInventoryCache:
+    """A content-addressed intersphinx inventory cache shared by builds.
+
+    Inventories are stored once, by the SHA-256 digest of their content, in
+    :file:`objects/`, and an entry in :file:`entries/` for each origin URL
+    records the digest and entity tag of its current inventory. Builds link
+    the blobs into their own build trees (see `link`), so any number of
+    project checkouts share one copy of each inventory, and a fresh checkout
+    or a clean build starts from the inventories other builds fetched.
+
+    Every file is written atomically, so concurrent builds can share the
+    cache. The cache is kept under a size limit by evicting the least
+    recently used entries (see `evict`).
+
+    Parameters
+    ----------
+    root
+        The cache directory.
+    max_size
+        The size limit, in bytes, of the inventories in the cache.
+    """
+
+    def __init__(
+        self, root: Path, *, max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        self.root = root
+        self.max_size = max_size
+
+    @property
+    def _objects_dir(self) -> Path:
+        return self.root / "objects"
+
+    @property
+    def _entries_dir(self) -> Path:
+        return self.root / "entries"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._objects_dir / digest[:2] / digest
+
+    def _entry_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self._entries_dir / f"{key}.json"
+
+    def lookup(self, url: str) -> SharedInventory | None:
+        """Look up the cached inventory for an origin URL, marking it as
+        used.
+
+        Returns
+        -------
+        SharedInventory or None
+            The cached inventory, or `None` if there isn't one (or its
+            entry is unreadable).
+        """
+        entry_path = self._entry_path(url)
+        try:
+            data = json.loads(entry_path.read_text(encoding="utf-8"))
+            digest = data["digest"]
+            etag = data.get("etag")
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if data.get("url") != url or not isinstance(digest, str):
+            return None
+        blob_path = self._blob_path(digest)
+        if not blob_path.is_file():
+            return None
+        self.touch(url)
+        return SharedInventory(
+            url=url,
+            path=blob_path,
+            etag=etag if isinstance(etag, str) else None,
+        )
+
+    def find_blob(self, digest: str) -> Path | None:
+        """Return the path of the blob with a SHA-256 digest, or `None` if
+        the cache doesn't hold it.
+        """
+        blob_path = self._blob_path(digest)
+        return blob_path if blob_path.is_file() else None
+
+    def store(self, url: str, content: bytes, etag: str | None) -> Path:
+        """Store the inventory for an origin URL, returning its blob path.
+
+        Raises
+        ------
+        OSError
+            Raised if the inventory can't be written to the cache.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.is_file():
+            write_file_atomically(blob_path, content)
+        self._write_entry(url, digest, etag)
+        return blob_path
+
+    def store_file(self, url: str, path: Path, etag: str | None) -> Path:
+        """Store the inventory in a file for an origin URL, returning its
+        blob path.
+
+        The file is read in chunks, so a downloaded inventory is never held
+        in memory.
+
+        Raises
+        ------
+        OSError
+            Raised if the file can't be read, or the inventory can't be
+            written to the cache.
+        """
+        sha256 = hashlib.sha256()
+        for chunk in _read_chunks(path):
+            sha256.update(chunk)
+        digest = sha256.hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.is_file():
+            write_chunks_atomically(blob_path, _read_chunks(path))
+        self._write_entry(url, digest, etag)
+        return blob_path
+
+    def _write_entry(self, url: str, digest: str, etag: str | None) -> None:
+        entry = {"url": url, "digest": digest, "etag": etag}
+        write_file_atomically(
+            self._entry_path(url), json.dumps(entry).encode()
+        )
+
+    def touch(self, url: str) -> None:
+        """Mark the inventory for an origin URL as recently used."""
+        with contextlib.suppress(OSError):
+            os.utime(self._entry_path(url), None)
+
+    @staticmethod
+    def link(blob_path: Path, path: Path) -> None:
+        """Link a cached blob into a build tree, replacing any existing file.
+
+        The link is a hard link, or a symbolic link if the build tree is on a
+        different file system than the cache. A hard link keeps the
+        inventory readable even after the cache evicts it.
+
+        Raises
+        ------
+        OSError
+            Raised if neither kind of link can be created.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.link")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            try:
+                tmp_path.hardlink_to(blob_path)
+            except OSError:
+                tmp_path.symlink_to(blob_path.resolve())
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def evict(self) -> None:
+        """Evict the least recently used inventories until the cache is
+        within its size limit.
+
+        Entries are ranked by the time they were last stored, looked up, or
+        touched. A blob is deleted once no remaining entry refers to it.
+        Eviction is best-effort: files that disappear or can't be removed
+        (for example, because a concurrent build evicted them first) are
+        skipped.
+        """
+        entries: list[tuple[float, Path, str]] = []
+        for entry_path in self._entries_dir.glob("*.json"):
+            try:
+                mtime = entry_path.stat().st_mtime
+                digest = json.loads(entry_path.read_text(encoding="utf-8"))[
+                    "digest"
+                ]
+            except (OSError, ValueError, KeyError, TypeError):
+                entry_path.unlink(missing_ok=True)
+                continue
+            entries.append((mtime, entry_path, str(digest)))
+
+        references: dict[str, int] = {}
+        for _, _, digest in entries:
+            references[digest] = references.get(digest, 0) + 1
+
+        sizes: dict[str, int] = {}
+        now = time.time()
+        for blob_path in self._objects_dir.glob("*/*"):
+            try:
+                stat = blob_path.stat()
+            except OSError:
+                continue
+            if (
+                blob_path.name not in references
+                and now - stat.st_mtime > _ORPHAN_GRACE_PERIOD
+            ):
+                blob_path.unlink(missing_ok=True)
+                continue
+            sizes[blob_path.name] = stat.st_size
+
+        total = sum(sizes.values())
+        entries.sort()
+        for _, entry_path, digest in entries:
+            if total <= self.max_size:
+                break
+            entry_path.unlink(missing_ok=True)
+            references[digest] -= 1
+            if references[digest] == 0 and digest in sizes:
+                self._blob_path(digest).unlink(missing_ok=True)
+                total -= sizes.pop(digest)
@@ -0,0 +1,83 @@
+"""The intersphinx inventory lockfile."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from .inventorycache import write_file_atomically
+
+__all__ = [
+    "DEFAULT_LOCKFILE_NAME",
+    "InventoryLockfile",
+    "LockedInventory",
+]
+
+DEFAULT_LOCKFILE_NAME = "intersphinx-lock.json"
+"""Default filename of the lockfile, in the Sphinx configuration
+directory.
+"""
+
+
+class LockedInventory(BaseModel):
+    """An intersphinx inventory pinned by the lockfile."""
+
+    url: str = Field(description="The origin ``objects.inv`` URL.")
+
+    etag: str | None = Field(
+        None,
+        description=(
+            "Entity tag Ook returned for the pinned inventory, used to "
+            "revalidate it when the lockfile is updated."
+        ),
+    )
+
+    sha256: str = Field(
+        description="SHA-256 digest of the pinned inventory's content."
+    )
+
+
+class InventoryLockfile(BaseModel):
+    """The intersphinx inventory lockfile (:file:`intersphinx-lock.json`).
+
+    The lockfile pins the inventory of each intersphinx mapping entry, by
+    mapping name, to a content digest. It's written by
+    ``documenteer intersphinx lock`` and committed to the repository, so a
+    change to an inventory shows up as a reviewable change to the lockfile.
+    """
+
+    version: Literal[1] = Field(1, description="The lockfile format version.")
+
+    inventories: dict[str, LockedInventory] = Field(
+        default_factory=dict,
+        description="The pinned inventories, by intersphinx mapping name.",
+    )
+
+    @classmethod
+    def read(cls, path: Path) -> InventoryLockfile:
+        """Read a lockfile.
+
+        Raises
+        ------
+        OSError
+            Raised if the lockfile can't be read.
+        pydantic.ValidationError
+            Raised if the lockfile isn't valid.
+        """
+        return cls.model_validate_json(path.read_bytes())
+
+    def write(self, path: Path) -> None:
+        """Write the lockfile, with its entries sorted by name so that it
+        diffs cleanly.
+
+        Raises
+        ------
+        OSError
+            Raised if the lockfile can't be written.
+        """
+        data = self.model_dump(mode="json")
+        content = json.dumps(data, indent=2, sort_keys=True) + "\n"
+        write_file_atomically(path, content.encode())
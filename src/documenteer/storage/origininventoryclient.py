@@ -0,0 +1,334 @@
+"""Client for fetching intersphinx inventories directly from their origin
+sites.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+from documenteer._requestsutils import (
+    max_retries,
+    requests_retry_session,
+    response_retries,
+    retries_exhausted,
+)
+from documenteer.storage.intersphinxcacheclient import (
+    IntersphinxCacheError,
+    InventoryFetchResult,
+)
+from documenteer.storage.inventorycache import write_chunks_atomically
+
+__all__ = [
+    "DEFAULT_TIMEOUT",
+    "OriginInventoryClient",
+    "OriginInventoryError",
+    "OriginInventoryRequest",
+]
+
+DEFAULT_TIMEOUT = 30.0
+"""Default seconds to wait for an origin to respond."""
+
+_CHUNK_SIZE = 64 * 1024
+"""Size of the chunks that a streamed inventory is written in."""
+
+
+class OriginInventoryError(IntersphinxCacheError):
+    """An error fetching an inventory directly from its origin site.
+
+    It's an `IntersphinxCacheError` so that an inventory that can't be
+    fetched from its origin is handled like one that can't be fetched from
+    Ook.
+    """
+
+    unreachable: bool = False
+    """Whether the origin couldn't be reached (a connection error or a
+    timeout), rather than answering with an error status.
+    """
+
+
+@dataclass(frozen=True)
+class OriginInventoryRequest:
+    """An inventory to fetch from its origin, with the validators of a
+    cached copy.
+    """
+
+    url: str
+    """The origin ``objects.inv`` URL."""
+
+    etag: str | None = None
+    """The entity tag of the cached copy, sent as ``If-None-Match``."""
+
+    last_modified: str | None = None
+    """The ``Last-Modified`` date of the cached copy, sent as
+    ``If-Modified-Since``.
+    """
+
+
+class OriginInventoryClient:
+    """A client for fetching intersphinx inventories directly from their
+    origin sites with conditional requests.
+
+    This is the counterpart of `IntersphinxCacheClient` for builds that
+    can't use Ook: it answers with the same `InventoryFetchResult`, so
+    cached copies are revalidated the same way, using the ``ETag`` and
+    ``Last-Modified`` validators of the origin's responses.
+
+    Parameters
+    ----------
+    session
+        An existing requests session to use. By default a session with
+        retries is created with
+        `documenteer._requestsutils.requests_retry_session`.
+    timeout
+        Seconds to wait for an origin to respond, or `None` to wait
+        indefinitely.
+    tls_verify
+        Whether to verify the origins' TLS certificates.
+    tls_cacerts
+        A CA certificate bundle to verify the origins' certificates with, or
+        bundles by host (``host`` or ``host:port``), as with Sphinx's
+        ``tls_cacerts`` setting.
+    user_agent
+        The ``User-Agent`` header of the requests, or `None` to keep the
+        session's.
+    """
+
+    def __init__(
+        self,
+        *,
+        session: requests.Session | None = None,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        tls_verify: bool = True,
+        tls_cacerts: str | dict[str, str] | None = None,
+        user_agent: str | None = None,
+    ) -> None:
+        self._session = (
+            session if session is not None else requests_retry_session()
+        )
+        self._timeout = timeout
+        self._tls_verify = tls_verify
+        self._tls_cacerts = tls_cacerts
+        self._user_agent = user_agent
+
+    def get_inventories(
+        self,
+        inventories: Sequence[OriginInventoryRequest],
+        *,
+        max_workers: int = 1,
+        destinations: Sequence[Path] | None = None,
+    ) -> list[InventoryFetchResult | OriginInventoryError]:
+        """Fetch or revalidate several inventories, ``max_workers`` at a
+        time.
+
+        Parameters
+        ----------
+        inventories
+            The inventories to fetch, with the validators of any cached
+            copies.
+        max_workers
+            Maximum number of requests in flight at once.
+        destinations
+            For each requested inventory, the file that it's streamed to
+            (see `get_inventory`).
+
+        Returns
+        -------
+        list
+            For each requested inventory, in order, either its fetch result
+            or the `OriginInventoryError` describing why it couldn't be
+            fetched.
+        """
+        targets: Sequence[Path | None] = (
+            destinations
+            if destinations is not None
+            else [None] * len(inventories)
+        )
+
+        def fetch(
+            inventory: OriginInventoryRequest, destination: Path | None
+        ) -> InventoryFetchResult | OriginInventoryError:
+            try:
+                return self.get_inventory(
+                    inventory.url,
+                    etag=inventory.etag,
+                    last_modified=inventory.last_modified,
+                    destination=destination,
+                )
+            except OriginInventoryError as e:
+                return e
+
+        if len(inventories) <= 1 or max_workers <= 1:
+            return [
+                fetch(inventory, destination)
+                for inventory, destination in zip(
+                    inventories, targets, strict=True
+                )
+            ]
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(inventories)),
+            thread_name_prefix="intersphinxcache-origin",
+        ) as executor:
+            return list(executor.map(fetch, inventories, targets))
+
+    def get_inventory(
+        self,
+        url: str,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        destination: Path | None = None,
+    ) -> InventoryFetchResult:
+        """Fetch an inventory from its origin.
+
+        Parameters
+        ----------
+        url
+            The origin ``objects.inv`` URL.
+        etag
+            The entity tag of a cached copy. When provided, the request
+            carries an ``If-None-Match`` header.
+        last_modified
+            The ``Last-Modified`` date of a cached copy. When provided, the
+            request carries an ``If-Modified-Since`` header.
+        destination
+            A file to stream a downloaded inventory to, instead of returning
+            its bytes, as with `IntersphinxCacheClient.get_inventory`.
+
+        Returns
+        -------
+        InventoryFetchResult
+            The fetch outcome. On a ``304 Not Modified``, ``etag`` and
+            ``last_modified`` echo the validators that were sent, and on a
+            ``200 OK`` they are the response's (`None` for a header the
+            origin didn't send).
+
+        Raises
+        ------
+        OriginInventoryError
+            Raised if the origin can't be reached (with
+            `OriginInventoryError.unreachable` set), answers with an error
+            status, or the inventory can't be written to ``destination``.
+        """
+        start = time.monotonic()
+        try:
+            result = self._request_inventory(
+                url,
+                etag=etag,
+                last_modified=last_modified,
+                destination=destination,
+            )
+        except OriginInventoryError as e:
+            e.elapsed = time.monotonic() - start
+            if retries_exhausted(e.__cause__):
+                e.retries = max_retries(self._session, url)
+            raise
+        return replace(result, elapsed=time.monotonic() - start)
+
+    def _request_inventory(
+        self,
+        url: str,
+        *,
+        etag: str | None,
+        last_modified: str | None,
+        destination: Path | None,
+    ) -> InventoryFetchResult:
+        """Send the request and read its response (see `get_inventory`)."""
+        headers = {}
+        if self._user_agent is not None:
+            headers["User-Agent"] = self._user_agent
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            r = self._session.get(
+                url,
+                headers=headers,
+                timeout=self._timeout,
+                verify=self._verify(url),
+                stream=True,
+            )
+        except requests.RequestException as e:
+            error = OriginInventoryError(
+                f"Could not fetch the inventory from {url}: {e}"
+            )
+            error.unreachable = True
+            raise error from e
+        # The response is streamed, so it's closed once its body is read.
+        with r:
+            retries = response_retries(r)
+            if r.status_code == 304:
+                return InventoryFetchResult(
+                    not_modified=True,
+                    content=None,
+                    etag=etag,
+                    last_modified=last_modified,
+                    retries=retries,
+                )
+            try:
+                r.raise_for_status()
+            except requests.HTTPError as e:
+                error = OriginInventoryError(
+                    f"Could not fetch the inventory from {url}: {e}"
+                )
+                error.retries = retries
+                raise error from e
+            try:
+                content = self._read_inventory(r, url, destination)
+            except OriginInventoryError as e:
+                e.retries = retries
+                raise
+        return InventoryFetchResult(
+            not_modified=False,
+            content=content,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+            path=destination,
+            retries=retries,
+        )
+
+    def _read_inventory(
+        self, r: requests.Response, url: str, destination: Path | None
+    ) -> bytes | None:
+        """Read the inventory from a successful response, returning its
+        bytes, or streaming it to ``destination`` if it's given.
+        """
+        try:
+            if destination is None:
+                return r.content
+            write_chunks_atomically(
+                destination, r.iter_content(chunk_size=_CHUNK_SIZE)
+            )
+        except requests.RequestException as e:
+            # Checked first: requests exceptions are also OSErrors.
+            error = OriginInventoryError(
+                f"Could not download the inventory from {url}: {e}"
+            )
+            error.unreachable = True
+            raise error from e
+        except OSError as e:
+            raise OriginInventoryError(
+                f"Could not write the inventory from {url} to "
+                f"{destination}: {e}"
+            ) from e
+        return None
+
+    def _verify(self, url: str) -> bool | str:
+        """Return the TLS verification of a request to ``url``: `False`, a
+        CA certificate bundle, or `True` for the default bundle.
+        """
+        if not self._tls_verify:
+            return False
+        if isinstance(self._tls_cacerts, str):
+            return self._tls_cacerts
+        if self._tls_cacerts:
+            host = urlsplit(url).netloc.rpartition("@")[2]
+            return self._tls_cacerts.get(host, True)
+        return True
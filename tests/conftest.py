@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
+import responses
+
+from .support.ookserver import OokStandIn
 
 pytest_plugins = ["sphinx.testing.fixtures"]
 
@@ -16,3 +20,19 @@ collect_ignore: list[str] = ["roots"]
 def rootdir() -> Path:
     """Directory containing Sphinx projects for testing (`str`)."""
     return Path(__file__).parent.absolute() / "roots"
+
+
+@pytest.fixture
+def ook_server() -> Iterator[OokStandIn]:
+    """Run a local stand-in for Ook's intersphinx inventory cache API.
+
+    The pytest-responses plugin mocks every request by default, so the
+    server is registered as a passthrough with the default mock. Tests that
+    use it shouldn't also use the ``responses`` fixture, whose mock would
+    intercept the server's requests.
+    """
+    server = OokStandIn()
+    server.start()
+    responses.add_passthru(server.base_url)
+    yield server
+    server.stop()
@@ -199,14 +199,14 @@ def test_srcdir_at_repo_root(tmp_path: Path) -> None:
 def test_not_a_git_repository(tmp_path: Path) -> None:
     """Outside a Git checkout the button is omitted without failing the build.
 
-    ``GitRepository`` is patched rather than relying on the temporary directory
-    being outside a checkout, so the test can't be perturbed by where pytest's
-    basetemp lives.
+    The repository lookup is patched rather than relying on the temporary
+    directory being outside a checkout, so the test can't be perturbed by
+    where pytest's basetemp lives.
     """
     _write_project(confdir=tmp_path, srcdir=tmp_path / "docs")
 
     with patch(
-        "documenteer.ext.githubeditlink.GitRepository",
+        "documenteer.ext.githubeditlink.get_git_repository",
         side_effect=git.InvalidGitRepositoryError,
     ):
         build = _build(
@@ -236,7 +236,8 @@ def test_srcdir_outside_working_tree(tmp_path: Path) -> None:
     mock_repo.working_tree_dir = Path("/somewhere/else")
 
     with patch(
-        "documenteer.ext.githubeditlink.GitRepository", return_value=mock_repo
+        "documenteer.ext.githubeditlink.get_git_repository",
+        return_value=mock_repo,
     ):
         build = _build(
             confdir=tmp_path,
@@ -347,7 +348,7 @@ def test_configured_doc_path_survives_without_git(tmp_path: Path) -> None:
     )
 
     with patch(
-        "documenteer.ext.githubeditlink.GitRepository",
+        "documenteer.ext.githubeditlink.get_git_repository",
         side_effect=git.InvalidGitRepositoryError,
     ) as mock_repo:
         build = _build(
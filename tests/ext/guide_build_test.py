@@ -22,6 +22,7 @@ clean build.
 from __future__ import annotations
 
 import importlib.util
+import json
 from datetime import UTC, datetime
 from unittest.mock import MagicMock, patch
 
@@ -29,6 +30,8 @@ import pytest
 from lxml import html
 from sphinx.testing.util import SphinxTestApp
 
+from documenteer.conf._utils import LastCommit
+
 FIXED_DATE = datetime(2024, 6, 1, tzinfo=UTC)
 # The ISO 8601 form of FIXED_DATE, as emitted into the <time datetime="...">.
 EXPECTED_ISO = "2024-06-01T00:00:00+00:00"
@@ -52,7 +55,11 @@ def _mock_git_repository() -> MagicMock:
     """
     mock_repo = MagicMock()
     mock_repo.is_shallow = False
-    mock_repo.compute_last_modified.return_value = FIXED_DATE
+    mock_repo.history_manifest_head = None
+    mock_repo.head_sha = "a" * 40
+    mock_repo.compute_last_commit.return_value = LastCommit(
+        sha="c" * 40, date=FIXED_DATE
+    )
     return mock_repo
 
 
@@ -64,7 +71,8 @@ def test_guide_build_smoke(app: SphinxTestApp) -> None:
     """The guide stack renders the last-updated footer and GitHub icon link."""
     mock_repo = _mock_git_repository()
     with patch(
-        "documenteer.ext.lastmodified.GitRepository", return_value=mock_repo
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
     ):
         app.build()
 
@@ -121,6 +129,26 @@ def test_guide_build_smoke(app: SphinxTestApp) -> None:
         "hide_content_footer metadata should suppress the print footer"
     )
 
+    # The sitemap's <lastmod> entries carry the same Git date, supplied by
+    # documenteer.ext.lastmodified rather than sphinx-last-updated-by-git,
+    # which the preset no longer loads.
+    assert "sphinx_last_updated_by_git" not in app.extensions
+    sitemap = (app.outdir / "sitemap.xml").read_text(encoding="utf-8")
+    assert "index.html</loc><lastmod>2024-06-01T00:00:00Z</lastmod>" in (
+        sitemap
+    )
+
+    # The preset writes the per-page last-modified manifest.
+    manifest = json.loads(
+        (app.outdir / "last-modified.json").read_text(encoding="utf-8")
+    )
+    assert manifest["pages"]["index"] == {
+        "path": "index.html",
+        "url": "https://example.lsst.io/index.html",
+        "modified": EXPECTED_ISO,
+        "commit": "c" * 40,
+    }
+
     # The GitHub icon_links entry renders in the navbar icon-links list (not in
     # .navbar-nav -- the icon-links moved to navbar-header-items__end in 0.18,
     # which is why the old .navbar-nav i sizing rule is no longer needed). The
@@ -2,21 +2,44 @@
 
 from __future__ import annotations
 
+import hashlib
 import importlib.util
+import json
+import pickle
+import shutil
+import threading
+import time
 import zlib
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 from urllib.parse import parse_qs, urlparse
 
 import pytest
 import pytest_responses  # noqa: F401
+import sphinx
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from responses import RequestsMock, matchers
+from sphinx.ext.intersphinx import _load as intersphinx_load
 from sphinx.testing.util import SphinxTestApp
 
+from documenteer.ext import intersphinxcache
 from documenteer.ext.intersphinxcache import CACHE_DIRNAME, _inventory_filename
+from documenteer.storage.inventorycache import (
+    SharedInventoryCache,
+    write_chunks_atomically,
+    write_file_atomically,
+)
+from documenteer.storage.inventorylock import (
+    InventoryLockfile,
+    LockedInventory,
+)
+
+from ..support.ookserver import OokStandIn
 
 OOK_BASE_URL = "https://roundtable.lsst.cloud/ook"
 INVENTORY_ENDPOINT = f"{OOK_BASE_URL}/intersphinx/inventory"
+BATCH_ENDPOINT = f"{OOK_BASE_URL}/intersphinx/inventories"
 
 # Whether the guide preset's theme is importable; the guide test root builds
 # the full user-guide stack (``from documenteer.conf.guide import *``), which
@@ -739,6 +762,550 @@ def test_per_inventory_fallback(
     )
 
 
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache-multi",
+    srcdir="intersphinx-cache-circuit-breaker",
+    confoverrides={
+        "documenteer_intersphinx_cache_disk_cache_ttl": 0,
+        "documenteer_intersphinx_cache_concurrency": 1,
+        "documenteer_intersphinx_cache_circuit_breaker_threshold": 1,
+    },
+)
+def test_circuit_breaker_uses_expired_copies(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """Once Ook fails as many times in a row as the circuit breaker
+    threshold, the remaining inventories skip Ook and use their expired
+    on-disk copies.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    proja_inv_url = "https://a.example.com/objects.inv"
+    projb_inv_url = "https://b.example.com/objects.inv"
+    responses.post(BATCH_ENDPOINT, status=404)
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+    app1 = _make_app(make_app, app_params)
+    projb_path = _inventory_locations(app1, "projb")[0]
+    assert Path(projb_path).is_file()
+
+    # Ook is now unreachable. The request for proja fails, which opens the
+    # circuit breaker, so proja falls back to its origin and projb uses its
+    # expired copy without a request.
+    responses.remove(responses.GET, INVENTORY_ENDPOINT)
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=RequestsConnectionError("Connection refused"),
+        match=[matchers.query_param_matcher({"url": proja_inv_url})],
+    )
+    responses.get(proja_inv_url, body=_make_inventory(), status=200)
+    responses.calls.reset()
+    app2 = _make_app(make_app, app_params)
+    app2.build()
+
+    assert _inventory_locations(app2, "proja") == (None,)
+    assert _inventory_locations(app2, "projb") == (projb_path,)
+    ook_query_urls = [
+        parse_qs(urlparse(str(call.request.url)).query)["url"][0]
+        for call in responses.calls
+        if (call.request.url or "").startswith(INVENTORY_ENDPOINT)
+    ]
+    assert ook_query_urls == [proja_inv_url]
+    status = app2.status.getvalue()
+    assert "using the expired on-disk copy" in status
+    assert not any(
+        (call.request.url or "") == projb_inv_url for call in responses.calls
+    )
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache-multi",
+    srcdir="intersphinx-cache-report",
+    confoverrides={"documenteer_intersphinx_cache_report_summary": True},
+)
+def test_prefetch_report(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """The build writes a report of each inventory's prefetch outcome and
+    cost, and summarizes it in the build log.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    proja_inv_url = "https://a.example.com/objects.inv"
+    projb_inv_url = "https://b.example.com/objects.inv"
+    inventory = _make_inventory()
+    responses.post(BATCH_ENDPOINT, status=404)
+    responses.get(
+        INVENTORY_ENDPOINT,
+        status=404,
+        match=[matchers.query_param_matcher({"url": proja_inv_url})],
+    )
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=inventory,
+        status=200,
+        content_type="application/octet-stream",
+        match=[matchers.query_param_matcher({"url": projb_inv_url})],
+    )
+    responses.get(proja_inv_url, body=inventory, status=200)
+
+    app = _make_app(make_app, app_params)
+    app.build()
+    report_path = (
+        Path(app.doctreedir).parent
+        / CACHE_DIRNAME
+        / intersphinxcache.REPORT_FILENAME
+    )
+    report = json.loads(report_path.read_text())
+    assert report["totals"] == {
+        "inventories": 2,
+        "bytes": len(inventory),
+        "retries": 0,
+        "outcomes": {"downloaded": 1, "fallback": 1},
+    }
+    proja = report["inventories"]["proja"]
+    assert proja["url"] == proja_inv_url
+    assert proja["outcome"] == "fallback"
+    projb = report["inventories"]["projb"]
+    assert projb["outcome"] == "downloaded"
+    assert projb["bytes"] == len(inventory)
+    assert projb["elapsed"] >= 0
+    assert projb["background"] is False
+    status = app.status.getvalue()
+    assert "Prefetched 2 intersphinx inventories" in status
+    assert ["projb", "downloaded", str(len(inventory))] in [
+        line.split()[:3] for line in status.splitlines()
+    ]
+
+    # The next build reuses projb within the TTL.
+    app = _make_app(make_app, app_params)
+    app.build()
+    report = json.loads(report_path.read_text())
+    assert report["inventories"]["projb"]["outcome"] == "ttl_hit"
+    assert report["inventories"]["projb"]["bytes"] == 0
+
+
+def _inventory_callback(
+    on_request: Any,
+) -> Any:
+    """Return a ``responses`` callback that calls ``on_request`` and then
+    serves a valid inventory.
+    """
+
+    def callback(request: Any) -> tuple[int, dict[str, str], bytes]:
+        on_request()
+        return (200, {}, _make_inventory())
+
+    return callback
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache-multi",
+    srcdir="intersphinx-cache-concurrent",
+)
+def test_prefetch_is_concurrent(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """Against an Ook without the batch endpoint, stale inventories are
+    revalidated individually and concurrently: both requests are in flight
+    at the same time, and both entries are rewritten.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.post(BATCH_ENDPOINT, status=404)
+    # Each request waits at the barrier until the other arrives, which can
+    # only happen if they are in flight together (a sequential prefetch
+    # breaks the barrier after the timeout).
+    barrier = threading.Barrier(2, timeout=10)
+    responses.add_callback(
+        responses.GET,
+        INVENTORY_ENDPOINT,
+        callback=_inventory_callback(barrier.wait),
+    )
+
+    app = _make_app(make_app, app_params)
+
+    assert len(responses.calls) == 3
+    for name in ("proja", "projb"):
+        locations = _inventory_locations(app, name)
+        assert "://" not in locations[0]
+        assert Path(locations[0]).is_file()
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache-multi",
+    srcdir="intersphinx-cache-concurrency-one",
+    confoverrides={"documenteer_intersphinx_cache_concurrency": 1},
+)
+def test_prefetch_concurrency_limit(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """With a concurrency of 1, individual revalidations run one at a
+    time.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.post(BATCH_ENDPOINT, status=404)
+    lock = threading.Lock()
+
+    def on_request() -> None:
+        # A second request while the first holds the lock would fail here.
+        acquired = lock.acquire(blocking=False)
+        if not acquired:
+            raise RuntimeError("Concurrent request to Ook")
+        time.sleep(0.05)
+        lock.release()
+
+    responses.add_callback(
+        responses.GET,
+        INVENTORY_ENDPOINT,
+        callback=_inventory_callback(on_request),
+    )
+
+    app = _make_app(make_app, app_params)
+
+    assert len(responses.calls) == 3
+    for name in ("proja", "projb"):
+        assert "://" not in _inventory_locations(app, name)[0]
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache-multi",
+    srcdir="intersphinx-cache-batch-unsupported",
+    confoverrides={"documenteer_intersphinx_cache_disk_cache_ttl": 0},
+)
+def test_missing_batch_endpoint_is_remembered(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """Once Ook answers that it has no batch endpoint, the next build
+    revalidates individually without trying the batch request again.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    batch = responses.post(BATCH_ENDPOINT, status=404)
+    responses.add_callback(
+        responses.GET,
+        INVENTORY_ENDPOINT,
+        callback=_inventory_callback(lambda: None),
+    )
+
+    _make_app(make_app, app_params)
+    assert batch.call_count == 1
+
+    app = _make_app(make_app, app_params)
+
+    assert batch.call_count == 1
+    assert len(responses.calls) == 5
+    for name in ("proja", "projb"):
+        assert "://" not in _inventory_locations(app, name)[0]
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache-multi",
+    srcdir="intersphinx-cache-batch",
+    confoverrides={"documenteer_intersphinx_cache_disk_cache_ttl": 0},
+)
+def test_warm_build_revalidates_in_one_request(
+    make_app: Any,
+    app_params: Any,
+    ook_server: OokStandIn,
+    monkeypatch: Any,
+) -> None:
+    """Against the local Ook stand-in, a build whose cached inventories are
+    all unchanged revalidates them with a single batch request.
+    """
+    monkeypatch.setenv("OOK_TOKEN", ook_server.token)
+    for host in ("a", "b"):
+        ook_server.add_inventory(
+            f"https://{host}.example.com/objects.inv", _make_inventory()
+        )
+    args, kwargs = app_params
+    confoverrides = {
+        **kwargs.get("confoverrides", {}),
+        "documenteer_intersphinx_cache_service_url": ook_server.base_url,
+    }
+
+    # The cold build downloads both inventories in one batch request.
+    app1 = make_app(*args, **{**kwargs, "confoverrides": confoverrides})
+    assert ook_server.requests == [("POST", "/ook/intersphinx/inventories")]
+    locations = {
+        name: _inventory_locations(app1, name)[0]
+        for name in ("proja", "projb")
+    }
+    assert all(Path(location).is_file() for location in locations.values())
+
+    # The warm build revalidates both with one round-trip, and reuses the
+    # files on disk.
+    ook_server.requests.clear()
+    app2 = make_app(*args, **{**kwargs, "confoverrides": confoverrides})
+    assert ook_server.requests == [("POST", "/ook/intersphinx/inventories")]
+    assert "unchanged on Ook" in app2.status.getvalue()
+    for name, location in locations.items():
+        assert _inventory_locations(app2, name)[0] == location
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-parsed-sidecar",
+)
+def test_parsed_sidecar_skips_parsing(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """A prefetched inventory is parsed once; later builds load the parsed
+    sidecar instead, until the inventory's content changes.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+    parsed: list[str] = []
+    load_inventory = intersphinxcache._intersphinx_load_inventory
+    assert load_inventory is not None
+
+    def _counting_load_inventory(raw_data: bytes, /, **kwargs: Any) -> Any:
+        parsed.append(kwargs["target_uri"])
+        return load_inventory(raw_data, **kwargs)
+
+    monkeypatch.setattr(
+        intersphinxcache,
+        "_intersphinx_load_inventory",
+        _counting_load_inventory,
+    )
+
+    # The cold build parses the inventory and writes its sidecar.
+    app1 = _make_app(make_app, app_params)
+    app1.build()
+    assert parsed == ["https://example.com/project/"]
+    inv_path = Path(_inventory_locations(app1, "testproj")[0])
+    assert inv_path.with_name(inv_path.name + ".parsed").is_file()
+
+    # A fresh build loads the sidecar without parsing, and the
+    # cross-reference still resolves.
+    parsed.clear()
+    app2 = _make_app(make_app, app_params)
+    app2.build(force_all=True)
+    assert parsed == []
+    html = (Path(app2.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+
+    # A changed inventory doesn't match the sidecar, so it's parsed again.
+    inv_path.write_bytes(_make_inventory(location="v2.html#example.func"))
+    app3 = _make_app(make_app, app_params)
+    app3.build(force_all=True)
+    assert parsed == ["https://example.com/project/"]
+    html = (Path(app3.outdir) / "index.html").read_text()
+    assert "https://example.com/project/v2.html#example.func" in html
+
+    # A sidecar saved by another Sphinx version is dropped and parsed again.
+    parsed.clear()
+    monkeypatch.setattr(sphinx, "__version__", "0.0.0")
+    app4 = _make_app(make_app, app_params)
+    app4.build(force_all=True)
+    assert parsed == ["https://example.com/project/"]
+    with inv_path.with_name(inv_path.name + ".parsed").open("rb") as f:
+        assert pickle.load(f)["sphinx"] == "0.0.0"
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-parsed-sidecar-sphinx-8-1",
+)
+def test_parsed_sidecar_needs_sphinx_8_2(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """Without intersphinx's ``_load_inventory`` (before Sphinx 8.2), setup
+    says that parsed inventories aren't saved, and the build still resolves
+    references into the prefetched inventory.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    # Undo the hook installed by earlier builds in this process.
+    monkeypatch.setattr(
+        intersphinx_load,
+        "_load_inventory",
+        intersphinxcache._intersphinx_load_inventory,
+    )
+    monkeypatch.setattr(intersphinxcache, "_intersphinx_load_inventory", None)
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+
+    app = _make_app(make_app, app_params)
+    app.build()
+
+    assert "Not saving parsed intersphinx inventories" in (
+        app.status.getvalue()
+    )
+    inv_path = Path(_inventory_locations(app, "testproj")[0])
+    assert not inv_path.with_name(inv_path.name + ".parsed").exists()
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-stale-while-revalidate",
+    confoverrides={
+        "documenteer_intersphinx_cache_disk_cache_ttl": 0,
+        "documenteer_intersphinx_cache_stale_while_revalidate": True,
+    },
+)
+def test_stale_while_revalidate(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """In stale-while-revalidate mode, an expired on-disk inventory is mapped
+    without waiting on Ook, and the inventory revalidated in the background
+    is used by the next build.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+
+    # Without a cached copy, the first build waits for the download.
+    app1 = _make_app(make_app, app_params)
+    assert len(responses.calls) == 1
+    inv_path = Path(_inventory_locations(app1, "testproj")[0])
+    assert inv_path.is_file()
+
+    # Ook doesn't answer the revalidation until the second build has set
+    # up, which can only happen if the build doesn't wait for it.
+    answer = threading.Event()
+
+    def callback(request: Any) -> tuple[int, dict[str, str], bytes]:
+        assert answer.wait(timeout=10)
+        return (200, {}, _make_inventory(location="v2.html#example.func"))
+
+    responses.remove(responses.GET, INVENTORY_ENDPOINT)
+    responses.add_callback(
+        responses.GET, INVENTORY_ENDPOINT, callback=callback
+    )
+    app2 = _make_app(make_app, app_params)
+    assert _inventory_locations(app2, "testproj") == (str(inv_path),)
+    assert "in the background" in app2.status.getvalue()
+    answer.set()
+    app2.build()
+
+    # The build waited for the revalidation before finishing, so the next
+    # build uses the refreshed inventory.
+    assert len(responses.calls) == 2
+    app3 = _make_app(make_app, app_params)
+    app3.build(force_all=True)
+    html = (Path(app3.outdir) / "index.html").read_text()
+    assert "https://example.com/project/v2.html#example.func" in html
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-locked",
+)
+def test_locked_build_is_offline(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+    tmp_path: Path,
+) -> None:
+    """A build with a lockfile maps the pinned inventories from the
+    inventory cache without contacting Ook or the origin, even without a
+    token, and an unpinned entry is left to stock intersphinx.
+    """
+    monkeypatch.delenv("OOK_TOKEN", raising=False)
+    monkeypatch.delenv("DOCUMENTEER_INTERSPHINX_CACHE_DIR", raising=False)
+    origin_inv_url = "https://example.com/project/objects.inv"
+    inventory = _make_inventory()
+    SharedInventoryCache(tmp_path / "cache").store(
+        origin_inv_url, inventory, '"v1"'
+    )
+    lockfile_path = tmp_path / "intersphinx-lock.json"
+    InventoryLockfile(
+        inventories={
+            "testproj": LockedInventory(
+                url=origin_inv_url,
+                etag='"v1"',
+                sha256=hashlib.sha256(inventory).hexdigest(),
+            )
+        }
+    ).write(lockfile_path)
+    args, kwargs = app_params
+    kwargs["confoverrides"] = {
+        "documenteer_intersphinx_cache_lockfile": str(lockfile_path),
+        "documenteer_intersphinx_cache_shared_dir": str(tmp_path / "cache"),
+    }
+
+    app = make_app(*args, **kwargs)
+    app.build()
+
+    assert len(responses.calls) == 0
+    inv_path = Path(_inventory_locations(app, "testproj")[0])
+    assert inv_path.read_bytes() == inventory
+    assert _etag_sidecar(inv_path).read_text() == '"v1"'
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+
+    # An entry that isn't pinned isn't mapped.
+    InventoryLockfile().write(lockfile_path)
+    app = make_app(*args, **kwargs)
+    assert _inventory_locations(app, "testproj") == (None,)
+    assert "isn't pinned in the lockfile" in app.status.getvalue()
+
+    # A pinned inventory that isn't in the cache (say, evicted by another
+    # project's build) isn't mapped either, and is warned about.
+    InventoryLockfile(
+        inventories={
+            "testproj": LockedInventory(
+                url=origin_inv_url,
+                etag='"v2"',
+                sha256=hashlib.sha256(b"evicted").hexdigest(),
+            )
+        }
+    ).write(lockfile_path)
+    app = make_app(*args, **kwargs)
+    assert _inventory_locations(app, "testproj") == (None,)
+    assert "isn't in the inventory cache" in app.warning.getvalue()
+
+
 def test_inventory_filename_keys_on_name_and_origin_url() -> None:
     """The cache filename hash includes the resolved origin URL, so changing
     an entry's URL (while keeping the same key) yields a different filename —
@@ -832,15 +1399,28 @@ def test_write_failure_falls_back(
     responses.get(origin_inv_url, body=_make_inventory(), status=200)
 
     # Fail only writes into the extension's cache directory, so Sphinx's own
-    # build writes are unaffected.
-    real_write_bytes = Path.write_bytes
+    # build writes are unaffected. The client streams an individually
+    # requested inventory to the cache file itself.
 
-    def _failing_write_bytes(self: Path, data: bytes) -> int:
-        if CACHE_DIRNAME in self.parts:
+    def _failing_write_file(path: Path, content: bytes) -> None:
+        if CACHE_DIRNAME in path.parts:
             raise OSError("simulated disk failure")
-        return real_write_bytes(self, data)
+        write_file_atomically(path, content)
 
-    monkeypatch.setattr(Path, "write_bytes", _failing_write_bytes)
+    def _failing_write_chunks(path: Path, chunks: Iterable[bytes]) -> None:
+        if CACHE_DIRNAME in path.parts:
+            raise OSError("simulated disk failure")
+        write_chunks_atomically(path, chunks)
+
+    # Patched where the extension looks it up.
+    monkeypatch.setattr(
+        "documenteer.ext.intersphinxcache.write_file_atomically",
+        _failing_write_file,
+    )
+    monkeypatch.setattr(
+        "documenteer.storage.intersphinxcacheclient.write_chunks_atomically",
+        _failing_write_chunks,
+    )
 
     app = _make_app(make_app, app_params)
     app.build()
@@ -864,7 +1444,9 @@ def test_write_failure_falls_back(
 
 
 @pytest.mark.sphinx(
-    "html", testroot="intersphinx-cache", srcdir="intersphinx-cache-no-token"
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-no-token",
 )
 def test_no_token_is_noop(
     make_app: Any,
@@ -872,8 +1454,10 @@ def test_no_token_is_noop(
     responses: RequestsMock,
     monkeypatch: Any,
 ) -> None:
-    """With OOK_TOKEN unset, the extension no-ops: Ook is never contacted and
-    stock intersphinx behavior (a direct origin fetch) is unchanged.
+    """With OOK_TOKEN unset (and direct mode off by default), the extension
+    no-ops:
+    Ook is never contacted and stock intersphinx behavior (a direct origin
+    fetch) is unchanged.
     """
     monkeypatch.delenv("OOK_TOKEN", raising=False)
     # Stock intersphinx fetches the origin directly.
@@ -899,6 +1483,123 @@ def test_no_token_is_noop(
     assert "https://example.com/project/api.html#example.func" in html
 
 
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-direct",
+    confoverrides={
+        "documenteer_intersphinx_cache_direct": True,
+        "documenteer_intersphinx_cache_disk_cache_ttl": 0,
+        "intersphinx_timeout": 5,
+        "user_agent": "test-agent",
+    },
+)
+def test_direct_mode_revalidates_with_origin(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """With OOK_TOKEN unset, in direct mode, the inventory is fetched from
+    its origin into the cache, with intersphinx's request settings, and
+    revalidated with a conditional request to the origin.
+    """
+    monkeypatch.delenv("OOK_TOKEN", raising=False)
+    origin_inv_url = "https://example.com/project/objects.inv"
+    last_modified = "Wed, 14 Oct 2026 12:00:00 GMT"
+    responses.get(
+        origin_inv_url,
+        status=304,
+        match=[
+            matchers.header_matcher(
+                {"If-None-Match": '"o1"', "If-Modified-Since": last_modified}
+            )
+        ],
+    )
+    responses.get(
+        origin_inv_url,
+        body=_make_inventory(),
+        status=200,
+        headers={"ETag": '"o1"', "Last-Modified": last_modified},
+    )
+
+    app1 = _make_app(make_app, app_params)
+    app1.build()
+    inv_path = Path(_inventory_locations(app1, "testproj")[0])
+    assert inv_path.read_bytes() == _make_inventory()
+    assert _etag_sidecar(inv_path).read_text() == '"o1"'
+    assert (
+        inv_path.with_name(inv_path.name + ".last-modified").read_text()
+        == last_modified
+    )
+    html = (Path(app1.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+
+    app2 = _make_app(make_app, app_params)
+    app2.build()
+    assert _inventory_locations(app2, "testproj") == (str(inv_path),)
+    assert "unchanged on its origin" in app2.status.getvalue()
+    # Ook was never contacted, and intersphinx never fetched the origin
+    # itself.
+    assert [call.request.url for call in responses.calls] == [
+        origin_inv_url,
+        origin_inv_url,
+    ]
+    # The second request carried both validators, so the origin answered
+    # with a 304 (the response is typed as one of responses' bodies).
+    revalidation = responses.calls[1].request
+    assert revalidation.headers["If-None-Match"] == '"o1"'
+    assert revalidation.headers["If-Modified-Since"] == last_modified
+    assert revalidation.headers["User-Agent"] == "test-agent"
+    assert revalidation.req_kwargs["timeout"] == 5  # type: ignore[attr-defined]
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-cache",
+    srcdir="intersphinx-cache-direct-unreachable",
+    confoverrides={
+        "documenteer_intersphinx_cache_direct": True,
+        "documenteer_intersphinx_cache_disk_cache_ttl": 0,
+    },
+)
+def test_direct_mode_unreachable_origin(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+) -> None:
+    """In direct mode, an origin that can't be reached isn't left to
+    intersphinx to fetch again: the entry uses its expired on-disk copy, or
+    is removed from the mapping without one.
+    """
+    monkeypatch.delenv("OOK_TOKEN", raising=False)
+    origin_inv_url = "https://example.com/project/objects.inv"
+    responses.get(origin_inv_url, body=_make_inventory(), status=200)
+    app1 = _make_app(make_app, app_params)
+    inv_path = Path(_inventory_locations(app1, "testproj")[0])
+
+    responses.replace(
+        responses.GET,
+        origin_inv_url,
+        body=RequestsConnectionError("unreachable"),
+    )
+    app2 = _make_app(make_app, app_params)
+    app2.build()
+    assert _inventory_locations(app2, "testproj") == (str(inv_path),)
+    html = (Path(app2.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+    assert len(responses.calls) == 2
+
+    inv_path.unlink()
+    app3 = _make_app(make_app, app_params)
+    app3.build()
+    assert "testproj" not in app3.config.intersphinx_mapping
+    assert "unavailable in this build" in app3.status.getvalue()
+    # Intersphinx didn't try the origin again.
+    assert len(responses.calls) == 3
+
+
 @pytest.mark.sphinx(
     "html",
     testroot="intersphinx-cache",
@@ -933,6 +1634,11 @@ def test_use_service_false_disables_extension(
         (call.request.url or "").startswith(INVENTORY_ENDPOINT)
         for call in responses.calls
     )
+    # Nor is intersphinx's inventory parser wrapped.
+    assert (
+        intersphinx_load._load_inventory
+        is intersphinxcache._intersphinx_load_inventory
+    )
 
 
 @pytest.mark.skipif(
@@ -985,3 +1691,77 @@ def test_technote_preset_registers_extension(
         OOK_BASE_URL
     )
     assert app.config.documenteer_intersphinx_cache_disk_cache_ttl == 600
+
+
+@pytest.mark.sphinx(
+    "html", testroot="intersphinx-cache", srcdir="intersphinx-cache-shared"
+)
+def test_shared_cache_across_projects(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: Any,
+    tmp_path: Path,
+) -> None:
+    """With a shared cache, a second project links the inventory the first
+    project fetched instead of downloading it, and revalidates it with the
+    shared ETag once the TTL expires.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    monkeypatch.setenv(
+        "DOCUMENTEER_INTERSPHINX_CACHE_DIR", str(tmp_path / "shared")
+    )
+    origin_inv_url = "https://example.com/project/objects.inv"
+    etag = '"v1etag"'
+    responses.get(
+        INVENTORY_ENDPOINT,
+        status=304,
+        match=[
+            matchers.query_param_matcher({"url": origin_inv_url}),
+            matchers.header_matcher({"If-None-Match": etag}),
+        ],
+    )
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        headers={"ETag": etag},
+        match=[matchers.query_param_matcher({"url": origin_inv_url})],
+    )
+    args, kwargs = app_params
+    other_srcdir = Path(kwargs["srcdir"]).parent / "intersphinx-cache-shared-2"
+    shutil.copytree(kwargs["srcdir"], other_srcdir, dirs_exist_ok=True)
+
+    app1 = _make_app(make_app, app_params)
+    assert len(responses.calls) == 1
+    inv_path = Path(_inventory_locations(app1, "testproj")[0])
+
+    # The second project is within the TTL of the shared copy, so it links
+    # it without contacting Ook.
+    other_kwargs = {
+        **kwargs,
+        "srcdir": other_srcdir,
+        "builddir": other_srcdir / "_build",
+    }
+    app2 = make_app(*args, **other_kwargs)
+    assert len(responses.calls) == 1
+    other_inv_path = Path(_inventory_locations(app2, "testproj")[0])
+    assert other_inv_path != inv_path
+    assert other_inv_path.stat().st_ino == inv_path.stat().st_ino
+    assert "from the shared cache" in app2.status.getvalue()
+
+    # After a clean build with an expired TTL, the project links the shared
+    # copy again and revalidates it with the shared ETag.
+    shutil.rmtree(other_inv_path.parent)
+    app3 = make_app(
+        *args,
+        **{
+            **other_kwargs,
+            "confoverrides": {
+                "documenteer_intersphinx_cache_disk_cache_ttl": 0
+            },
+        },
+    )
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.headers["If-None-Match"] == etag
+    assert Path(_inventory_locations(app3, "testproj")[0]).is_file()
@@ -0,0 +1,245 @@
+"""Tests for the documenteer.ext.intersphinxtrim extension."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from pathlib import Path
+from typing import Any
+
+import pytest
+import pytest_responses  # noqa: F401
+from responses import RequestsMock
+from sphinx.addnodes import pending_xref
+from sphinx.ext.intersphinx import InventoryAdapter
+from sphinx.ext.intersphinx import _resolve as intersphinx_resolve
+from sphinx.testing.util import SphinxTestApp
+
+from documenteer.ext import intersphinxtrim
+from documenteer.ext.intersphinxtrim import RECORD_FILENAME
+
+INVENTORY_ENDPOINT = "https://roundtable.lsst.cloud/ook/intersphinx/inventory"
+
+
+def _make_inventory() -> bytes:
+    """Build a Sphinx v2 object inventory with two functions, a class, and
+    a label.
+    """
+    header = (
+        b"# Sphinx inventory version 2\n"
+        b"# Project: Test Project\n"
+        b"# Version: 1.0\n"
+        b"# The remainder of this file is compressed using zlib.\n"
+    )
+    body = (
+        b"example.func py:function 1 api.html#example.func -\n"
+        b"example.other py:function 1 api.html#example.other -\n"
+        b"example.Klass py:class 1 api.html#example.Klass -\n"
+        b"some-label std:label -1 guide.html#some-label Some label\n"
+    )
+    return header + zlib.compress(body, 9)
+
+
+def _make_app(make_app: Any, app_params: Any) -> SphinxTestApp:
+    """Construct the test app after the Ook response is mocked."""
+    args, kwargs = app_params
+    return make_app(*args, **kwargs)
+
+
+def _named_inventory(app: SphinxTestApp) -> dict[str, dict[str, Any]]:
+    """Return the loaded inventory of the ``testproj`` mapping entry."""
+    return InventoryAdapter(app.env).named_inventory["testproj"]
+
+
+@pytest.mark.sphinx("html", testroot="intersphinx-trim")
+def test_trimmed_inventory(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A build records the objects each inventory resolves, later builds
+    load only those objects and the safety set, and fall back to the full
+    inventory for a reference that isn't in the trimmed one.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+
+    # The first build loads the full inventory and records the resolved
+    # objects, and the unresolved reference.
+    app = _make_app(make_app, app_params)
+    app.build()
+    assert "example.other" in _named_inventory(app)["py:function"]
+    record_path = Path(app.doctreedir).parent / RECORD_FILENAME
+    record = json.loads(record_path.read_text())
+    assert record["documents"] == {
+        "index": {
+            "objects": {"testproj": {"py:function": ["example.func"]}},
+            "unresolved": ["py:func:missing.func"],
+        }
+    }
+    assert list(record["inventories"]) == ["testproj"]
+
+    # The next build trims the inventory to the recorded function and the
+    # classes (a safety set type), and the known unresolved reference
+    # doesn't cause a fallback.
+    app = _make_app(make_app, app_params)
+    app.build(force_all=True)
+    inventory = _named_inventory(app)
+    assert list(inventory["py:function"]) == ["example.func"]
+    assert list(inventory["py:class"]) == ["example.Klass"]
+    assert "std:label" not in inventory
+    status = app.status.getvalue()
+    assert "to 2 of 4 objects" in status
+    assert "Loading the full intersphinx inventories" not in status
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+
+    # A new reference falls back to the full inventory, and is recorded.
+    index = Path(app.srcdir) / "index.rst"
+    index.write_text(
+        index.read_text() + "\nAnother one: :py:func:`example.other`.\n"
+    )
+    app = _make_app(make_app, app_params)
+    app.build()
+    assert "Loading the full intersphinx inventories" in (
+        app.status.getvalue()
+    )
+    assert "example.other" in _named_inventory(app)["py:function"]
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.other" in html
+    record = json.loads(record_path.read_text())
+    assert record["documents"]["index"]["objects"] == {
+        "testproj": {"py:function": ["example.func", "example.other"]}
+    }
+
+    # An :external: role also falls back to the full inventory.
+    index.write_text(
+        index.read_text() + "\nA label: :external+testproj:ref:`some-label`.\n"
+    )
+    app = _make_app(make_app, app_params)
+    app.build()
+    assert "Loading the full intersphinx inventories" in (
+        app.status.getvalue()
+    )
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/guide.html#some-label" in html
+    record = json.loads(record_path.read_text())
+    assert record["documents"]["index"]["objects"]["testproj"][
+        "std:label"
+    ] == ["some-label"]
+
+
+@pytest.mark.sphinx(
+    "html", testroot="intersphinx-trim", srcdir="intersphinx-trim-sphinx-8-1"
+)
+def test_trim_needs_sphinx_8_2(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without intersphinx's ``_load_inventory`` (before Sphinx 8.2), the
+    inventories aren't trimmed or recorded, and the build still succeeds.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    monkeypatch.setattr(intersphinxtrim, "_CAN_TRIM", False)
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+
+    app = _make_app(make_app, app_params)
+    app.build()
+    assert "Not trimming the intersphinx inventories" in app.status.getvalue()
+    assert not (Path(app.doctreedir).parent / RECORD_FILENAME).exists()
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+    # None of the trimming handlers are connected.
+    handlers = [
+        listener.handler
+        for listener in app.events.listeners["missing-reference"]
+    ]
+    assert intersphinxtrim._check_missing_reference not in handlers
+
+
+@pytest.mark.sphinx(
+    "html", testroot="intersphinx-trim", srcdir="intersphinx-trim-resolve"
+)
+def test_reference_resolved_once(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The trimming handler takes the place of intersphinx's own
+    ``missing-reference`` handler, so each reference is resolved once.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+    resolved: list[str] = []
+    resolve = intersphinx_resolve.resolve_reference_detect_inventory
+
+    def _counting_resolve(env: Any, node: pending_xref, contnode: Any) -> Any:
+        resolved.append(node["reftarget"])
+        return resolve(env, node, contnode)
+
+    monkeypatch.setattr(
+        intersphinx_resolve,
+        "resolve_reference_detect_inventory",
+        _counting_resolve,
+    )
+
+    app = _make_app(make_app, app_params)
+    app.build()
+    assert resolved == ["example.func", "missing.func"]
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="intersphinx-trim",
+    srcdir="intersphinx-trim-disabled",
+    confoverrides={"documenteer_intersphinx_cache_trim": False},
+)
+def test_trim_disabled(
+    make_app: Any,
+    app_params: Any,
+    responses: RequestsMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without trimming, none of the trimming handlers are connected."""
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        INVENTORY_ENDPOINT,
+        body=_make_inventory(),
+        status=200,
+        content_type="application/octet-stream",
+    )
+
+    app = _make_app(make_app, app_params)
+    app.build()
+    handlers = [
+        listener.handler
+        for events in app.events.listeners.values()
+        for listener in events
+    ]
+    assert intersphinxtrim._start not in handlers
+    assert intersphinxtrim._check_missing_reference not in handlers
+    assert intersphinxtrim._write_record not in handlers
+    assert not (Path(app.doctreedir).parent / RECORD_FILENAME).exists()
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "https://example.com/project/api.html#example.func" in html
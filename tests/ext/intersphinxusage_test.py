@@ -0,0 +1,75 @@
+"""Tests for the documenteer.ext.intersphinxusage extension."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from pathlib import Path
+from typing import Any
+
+import pytest
+import pytest_responses  # noqa: F401
+from responses import RequestsMock
+from sphinx.testing.util import SphinxTestApp
+
+from documenteer.ext.intersphinxusage import REPORT_FILENAME
+
+
+def _make_inventory(name: str) -> bytes:
+    """Build a Sphinx v2 object inventory with a single ``py:function``."""
+    header = (
+        b"# Sphinx inventory version 2\n"
+        b"# Project: Test Project\n"
+        b"# Version: 1.0\n"
+        b"# The remainder of this file is compressed using zlib.\n"
+    )
+    body = f"{name} py:function 1 api.html#{name} -\n".encode()
+    return header + zlib.compress(body, 9)
+
+
+def _make_app(make_app: Any, app_params: Any) -> SphinxTestApp:
+    """Construct the test app after the inventories are mocked."""
+    args, kwargs = app_params
+    return make_app(*args, **kwargs)
+
+
+@pytest.mark.sphinx("html", testroot="intersphinx-usage")
+def test_usage_report(
+    make_app: Any, app_params: Any, responses: RequestsMock
+) -> None:
+    """The report counts the references each inventory resolves, lists the
+    unused and rarely used inventories, and is updated by an incremental
+    build.
+    """
+    for host in ("a", "b", "c"):
+        responses.get(
+            f"https://{host}.example.com/objects.inv",
+            body=_make_inventory(f"{host}.func"),
+        )
+
+    app = _make_app(make_app, app_params)
+    app.build()
+
+    report_path = Path(app.doctreedir).parent / REPORT_FILENAME
+    report = json.loads(report_path.read_text())
+    assert report["inventories"] == {
+        "proja": {"references": 2, "documents": 1},
+        "projb": {"references": 1, "documents": 1},
+        "projc": {"references": 0, "documents": 0},
+    }
+    assert report["unused"] == ["projc"]
+    assert report["rarely_used"] == ["projb"]
+    status = app.status.getvalue()
+    assert "resolved no references: projc" in status
+    assert "fewer than 2 references: projb" in status
+
+    # An incremental build only resolves the changed page, and reuses the
+    # counts of the others.
+    (Path(app.srcdir) / "other.rst").write_text("Other page\n==========\n")
+    app = _make_app(make_app, app_params)
+    app.build()
+
+    report = json.loads(report_path.read_text())
+    assert report["inventories"]["proja"] == {"references": 2, "documents": 1}
+    assert report["unused"] == ["projb", "projc"]
+    assert report["documents"] == {"index": {"proja": 2}, "other": {}}
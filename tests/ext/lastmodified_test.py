@@ -4,15 +4,34 @@
 from __future__ import annotations
 
 import importlib.util
+import json
+import os
+import pickle
+import sys
+import time
+import types
 from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from git import Repo
+from sphinx.application import Sphinx
 from sphinx.testing.util import SphinxTestApp
 
-from documenteer.conf._utils import get_template_dir
+from documenteer.conf._utils import GitRepository, LastCommit, get_template_dir
+from documenteer.ext.lastmodified import (
+    HISTORY_INDEX_CACHE_FILENAME,
+    MANIFEST_FILENAME,
+    LastModified,
+    _find_module_source,
+)
 
 FIXED_DATE = datetime(2024, 6, 1, tzinfo=UTC)
+# The HEAD commit the mocked repository reports.
+HEAD_SHA = "a" * 40
+# The commit the mocked repository reports for every page.
+COMMIT_SHA = "c" * 40
 EXPECTED = "Jun 01, 2024"
 # The ISO 8601 form of FIXED_DATE, as emitted into the page metadata.
 EXPECTED_ISO = "2024-06-01T00:00:00+00:00"
@@ -32,9 +51,9 @@ OFFSET_EXPECTED_ISO = "2024-06-02T05:00:00+00:00"
 # ``html_theme = "pydata_sphinx_theme"`` would otherwise error during fixture
 # setup when the theme isn't installed.
 _HAS_PYDATA = importlib.util.find_spec("pydata_sphinx_theme") is not None
-# Whether sphinx-last-updated-by-git is importable. The user-guide preset
-# auto-loads it through sphinx-sitemap; the guide-stack regression test loads
-# it explicitly to reproduce the footer/last_updated interaction.
+# Whether sphinx-last-updated-by-git is importable. sphinx-sitemap auto-loads
+# it when sitemap_show_lastmod is set in conf.py; the regression test loads it
+# explicitly to reproduce the footer/last_updated interaction.
 _HAS_GIT_EXT = (
     importlib.util.find_spec("sphinx_last_updated_by_git") is not None
 )
@@ -44,7 +63,11 @@ def _mock_git_repository(date: datetime = FIXED_DATE) -> MagicMock:
     """Build a mock GitRepository that always reports a fixed commit date."""
     mock_repo = MagicMock()
     mock_repo.is_shallow = False
-    mock_repo.compute_last_modified.return_value = date
+    mock_repo.history_manifest_head = None
+    mock_repo.head_sha = HEAD_SHA
+    mock_repo.compute_last_commit.return_value = LastCommit(
+        sha=COMMIT_SHA, date=date
+    )
     return mock_repo
 
 
@@ -64,7 +87,8 @@ def _build_and_capture(
 
     app.connect("html-page-context", probe, priority=700)
     with patch(
-        "documenteer.ext.lastmodified.GitRepository", return_value=mock_repo
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
     ):
         app.build()
     return captured
@@ -94,7 +118,7 @@ def test_last_updated_on_content_pages(app: SphinxTestApp) -> None:
     # demonstrating that include/literalinclude dependencies are accounted for.
     considered = [
         str(path)
-        for call in mock_repo.compute_last_modified.call_args_list
+        for call in mock_repo.compute_last_commit.call_args_list
         for path in call.args[0]
     ]
     assert any(path.endswith("snippet.txt") for path in considered)
@@ -221,7 +245,7 @@ def test_last_updated_disabled(app: SphinxTestApp) -> None:
 
     assert captured["index"]["last_updated"] is None
     assert captured["page2"]["last_updated"] is None
-    mock_repo.compute_last_modified.assert_not_called()
+    mock_repo.compute_last_commit.assert_not_called()
 
     # No last-modified metadata is emitted when the feature is disabled.
     assert not _has_modified_metatags(captured["index"])
@@ -244,7 +268,7 @@ def test_last_updated_suppressed_for_shallow_clone(app: SphinxTestApp) -> None:
     # No page gets a date, and Git is never consulted for commit history.
     assert captured["index"]["last_updated"] is None
     assert captured["page2"]["last_updated"] is None
-    mock_repo.compute_last_modified.assert_not_called()
+    mock_repo.compute_last_commit.assert_not_called()
 
     # Misleading metadata is suppressed along with the visible timestamp.
     assert not _has_modified_metatags(captured["index"])
@@ -258,6 +282,56 @@ def test_last_updated_suppressed_for_shallow_clone(app: SphinxTestApp) -> None:
     assert "[documenteer.git_shallow]" in warnings
 
 
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-shallow-manifest",
+    confoverrides={
+        "documenteer_last_modified_history_manifest": "history.json"
+    },
+)
+def test_shallow_clone_with_history_manifest(app: SphinxTestApp) -> None:
+    """A history manifest supplies the history a shallow clone lacks, so
+    pages are dated without a warning.
+    """
+    mock_repo = _mock_git_repository()
+    mock_repo.is_shallow = True
+    mock_repo.history_manifest_head = HEAD_SHA
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    # The manifest path is relative to the configuration directory.
+    kwargs = mock_repo.enable_history_index.call_args.kwargs
+    assert kwargs["history_manifest"] == (Path(app.confdir) / "history.json")
+    assert EXPECTED in (app.outdir / "index.html").read_text()
+    assert "shallow clone" not in app.warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-shallow-bad-manifest",
+    confoverrides={
+        "documenteer_last_modified_history_manifest": "history.json"
+    },
+)
+def test_shallow_clone_with_unreadable_history_manifest(
+    app: SphinxTestApp,
+) -> None:
+    """An unreadable history manifest leaves a shallow clone undated."""
+    mock_repo = _mock_git_repository()
+    mock_repo.is_shallow = True
+    captured = _build_and_capture(app, mock_repo)
+
+    assert captured["index"]["last_updated"] is None
+    warnings = app.warning.getvalue()
+    assert warnings.count("history manifest") == 1
+    assert "[documenteer.git_shallow]" in warnings
+
+
 @pytest.mark.skipif(
     not _HAS_PYDATA, reason="pydata_sphinx_theme is not installed"
 )
@@ -280,7 +354,8 @@ def test_last_updated_rendered_in_pydata_article(app: SphinxTestApp) -> None:
     """
     mock_repo = _mock_git_repository()
     with patch(
-        "documenteer.ext.lastmodified.GitRepository", return_value=mock_repo
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
     ):
         app.build()
 
@@ -314,23 +389,25 @@ def test_last_updated_rendered_in_pydata_article(app: SphinxTestApp) -> None:
         "html_theme": "pydata_sphinx_theme",
         "html_theme_options": {"article_footer_items": ["last-updated"]},
         "templates_path": [get_template_dir("pydata")],
-        # Mirror the user-guide preset, which silences git-ext's duplicate tag.
+        # Silence git-ext's duplicate Open Graph tag.
         "git_last_updated_metatags": False,
     },
 )
 def test_last_updated_rendered_with_git_extension(app: SphinxTestApp) -> None:
-    """End-to-end with sphinx-last-updated-by-git loaded, as in the guide.
-
-    The guide preset auto-loads sphinx-last-updated-by-git (through
-    sphinx-sitemap). Its html-page-context handler resets ``last_updated`` to
-    `None` (``html_last_updated_fmt`` is unset). This regression test pins the
-    handler priority bracketing: the ``<time>`` footer component still survives
-    pydata's empty-check (so the footer renders) and the late handler still
-    restores ``last_updated`` (so the ``docbuild:last-update`` tag is emitted).
+    """End-to-end with sphinx-last-updated-by-git loaded alongside.
+
+    sphinx-sitemap auto-loads sphinx-last-updated-by-git when a project sets
+    ``sitemap_show_lastmod`` itself. Its html-page-context handler resets
+    ``last_updated`` to `None` (``html_last_updated_fmt`` is unset). This
+    regression test pins the handler priority bracketing: the ``<time>``
+    footer component still survives pydata's empty-check (so the footer
+    renders) and the late handler still restores ``last_updated`` (so the
+    ``docbuild:last-update`` tag is emitted).
     """
     mock_repo = _mock_git_repository()
     with patch(
-        "documenteer.ext.lastmodified.GitRepository", return_value=mock_repo
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
     ):
         app.build()
 
@@ -347,3 +424,516 @@ def test_last_updated_rendered_with_git_extension(app: SphinxTestApp) -> None:
         in html
     )
     assert html.count('property="article:modified_time"') == 1
+
+
+@pytest.mark.sphinx(
+    "html", testroot="lastmodified", srcdir="lastmodified-indexcache"
+)
+def test_history_index_cache_in_doctrees(app: SphinxTestApp) -> None:
+    """The Git history index is persisted in the doctree cache."""
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ) as get_repo:
+        app.build()
+
+    # The shared repository is put in history-index mode.
+    get_repo.assert_called_once_with(Path(app.srcdir))
+    mock_repo.enable_history_index.assert_called_once()
+    kwargs = mock_repo.enable_history_index.call_args.kwargs
+    assert kwargs["history_index_cache"] == (
+        Path(app.doctreedir) / HISTORY_INDEX_CACHE_FILENAME
+    )
+    assert kwargs["backend"] == "subprocess"
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-objects",
+    confoverrides={"documenteer_last_modified_git_backend": "objects"},
+)
+def test_git_backend_config(app: SphinxTestApp) -> None:
+    """The Git backend configuration selects the GitRepository backend."""
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    kwargs = mock_repo.enable_history_index.call_args.kwargs
+    assert kwargs["backend"] == "objects"
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-uncommitted",
+    confoverrides={
+        "documenteer_last_modified_uncommitted": "now",
+        "documenteer_last_modified_manifest": True,
+    },
+)
+def test_uncommitted_dates(app: SphinxTestApp) -> None:
+    """With uncommitted dating enabled, the working-tree status is taken once
+    per build and passed on to every lookup.
+    """
+    mock_repo = _mock_git_repository()
+    mock_repo.compute_last_commit.return_value = LastCommit(
+        sha=None, date=FIXED_DATE
+    )
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    mock_repo.refresh_dirty_paths.assert_called_once_with()
+    assert {
+        call.kwargs["uncommitted"]
+        for call in mock_repo.compute_last_commit.call_args_list
+    } == {"now"}
+    # A page dated by uncommitted changes has no commit in the manifest.
+    manifest = json.loads((app.outdir / MANIFEST_FILENAME).read_text())
+    assert manifest["pages"]["index"]["modified"] == EXPECTED_ISO
+    assert manifest["pages"]["index"]["commit"] is None
+
+
+@pytest.mark.sphinx(
+    "html", testroot="lastmodified", srcdir="lastmodified-committed-only"
+)
+def test_uncommitted_ignored_by_default(app: SphinxTestApp) -> None:
+    """By default, the working-tree status isn't taken."""
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    mock_repo.refresh_dirty_paths.assert_not_called()
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-sitemap",
+    confoverrides={
+        "extensions": ["sphinx_sitemap", "documenteer.ext.lastmodified"],
+        "html_baseurl": "https://example.lsst.io/",
+        "documenteer_last_modified_sitemap": True,
+    },
+)
+def test_sitemap_lastmod_from_dates(app: SphinxTestApp) -> None:
+    """The sitemap's lastmod entries come from this extension's dates,
+    without loading sphinx-last-updated-by-git.
+    """
+    mock_repo = _mock_git_repository(OFFSET_DATE)
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    assert "sphinx_last_updated_by_git" not in app.extensions
+    assert app.config.sitemap_show_lastmod is True
+    sitemap = (app.outdir / "sitemap.xml").read_text()
+    # sphinx-sitemap renders the dates in UTC.
+    assert "page2.html</loc><lastmod>2024-06-02T05:00:00Z</lastmod>" in sitemap
+    assert "genindex.html</loc></url>" in sitemap
+    # The sitemap table is set after the environment is pickled, so it isn't
+    # saved with it.
+    with (Path(app.doctreedir) / "environment.pickle").open("rb") as f:
+        assert not hasattr(pickle.load(f), "git_last_updated")
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-sitemap-only",
+    confoverrides={
+        "extensions": ["sphinx_sitemap", "documenteer.ext.lastmodified"],
+        "html_baseurl": "https://example.lsst.io/",
+        "documenteer_last_modified_enabled": False,
+        "documenteer_last_modified_sitemap": True,
+    },
+)
+def test_sitemap_lastmod_without_footer(app: SphinxTestApp) -> None:
+    """Sitemap dates are provided even when the page footer is disabled."""
+    mock_repo = _mock_git_repository()
+    captured = _build_and_capture(app, mock_repo)
+
+    assert captured["index"]["last_updated"] is None
+    assert not _has_modified_metatags(captured["index"])
+    sitemap = (app.outdir / "sitemap.xml").read_text()
+    assert "<lastmod>2024-06-01T00:00:00Z</lastmod>" in sitemap
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-manifest",
+    confoverrides={
+        "documenteer_last_modified_manifest": True,
+        "html_baseurl": "https://example.lsst.io/",
+    },
+)
+def test_manifest_written(app: SphinxTestApp) -> None:
+    """The manifest maps each page to its URL, UTC date, and commit."""
+    mock_repo = _mock_git_repository()
+
+    def last_commit(
+        paths: list[Path], *, uncommitted: str
+    ) -> LastCommit | None:
+        # page2's files are untracked.
+        if Path(paths[0]).name == "page2.rst":
+            return None
+        return LastCommit(sha=COMMIT_SHA, date=OFFSET_DATE)
+
+    mock_repo.compute_last_commit.side_effect = last_commit
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    manifest = json.loads((app.outdir / MANIFEST_FILENAME).read_text())
+    assert manifest == {
+        "version": 1,
+        "head": HEAD_SHA,
+        "base_url": "https://example.lsst.io/",
+        "pages": {
+            "index": {
+                "path": "index.html",
+                "url": "https://example.lsst.io/index.html",
+                "modified": OFFSET_EXPECTED_ISO,
+                "commit": COMMIT_SHA,
+            },
+            "page2": {
+                "path": "page2.html",
+                "url": "https://example.lsst.io/page2.html",
+                "modified": None,
+                "commit": None,
+            },
+        },
+    }
+
+
+@pytest.mark.sphinx(
+    "dirhtml",
+    testroot="lastmodified",
+    srcdir="lastmodified-manifest-dirhtml",
+    confoverrides={
+        "documenteer_last_modified_manifest": True,
+        # Dates are only needed for the manifest.
+        "documenteer_last_modified_enabled": False,
+    },
+)
+def test_manifest_dirhtml(app: SphinxTestApp) -> None:
+    """Manifest paths follow the builder's URLs, and there are no absolute
+    URLs without html_baseurl.
+    """
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    manifest = json.loads((app.outdir / MANIFEST_FILENAME).read_text())
+    assert "base_url" not in manifest
+    assert manifest["pages"]["page2"] == {
+        "path": "page2/",
+        "modified": EXPECTED_ISO,
+        "commit": COMMIT_SHA,
+    }
+
+
+@pytest.mark.sphinx(
+    "html", testroot="lastmodified", srcdir="lastmodified-no-manifest"
+)
+def test_manifest_not_written_by_default(app: SphinxTestApp) -> None:
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+
+    assert not (app.outdir / MANIFEST_FILENAME).exists()
+
+
+def _set_mtime(path: Path, offset: float) -> None:
+    """Set a source file's mtime relative to now.
+
+    A positive offset puts it past the previous build's read time so an
+    incremental build sees the file as changed; a negative offset settles it
+    again afterwards.
+    """
+    mtime = time.time() + offset
+    os.utime(path, (mtime, mtime))
+
+
+def _computed_sources(mock_repo: MagicMock) -> list[str]:
+    """Names of the page source files whose dates the mock computed."""
+    return sorted(
+        Path(call.args[0][0]).name
+        for call in mock_repo.compute_last_commit.call_args_list
+    )
+
+
+@pytest.mark.sphinx(
+    "html", testroot="lastmodified", srcdir="lastmodified-incremental"
+)
+def test_dates_stored_in_environment(app: SphinxTestApp) -> None:
+    """Dates are computed in the read phase and kept in the environment, so
+    an incremental build only recomputes documents Sphinx re-reads.
+    """
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+        assert _computed_sources(mock_repo) == ["index.rst", "page2.rst"]
+        assert app.env.documenteer_last_modified == {
+            "index": LastCommit(sha=COMMIT_SHA, date=FIXED_DATE),
+            "page2": LastCommit(sha=COMMIT_SHA, date=FIXED_DATE),
+        }
+
+        # Nothing changed: no Git work at all.
+        mock_repo.compute_last_commit.reset_mock()
+        app.build()
+        mock_repo.compute_last_commit.assert_not_called()
+
+        # Editing a page recomputes only that page.
+        mock_repo.compute_last_commit.reset_mock()
+        _set_mtime(app.srcdir / "page2.rst", 10)
+        app.build()
+        assert _computed_sources(mock_repo) == ["page2.rst"]
+        _set_mtime(app.srcdir / "page2.rst", -60)
+
+        # Editing a literalinclude'd file recomputes the including page.
+        mock_repo.compute_last_commit.reset_mock()
+        _set_mtime(app.srcdir / "snippet.txt", 10)
+        app.build()
+        assert _computed_sources(mock_repo) == ["index.rst"]
+
+
+@pytest.mark.sphinx(
+    "html", testroot="lastmodified", srcdir="lastmodified-headmoved"
+)
+def test_dates_refreshed_when_head_moves(app: SphinxTestApp) -> None:
+    """A new commit can change a date without touching any source file, so
+    when HEAD moves every date is recomputed and changed pages are rewritten.
+    """
+    captured: dict[str, dict] = {}
+
+    def probe(app, pagename, templatename, context, doctree):
+        captured[pagename] = dict(context)
+
+    app.connect("html-page-context", probe, priority=700)
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ):
+        app.build()
+        assert captured["page2"]["last_updated"] == EXPECTED
+
+        captured.clear()
+        mock_repo.head_sha = "b" * 40
+        mock_repo.compute_last_commit.return_value = LastCommit(
+            sha="d" * 40, date=OFFSET_DATE
+        )
+        app.build()
+
+    # page2 was not re-read, but it is rewritten with its new date.
+    assert captured["page2"]["last_updated"] == OFFSET_EXPECTED
+    assert (
+        captured["page2"]["documenteer_last_modified_iso"]
+        == OFFSET_EXPECTED_ISO
+    )
+    assert app.env.documenteer_last_modified_head == "b" * 40
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lastmodified",
+    srcdir="lastmodified-parallel",
+    parallel=2,
+)
+def test_parallel_writers_share_dates(app: SphinxTestApp) -> None:
+    """Under ``-j``, dates are computed once in the main process and the
+    forked writers render them without any Git work of their own.
+    """
+    mock_repo = _mock_git_repository()
+    with patch(
+        "documenteer.ext.lastmodified.get_git_repository",
+        return_value=mock_repo,
+    ) as repo_cls:
+        app.build()
+
+    assert app.builder.parallel_ok
+
+    # The mock only records calls made in this (the main) process, so one
+    # computation per page proves none were left to the writers.
+    repo_cls.assert_called_once()
+    assert _computed_sources(mock_repo) == ["index.rst", "page2.rst"]
+
+    # The basic theme renders ``last_updated`` in its footer. page2 is written
+    # by a forked worker (the first document is written in the main process).
+    for page in ("index.html", "page2.html"):
+        html = (app.outdir / page).read_text()
+        assert f"Last updated on {EXPECTED}." in html
+
+
+def _git_commit_all(repo: Repo, date: str) -> None:
+    """Commit everything in the working tree at a fixed date."""
+    repo.git.add("-A")
+    repo.git.commit(
+        "-q",
+        "-m",
+        "Commit",
+        env={
+            "GIT_AUTHOR_NAME": "Test Author",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_AUTHOR_DATE": date,
+            "GIT_COMMITTER_NAME": "Test Author",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            "GIT_COMMITTER_DATE": date,
+        },
+    )
+
+
+def test_history_index_cache_not_published(tmp_path: Path) -> None:
+    """A build without ``-d``, whose doctree cache is in the HTML output,
+    publishes nothing more than a build without the extension.
+    """
+    docs = tmp_path / "repo"
+    docs.mkdir()
+    (docs / ".gitignore").write_text("_build/\n")
+    (docs / "index.rst").write_text("Index\n=====\n")
+    repo = Repo.init(docs)
+    _git_commit_all(repo, "2024-01-01T00:00:00+00:00")
+
+    def build(name: str, extensions: list[str]) -> Path:
+        outdir = docs / "_build" / name
+        (docs / "conf.py").write_text(f"extensions = {extensions!r}\n")
+        app = Sphinx(
+            srcdir=docs,
+            confdir=docs,
+            outdir=outdir,
+            doctreedir=outdir / ".doctrees",
+            buildername="html",
+            status=None,
+            warning=None,
+        )
+        app.build()
+        return outdir
+
+    plain = build("plain", [])
+    outdir = build("html", ["documenteer.ext.lastmodified"])
+    assert (outdir / ".doctrees" / HISTORY_INDEX_CACHE_FILENAME).is_file()
+    assert sorted(path.name for path in outdir.iterdir()) == sorted(
+        path.name for path in plain.iterdir()
+    )
+
+
+def test_api_page_dated_by_module_source(tmp_path: Path) -> None:
+    """A page documenting a package's re-exported class is dated by the
+    module that defines the class, not by the package's __init__.py.
+    """
+    root = tmp_path / "repo"
+    pkg = root / "lastmod_api_pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text(
+        '"""Package."""\n\nfrom ._impl import Widget\n\n__all__ = ["Widget"]\n'
+    )
+    (pkg / "_impl.py").write_text(
+        'class Widget:\n    """A widget."""\n\n'
+        "    @property\n    def size(self) -> int:\n"
+        '        """The size."""\n        return 1\n'
+    )
+    docs = root / "docs"
+    docs.mkdir()
+    (root / ".gitignore").write_text("_build/\n__pycache__/\n")
+    (docs / "conf.py").write_text(
+        "import sys\n"
+        f"sys.path.insert(0, {str(root)!r})\n"
+        'extensions = ["sphinx.ext.autodoc", "documenteer.ext.lastmodified"]\n'
+    )
+    (docs / "index.rst").write_text("Index\n=====\n\n.. toctree::\n\n   api\n")
+    (docs / "api.rst").write_text(
+        "API\n===\n\n.. autoclass:: lastmod_api_pkg.Widget\n   :members:\n"
+    )
+    repo = Repo.init(root)
+    _git_commit_all(repo, "2024-01-01T00:00:00+00:00")
+    (pkg / "_impl.py").write_text(
+        (pkg / "_impl.py").read_text() + "\n\nUNUSED = 1\n"
+    )
+    _git_commit_all(repo, "2024-06-01T00:00:00+00:00")
+
+    try:
+        app = Sphinx(
+            srcdir=docs,
+            confdir=docs,
+            outdir=docs / "_build" / "html",
+            doctreedir=docs / "_build" / "doctrees",
+            buildername="html",
+            status=None,
+            warning=None,
+        )
+        app.build()
+    finally:
+        for modname in ("lastmod_api_pkg", "lastmod_api_pkg._impl"):
+            sys.modules.pop(modname, None)
+        sys.path[:] = [p for p in sys.path if p != str(root)]
+
+    assert LastModified.get_module_table(app.env)["api"] == {
+        "lastmod_api_pkg._impl"
+    }
+    dates = LastModified.get_date_table(app.env)
+    assert dates["api"].date == datetime(2024, 6, 1, tzinfo=UTC)
+    assert dates["index"].date == datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def test_installed_module_source(tmp_path: Path) -> None:
+    """A module installed into site-packages is matched to its source in the
+    repository by its package path.
+    """
+    root = tmp_path / "repo"
+    (root / "src" / "lastmod_inst_pkg").mkdir(parents=True)
+    (root / "src" / "lastmod_inst_pkg" / "__init__.py").write_text("")
+    (root / "src" / "lastmod_inst_pkg" / "mod.py").write_text("X = 1\n")
+    repo = Repo.init(root)
+    _git_commit_all(repo, "2024-01-01T00:00:00+00:00")
+    git_repo = GitRepository(root, history_index=True)
+
+    site_packages = tmp_path / "venv" / "lib" / "site-packages"
+    modules = {
+        "lastmod_inst_pkg": site_packages / "lastmod_inst_pkg/__init__.py",
+        "lastmod_inst_pkg.mod": site_packages / "lastmod_inst_pkg/mod.py",
+        "lastmod_inst_other": site_packages / "lastmod_inst_other.py",
+        "lastmod_inst_stdlib": tmp_path / "lib" / "lastmod_inst_pkg/mod.py",
+    }
+    try:
+        for modname, filename in modules.items():
+            module = types.ModuleType(modname)
+            module.__file__ = str(filename)
+            sys.modules[modname] = module
+        assert _find_module_source(git_repo, "lastmod_inst_pkg") == (
+            root / "src/lastmod_inst_pkg/__init__.py"
+        )
+        assert _find_module_source(git_repo, "lastmod_inst_pkg.mod") == (
+            root / "src/lastmod_inst_pkg/mod.py"
+        )
+        # Not in the repository, or not installed in site-packages.
+        assert _find_module_source(git_repo, "lastmod_inst_other") is None
+        assert _find_module_source(git_repo, "lastmod_inst_stdlib") is None
+        assert _find_module_source(git_repo, "lastmod_inst_missing") is None
+    finally:
+        for modname in modules:
+            sys.modules.pop(modname, None)
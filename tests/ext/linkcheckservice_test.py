@@ -610,9 +610,6 @@ def test_non_broken_statuses_pass_build(
     testroot="linkcheck-service",
     srcdir="linkcheck-service-warningiserror",
     warningiserror=True,
-    # The test root is not a Git repository, so sphinx-last-updated-by-git
-    # warns; suppress it to isolate link-check reporting under -W.
-    confoverrides={"suppress_warnings": ["git"]},
 )
 def test_non_broken_statuses_pass_warningiserror(
     app: SphinxTestApp, responses: RequestsMock, monkeypatch: Any
@@ -711,9 +708,6 @@ def test_blocked_links_reported_as_caveat(
     testroot="linkcheck-service",
     srcdir="linkcheck-service-warningiserror-blocked",
     warningiserror=True,
-    # The test root is not a Git repository, so sphinx-last-updated-by-git
-    # warns; suppress it to isolate link-check reporting under -W.
-    confoverrides={"suppress_warnings": ["git"]},
 )
 def test_blocked_passes_warningiserror(
     app: SphinxTestApp, responses: RequestsMock, monkeypatch: Any
@@ -794,9 +788,6 @@ def test_blocked_link_json_artifact(
     testroot="linkcheck-service",
     srcdir="linkcheck-service-warningiserror-broken",
     warningiserror=True,
-    # The test root is not a Git repository, so sphinx-last-updated-by-git
-    # warns; suppress it so only the broken-link warning can raise under -W.
-    confoverrides={"suppress_warnings": ["git"]},
 )
 def test_broken_fails_warningiserror(
     app: SphinxTestApp, responses: RequestsMock, monkeypatch: Any
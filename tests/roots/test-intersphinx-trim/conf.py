@@ -0,0 +1,13 @@
+# Standalone Sphinx configuration for the intersphinxtrim extension tests,
+# which trims the inventories that intersphinxcache prefetches.
+
+extensions = [
+    "sphinx.ext.intersphinx",
+    "documenteer.ext.intersphinxcache",
+]
+
+intersphinx_mapping = {
+    "testproj": ("https://example.com/project/", None),
+}
+
+documenteer_intersphinx_cache_trim = True
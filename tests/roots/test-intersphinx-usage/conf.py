@@ -0,0 +1,16 @@
+# Standalone Sphinx configuration with three intersphinx projects, used to
+# exercise the intersphinxusage extension's report.
+
+extensions = [
+    "sphinx.ext.intersphinx",
+    "documenteer.ext.intersphinxusage",
+]
+
+intersphinx_mapping = {
+    "proja": ("https://a.example.com/", None),
+    "projb": ("https://b.example.com/", None),
+    "projc": ("https://c.example.com/", None),
+}
+
+documenteer_intersphinx_usage_report = True
+documenteer_intersphinx_usage_threshold = 2
@@ -0,0 +1,131 @@
+"""Test the ChangedPagesService class and the changed-pages command."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+from click.testing import CliRunner
+from git import Actor, Repo
+from sphinx.application import Sphinx
+
+from documenteer.cli import main
+from documenteer.services.changedpages import ChangedPagesService
+
+ACTOR = Actor("Test Author", "test@example.com")
+
+
+def _commit(repo: Repo, message: str) -> str:
+    """Commit every change in the working tree and return the commit SHA."""
+    repo.git.add("-A")
+    repo.index.commit(message, author=ACTOR, committer=ACTOR)
+    return repo.head.commit.hexsha
+
+
+def _make_project(root: Path) -> tuple[Repo, str]:
+    """Create and build a Sphinx project in a Git repository, returning the
+    repository and the SHA of the commit that was built.
+    """
+    docs = root / "docs"
+    docs.mkdir(parents=True)
+    (root / ".gitignore").write_text("_build/\n")
+    (root / "README.rst").write_text("Readme\n")
+    (root / "code").mkdir()
+    (root / "code" / "example.py").write_text("print('hello')\n")
+    (docs / "conf.py").write_text('project = "Test"\n')
+    (docs / "index.rst").write_text(
+        "Index\n=====\n\n.. include:: ../README.rst\n\n"
+        ".. toctree::\n\n   a\n   b\n"
+    )
+    (docs / "a.rst").write_text(
+        "A\n=\n\n.. literalinclude:: ../code/example.py\n"
+    )
+    (docs / "b.rst").write_text("B\n=\n")
+    repo = Repo.init(root)
+    sha = _commit(repo, "Add docs")
+
+    app = Sphinx(
+        srcdir=docs,
+        confdir=docs,
+        outdir=docs / "_build" / "html",
+        doctreedir=docs / "_build" / "doctrees",
+        buildername="html",
+        status=None,
+        warning=None,
+    )
+    app.build()
+    return repo, sha
+
+
+def test_find_docnames(tmp_path: Path) -> None:
+    """Pages are found by their sources, includes, and literal includes, and
+    new sources are reported by their docnames.
+    """
+    repo, base = _make_project(tmp_path / "repo")
+    docs = tmp_path / "repo" / "docs"
+    (tmp_path / "repo" / "code" / "example.py").write_text("print('bye')\n")
+    (docs / "c.rst").write_text("C\n=\n")
+    (tmp_path / "repo" / "unrelated.txt").write_text("Unrelated\n")
+    _commit(repo, "Change code")
+
+    service = ChangedPagesService.from_doctree_dir(docs / "_build/doctrees")
+    paths = service.compute_changed_paths(base)
+    assert sorted(paths) == [
+        "code/example.py",
+        "docs/c.rst",
+        "unrelated.txt",
+    ]
+    assert service.find_docnames(paths) == ["a", "c"]
+    assert service.find_docnames(["README.rst", "docs/b.rst"]) == [
+        "b",
+        "index",
+    ]
+    assert service.find_docnames([]) == []
+
+
+def test_relocated_source_directory(tmp_path: Path) -> None:
+    """Paths recorded at build time are re-anchored to the source
+    directory's current location.
+    """
+    _make_project(tmp_path / "repo")
+    shutil.move(tmp_path / "repo", tmp_path / "moved")
+    docs = tmp_path / "moved" / "docs"
+
+    service = ChangedPagesService.from_doctree_dir(
+        docs / "_build/doctrees", srcdir=docs
+    )
+    assert service.find_docnames(["README.rst", "code/example.py"]) == [
+        "a",
+        "index",
+    ]
+
+
+def test_changed_pages_command(tmp_path: Path) -> None:
+    """The command prints docnames, or a JSON object."""
+    repo, base = _make_project(tmp_path / "repo")
+    (tmp_path / "repo" / "README.rst").write_text("Readme, revised\n")
+    head = _commit(repo, "Revise readme")
+    doctrees = str(tmp_path / "repo" / "docs" / "_build" / "doctrees")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["changed-pages", base, "-d", doctrees])
+    assert result.exit_code == 0, result.output
+    assert result.output == "index\n"
+
+    result = runner.invoke(
+        main, ["changed-pages", base, head, "-d", doctrees, "--json"]
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {
+        "base": base,
+        "head": head,
+        "paths": ["README.rst"],
+        "docnames": ["index"],
+    }
+
+    result = runner.invoke(
+        main, ["changed-pages", "nonexistent", "-d", doctrees]
+    )
+    assert result.exit_code == 1
+    assert "Can't compare nonexistent and HEAD" in result.output
@@ -0,0 +1,114 @@
+"""Tests for the intersphinx lock service and command."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from documenteer.cli import main
+from documenteer.storage.inventorycache import SharedInventoryCache
+
+from ..support.ookserver import OokStandIn
+
+PYTHON_URL = "https://docs.python.org/3/objects.inv"
+NUMPY_URL = "https://numpy.org/doc/stable/objects.inv"
+
+
+def _make_project(path: Path, ook_server: OokStandIn) -> Path:
+    """Write a Sphinx project whose configuration maps two intersphinx
+    projects and points at the Ook stand-in.
+    """
+    path.mkdir()
+    (path / "conf.py").write_text(
+        "intersphinx_mapping = {\n"
+        '    "python": ("https://docs.python.org/3/", None),\n'
+        '    "numpy": ("https://numpy.org/doc/stable/", None),\n'
+        '    "local": ("https://example.com/", "local.inv"),\n'
+        "}\n"
+        "documenteer_intersphinx_cache_service_url = "
+        f"{ook_server.base_url!r}\n"
+        'documenteer_intersphinx_cache_lockfile = "intersphinx-lock.json"\n'
+        'documenteer_intersphinx_cache_shared_dir = "cache"\n'
+    )
+    return path
+
+
+def test_lock_command(
+    tmp_path: Path, ook_server: OokStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The command pins each prefetched inventory in the lockfile and stores
+    it in the cache, and revalidates the pins when run again.
+    """
+    monkeypatch.setenv("OOK_TOKEN", ook_server.token)
+    monkeypatch.delenv("DOCUMENTEER_INTERSPHINX_CACHE_DIR", raising=False)
+    ook_server.add_inventory(PYTHON_URL, b"python")
+    numpy_etag = ook_server.add_inventory(NUMPY_URL, b"numpy")
+    project = _make_project(tmp_path / "docs", ook_server)
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["intersphinx", "lock", "-d", str(project)])
+    assert result.exit_code == 0, result.output
+    lockfile = project / "intersphinx-lock.json"
+    assert result.output == f"Updated {lockfile}:\n- numpy\n- python\n"
+    lock = json.loads(lockfile.read_text())
+    assert lock == {
+        "version": 1,
+        "inventories": {
+            "numpy": {
+                "url": NUMPY_URL,
+                "etag": numpy_etag,
+                "sha256": hashlib.sha256(b"numpy").hexdigest(),
+            },
+            "python": {
+                "url": PYTHON_URL,
+                "etag": lock["inventories"]["python"]["etag"],
+                "sha256": hashlib.sha256(b"python").hexdigest(),
+            },
+        },
+    }
+    cache = SharedInventoryCache(project / "cache")
+    blob = cache.find_blob(hashlib.sha256(b"numpy").hexdigest())
+    assert blob is not None
+    assert blob.read_bytes() == b"numpy"
+
+    # Unchanged inventories are revalidated without changing the lockfile.
+    result = runner.invoke(main, ["intersphinx", "lock", "-d", str(project)])
+    assert result.exit_code == 0, result.output
+    assert result.output == f"{lockfile} is up to date\n"
+    assert json.loads(lockfile.read_text()) == lock
+
+    # A changed inventory shows up as a change to its pin.
+    ook_server.add_inventory(NUMPY_URL, b"numpy 2")
+    result = runner.invoke(main, ["intersphinx", "lock", "-d", str(project)])
+    assert result.exit_code == 0, result.output
+    assert result.output == f"Updated {lockfile}:\n- numpy\n"
+    assert json.loads(lockfile.read_text())["inventories"]["numpy"][
+        "sha256"
+    ] == (hashlib.sha256(b"numpy 2").hexdigest())
+
+
+def test_lock_command_errors(
+    tmp_path: Path, ook_server: OokStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The command needs a token, and doesn't change the lockfile if an
+    inventory can't be fetched.
+    """
+    monkeypatch.delenv("OOK_TOKEN", raising=False)
+    ook_server.add_inventory(PYTHON_URL, b"python")
+    project = _make_project(tmp_path / "docs", ook_server)
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["intersphinx", "lock", "-d", str(project)])
+    assert result.exit_code == 1
+    assert "OOK_TOKEN" in result.output
+
+    # Ook can't serve the numpy inventory.
+    monkeypatch.setenv("OOK_TOKEN", ook_server.token)
+    result = runner.invoke(main, ["intersphinx", "lock", "-d", str(project)])
+    assert result.exit_code == 1
+    assert f"numpy ({NUMPY_URL})" in result.output
+    assert not (project / "intersphinx-lock.json").exists()
@@ -0,0 +1,162 @@
+"""Tests for the intersphinx prefetch service and command."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from responses import RequestsMock
+
+from documenteer.cli import main
+from documenteer.ext.intersphinxcache import CACHE_DIRNAME, _inventory_filename
+
+from ..support.ookserver import OokStandIn
+
+PYTHON_URL = "https://docs.python.org/3/objects.inv"
+NUMPY_URL = "https://numpy.org/doc/stable/objects.inv"
+
+
+def _write_toml(
+    path: Path, ook_server: OokStandIn | None = None, *, cache: str = ""
+) -> Path:
+    """Write a documenteer.toml that maps two intersphinx projects and
+    points at the Ook stand-in, with extra ``[sphinx.intersphinx_cache]``
+    settings.
+    """
+    path.mkdir()
+    toml_path = path / "documenteer.toml"
+    service_url = (
+        f'service_url = "{ook_server.base_url}"\n'
+        if ook_server is not None
+        else ""
+    )
+    toml_path.write_text(
+        "[project]\n"
+        'title = "Example"\n'
+        "\n"
+        "[sphinx.intersphinx.projects]\n"
+        'python = "https://docs.python.org/3/"\n'
+        'numpy = "https://numpy.org/doc/stable/"\n'
+        "\n"
+        "[sphinx.intersphinx_cache]\n"
+        f"{service_url}{cache}"
+    )
+    return toml_path
+
+
+def test_prefetch_command(
+    tmp_path: Path, ook_server: OokStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The command fetches each inventory into the build's cache directory,
+    and lists the inventories it couldn't fetch.
+    """
+    monkeypatch.setenv("OOK_TOKEN", ook_server.token)
+    monkeypatch.delenv("DOCUMENTEER_INTERSPHINX_CACHE_DIR", raising=False)
+    ook_server.add_inventory(PYTHON_URL, b"python")
+    toml_path = _write_toml(tmp_path / "docs", ook_server)
+    doctree_dir = tmp_path / "docs" / "_build" / "doctrees"
+    cache_dir = doctree_dir.parent / CACHE_DIRNAME
+    runner = CliRunner()
+
+    result = runner.invoke(
+        main,
+        [
+            "intersphinx",
+            "prefetch",
+            "-t",
+            str(toml_path),
+            "-d",
+            str(doctree_dir),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert f"Prefetched 1 of 2 intersphinx inventories into {cache_dir}" in (
+        result.output
+    )
+    assert "Could not prefetch the inventory for numpy" in result.output
+    assert (
+        cache_dir / _inventory_filename("python", PYTHON_URL)
+    ).read_bytes() == b"python"
+    assert not (cache_dir / _inventory_filename("numpy", NUMPY_URL)).exists()
+
+    # A fresh inventory is reused without contacting Ook.
+    ook_server.add_inventory(NUMPY_URL, b"numpy")
+    requests = len(ook_server.requests)
+    result = runner.invoke(
+        main,
+        [
+            "intersphinx",
+            "prefetch",
+            "-t",
+            str(toml_path),
+            "-d",
+            str(doctree_dir),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Prefetched 2 of 2" in result.output
+    # One batch request, for the numpy inventory.
+    assert len(ook_server.requests) == requests + 1
+
+
+def test_prefetch_command_needs_token(
+    tmp_path: Path, ook_server: OokStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without direct mode (the default), the command needs an Ook
+    token.
+    """
+    monkeypatch.delenv("OOK_TOKEN", raising=False)
+    toml_path = _write_toml(tmp_path / "docs", ook_server)
+    result = CliRunner().invoke(
+        main, ["intersphinx", "prefetch", "-t", str(toml_path)]
+    )
+    assert result.exit_code == 1
+    assert "OOK_TOKEN" in result.output
+
+
+def test_prefetch_command_direct(
+    tmp_path: Path, responses: RequestsMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without an Ook token, in direct mode, the command fetches the
+    inventories from their origins, and waits for the ones revalidated in
+    the background.
+    """
+    monkeypatch.delenv("OOK_TOKEN", raising=False)
+    monkeypatch.delenv("DOCUMENTEER_INTERSPHINX_CACHE_DIR", raising=False)
+    responses.get(PYTHON_URL, body=b"python", headers={"ETag": '"v1"'})
+    responses.get(NUMPY_URL, status=404)
+    toml_path = _write_toml(
+        tmp_path / "docs",
+        cache=(
+            "direct = true\ndisk_cache_ttl = 0\n"
+            "stale_while_revalidate = true\n"
+        ),
+    )
+    doctree_dir = tmp_path / "docs" / "_build" / "doctrees"
+    cache_dir = doctree_dir.parent / CACHE_DIRNAME
+    args = ["intersphinx", "prefetch", "-t", str(toml_path)]
+    args.extend(["-d", str(doctree_dir)])
+    runner = CliRunner()
+
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "Prefetched 1 of 2" in result.output
+    assert "Could not prefetch the inventory for numpy" in result.output
+    inv_path = cache_dir / _inventory_filename("python", PYTHON_URL)
+    assert inv_path.read_bytes() == b"python"
+
+    # The expired copy is revalidated in the background, and the command
+    # waits for the refreshed inventory.
+    responses.replace(
+        "GET", PYTHON_URL, body=b"python 2", headers={"ETag": '"v2"'}
+    )
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert inv_path.read_bytes() == b"python 2"
+    revalidation = [
+        call.request
+        for call in responses.calls
+        if call.request.url == PYTHON_URL
+    ][-1]
+    assert revalidation.headers["If-None-Match"] == '"v1"'
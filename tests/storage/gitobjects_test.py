@@ -0,0 +1,313 @@
+"""Tests for the documenteer.storage.gitobjects module."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from git import Repo
+
+from documenteer.conf._utils import GitRepository, LastCommit
+from documenteer.storage.gitobjects import (
+    CommitGraph,
+    GitObjectReader,
+    GitObjectReaderError,
+)
+
+
+def _git_commit(repo: Repo, message: str, date: str) -> None:
+    """Commit everything in the working tree at a fixed date."""
+    repo.git.add("-A")
+    repo.git.commit(
+        "-q",
+        "--allow-empty",
+        "-m",
+        message,
+        env={
+            "GIT_AUTHOR_NAME": "Test Author",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_AUTHOR_DATE": date,
+            "GIT_COMMITTER_NAME": "Test Author",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            "GIT_COMMITTER_DATE": date,
+        },
+    )
+
+
+def _git_merge(repo: Repo, *branches: str, date: str) -> None:
+    """Merge branches (an octopus merge for several) with a merge commit."""
+    repo.git.merge(
+        "-q",
+        "--no-ff",
+        "-m",
+        "Merge",
+        *branches,
+        env={
+            "GIT_AUTHOR_NAME": "Test Author",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_AUTHOR_DATE": date,
+            "GIT_COMMITTER_NAME": "Test Author",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            "GIT_COMMITTER_DATE": date,
+        },
+    )
+
+
+def _make_history(path: Path) -> Repo:
+    """Create a repository whose history exercises the tree diff: nested
+    directories, modifications, deletions, renames, mode and type changes,
+    unusual filenames, and ordinary and octopus merges.
+    """
+    path.mkdir()
+    repo = Repo.init(path, initial_branch="main")
+    docs = path / "docs"
+    docs.mkdir()
+    (docs / "index.rst").write_text("Index\n")
+    (docs / "guide").mkdir()
+    (docs / "guide" / "intro.rst").write_text("Intro\n")
+    (path / "README.md").write_text("Readme\n")
+    _git_commit(repo, "Initial", "2024-01-01T00:00:00+00:00")
+
+    (docs / "guide" / "intro.rst").write_text("Intro, revised\n")
+    (docs / "café & co.rst").write_text("Unicode\n")
+    _git_commit(repo, "Revise intro", "2024-02-01T09:30:00+05:30")
+
+    (docs / "guide" / "intro.rst").rename(docs / "guide" / "start.rst")
+    (path / "README.md").chmod(0o755)
+    _git_commit(
+        repo, "Rename intro, chmod readme", "2024-03-01T00:00:00-07:00"
+    )
+
+    # A directory replaced by a file of the same name, and vice versa.
+    (docs / "guide" / "start.rst").unlink()
+    (docs / "guide").rmdir()
+    (docs / "guide").write_text("Now a file\n")
+    (path / "README.md").unlink()
+    (path / "README.md").mkdir()
+    (path / "README.md" / "nested.txt").write_text("Nested\n")
+    _git_commit(repo, "Swap types", "2024-04-01T00:00:00+00:00")
+
+    for branch, filename, day in (
+        ("a", "a.rst", 10),
+        ("b", "b.rst", 11),
+        ("c", "c.rst", 12),
+    ):
+        repo.git.checkout("-q", "-b", branch, "main")
+        (docs / filename).write_text(f"{branch}\n")
+        _git_commit(repo, f"Add {filename}", f"2024-05-{day}T00:00:00+00:00")
+    repo.git.checkout("-q", "main")
+    _git_merge(repo, "a", date="2024-06-01T00:00:00+00:00")
+    _git_merge(repo, "b", "c", date="2024-06-02T00:00:00+00:00")
+
+    (docs / "index.rst").write_text("Index, after merges\n")
+    _git_commit(repo, "Touch index", "2024-06-03T00:00:00+00:00")
+    return repo
+
+
+def _subprocess_index(path: Path) -> dict[str, LastCommit]:
+    return GitRepository(path, history_index=True).get_history_index()
+
+
+def _objects_index(path: Path) -> dict[str, LastCommit]:
+    git_repo = GitRepository(path, history_index=True, backend="objects")
+    # No git subprocess may run.
+    with patch("git.cmd.Git.execute", side_effect=AssertionError("git")):
+        return git_repo.get_history_index()
+
+
+@pytest.mark.parametrize("layout", ["loose", "packed", "commit-graph"])
+def test_scan_history_matches_git_log(tmp_path: Path, layout: str) -> None:
+    """The in-process index equals the ``git log`` index, whether objects
+    are loose, in (delta-compressed) packs, or covered by a commit-graph.
+    """
+    repo = _make_history(tmp_path / "repo")
+    if layout in ("packed", "commit-graph"):
+        repo.git.gc("-q", "--aggressive")
+    if layout == "commit-graph":
+        repo.git.commit_graph("write", "--reachable")
+    else:
+        (Path(repo.git_dir) / "objects/info/commit-graph").unlink(
+            missing_ok=True
+        )
+
+    reader = GitObjectReader(Path(repo.common_dir))
+    assert reader.has_commit_graph == (layout == "commit-graph")
+
+    expected = _subprocess_index(tmp_path / "repo")
+    index = _objects_index(tmp_path / "repo")
+    assert index == expected
+    # The datetimes keep each commit's own timezone offset.
+    assert {path: c.date.utcoffset() for path, c in index.items()} == {
+        path: c.date.utcoffset() for path, c in expected.items()
+    }
+    assert index["docs/café & co.rst"].date.utcoffset() == timedelta(
+        hours=5, minutes=30
+    )
+    assert "docs/guide/start.rst" in index
+    assert index["docs/guide"].date == datetime(2024, 4, 1, tzinfo=UTC)
+    # Changes brought in by a merge are dated by the merge.
+    assert index["docs/c.rst"].date == datetime(2024, 6, 2, tzinfo=UTC)
+    assert index["docs/index.rst"].sha == repo.head.commit.hexsha
+
+
+def test_commit_graph_covers_older_commits(tmp_path: Path) -> None:
+    """Commits made after the commit-graph was written are read from the
+    object database.
+    """
+    repo = _make_history(tmp_path / "repo")
+    repo.git.commit_graph("write", "--reachable")
+    (tmp_path / "repo" / "new.rst").write_text("New\n")
+    _git_commit(repo, "Add new", "2024-07-01T00:00:00-04:00")
+
+    index = _objects_index(tmp_path / "repo")
+    assert index == _subprocess_index(tmp_path / "repo")
+    assert index["new.rst"].date == datetime(
+        2024, 7, 1, tzinfo=timezone(timedelta(hours=-4))
+    )
+
+
+def test_commit_graph_parents(tmp_path: Path) -> None:
+    """The commit-graph reports the same parents, trees, and times as the
+    commit objects, including for an octopus merge.
+    """
+    repo = _make_history(tmp_path / "repo")
+    repo.git.commit_graph("write", "--reachable")
+    graph = CommitGraph.open(
+        Path(repo.git_dir) / "objects" / "info" / "commit-graph"
+    )
+    assert graph is not None
+    commits = list(repo.iter_commits("main"))
+    assert len(graph) == len(commits)
+    for commit in commits:
+        entry = graph.get(commit.binsha)
+        assert entry is not None
+        assert entry.tree == commit.tree.binsha
+        assert entry.parents == tuple(p.binsha for p in commit.parents)
+        assert entry.timestamp == commit.committed_date
+    assert max(len(c.parents) for c in commits) == 3
+    assert graph.get(b"\0" * 20) is None
+
+
+def test_commit_graph_unusable(tmp_path: Path) -> None:
+    """A missing, empty, or corrupt commit-graph file is ignored."""
+    path = tmp_path / "commit-graph"
+    assert CommitGraph.open(path) is None
+    path.write_bytes(b"")
+    assert CommitGraph.open(path) is None
+    path.write_bytes(b"CGPH\x01\x01\x00\x00")
+    assert CommitGraph.open(path) is None
+
+
+def test_incremental_scan(tmp_path: Path) -> None:
+    """``since`` excludes the history of an older commit."""
+    repo = _make_history(tmp_path / "repo")
+    old_head = repo.head.commit.hexsha
+    (tmp_path / "repo" / "new.rst").write_text("New\n")
+    _git_commit(repo, "Add new", "2024-07-01T00:00:00+00:00")
+
+    new_head = repo.head.commit.hexsha
+    reader = GitObjectReader(Path(repo.common_dir))
+    assert reader.scan_history(new_head, since=old_head) == {
+        "new.rst": (new_head, datetime(2024, 7, 1, tzinfo=UTC))
+    }
+    assert reader.is_ancestor(old_head, new_head)
+    assert not reader.is_ancestor(new_head, old_head)
+    assert not reader.is_ancestor("0" * 40, old_head)
+
+
+@pytest.mark.parametrize("layout", ["loose", "commit-graph"])
+def test_incremental_scan_range(tmp_path: Path, layout: str) -> None:
+    """``since`` excludes the same commits as ``git rev-list``, across
+    merges, and ancestry matches ``git merge-base --is-ancestor``.
+    """
+    repo = _make_history(tmp_path / "repo")
+    if layout == "commit-graph":
+        repo.git.commit_graph("write", "--reachable")
+    reader = GitObjectReader(Path(repo.common_dir))
+    assert reader.has_commit_graph == (layout == "commit-graph")
+
+    shas = [commit.hexsha for commit in repo.iter_commits("main")]
+    for head in shas:
+        for since in shas:
+            expected = repo.git.rev_list(f"{since}..{head}").split()
+            commits = reader._walk_range(
+                bytes.fromhex(head), bytes.fromhex(since)
+            )
+            assert sorted(oid.hex() for oid in commits) == sorted(expected)
+            first_parents = reader._walk_range(
+                bytes.fromhex(head), bytes.fromhex(since), first_parent=True
+            )
+            assert sorted(oid.hex() for oid in first_parents) == sorted(
+                repo.git.rev_list("--first-parent", f"{since}..{head}").split()
+            )
+            assert reader.is_ancestor(head, since) == (not expected)
+
+
+def test_incremental_scan_is_bounded(tmp_path: Path) -> None:
+    """With a commit-graph, an incremental scan doesn't read the history
+    below ``since``.
+    """
+    repo = _make_history(tmp_path / "repo")
+    repo.git.commit_graph("write", "--reachable")
+    old_head = repo.head.commit.hexsha
+    (tmp_path / "repo" / "new.rst").write_text("New\n")
+    _git_commit(repo, "Add new", "2024-07-01T00:00:00+00:00")
+    new_head = repo.head.commit.hexsha
+
+    reader = GitObjectReader(Path(repo.common_dir))
+    with patch.object(
+        reader, "_get_commit", wraps=reader._get_commit
+    ) as get_commit:
+        assert reader.is_ancestor(old_head, new_head)
+        assert list(reader.scan_history(new_head, since=old_head)) == [
+            "new.rst"
+        ]
+    read = {call.args[0].hex() for call in get_commit.call_args_list}
+    assert read == {old_head, new_head}
+
+
+def test_shallow_clone(tmp_path: Path) -> None:
+    """A shallow clone is detected, and its boundary commit is treated as a
+    root commit, as ``git log`` does.
+    """
+    _make_history(tmp_path / "repo")
+    Repo.clone_from(f"file://{tmp_path / 'repo'}", tmp_path / "clone", depth=2)
+
+    git_repo = GitRepository(tmp_path / "clone", backend="objects")
+    assert git_repo.is_shallow
+    assert _objects_index(tmp_path / "clone") == _subprocess_index(
+        tmp_path / "clone"
+    )
+    assert not GitRepository(tmp_path / "repo", backend="objects").is_shallow
+
+
+def test_missing_object_falls_back_to_subprocess(tmp_path: Path) -> None:
+    """When an object can't be read in-process, git log answers instead."""
+    _make_history(tmp_path / "repo")
+    git_repo = GitRepository(
+        tmp_path / "repo", history_index=True, backend="objects"
+    )
+    with patch.object(
+        GitObjectReader,
+        "scan_history",
+        side_effect=GitObjectReaderError("missing"),
+    ):
+        index = git_repo.get_history_index()
+    assert git_repo._objects is None
+    assert index == _subprocess_index(tmp_path / "repo")
+
+
+def test_unknown_backend(tmp_path: Path) -> None:
+    Repo.init(tmp_path)
+    with pytest.raises(ValueError, match="backend"):
+        GitRepository(tmp_path, backend="libgit2")
+
+
+def test_empty_repository(tmp_path: Path) -> None:
+    """A repository without commits has no HEAD and an empty index."""
+    Repo.init(tmp_path)
+    git_repo = GitRepository(tmp_path, history_index=True, backend="objects")
+    assert git_repo.head_sha is None
+    assert git_repo.get_history_index() == {}
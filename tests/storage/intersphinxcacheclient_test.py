@@ -2,22 +2,35 @@
 
 from __future__ import annotations
 
+import base64
+import gzip
+import json
+import socket
+from pathlib import Path
 from typing import Any
 from urllib.parse import parse_qs, urlparse
 
 import pytest
 import pytest_responses  # noqa: F401
+import responses as responses_module
 from requests.exceptions import ConnectionError as RequestsConnectionError
 from requests.exceptions import Timeout as RequestsTimeout
 from responses import RequestsMock, matchers
 
+from documenteer._requestsutils import requests_retry_session
 from documenteer.storage.intersphinxcacheclient import (
+    IntersphinxCacheCircuitOpenError,
     IntersphinxCacheClient,
+    IntersphinxCacheError,
     IntersphinxCacheServerError,
     IntersphinxCacheUnauthorizedError,
     IntersphinxCacheUnreachableError,
+    InventoryFetchResult,
+    InventoryRequest,
 )
 
+from ..support.ookserver import OokStandIn
+
 BASE_URL = "https://roundtable.lsst.cloud/ook"
 
 INVENTORY_URL = "https://docs.python.org/3/objects.inv"
@@ -56,6 +69,61 @@ def test_get_inventory_success(
     assert query["url"] == [INVENTORY_URL]
 
 
+def test_get_inventory_streams_to_destination(
+    responses: RequestsMock, monkeypatch: Any, tmp_path: Path
+) -> None:
+    """The request asks for compressed transfer, and with a destination the
+    decompressed inventory is streamed to that file instead of returned.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        body=gzip.compress(INVENTORY_BYTES),
+        status=200,
+        content_type="application/octet-stream",
+        headers={"Content-Encoding": "gzip", "ETag": '"abc123"'},
+    )
+    destination = tmp_path / "cache" / "python.inv"
+    destination.parent.mkdir()
+    destination.write_bytes(b"old inventory")
+
+    client = IntersphinxCacheClient()
+    result = client.get_inventory(INVENTORY_URL, destination=destination)
+
+    assert result == InventoryFetchResult(
+        not_modified=False,
+        content=None,
+        etag='"abc123"',
+        path=destination,
+    )
+    assert destination.read_bytes() == INVENTORY_BYTES
+    assert list(destination.parent.iterdir()) == [destination]
+    accept_encoding = responses.calls[0].request.headers["Accept-Encoding"]
+    assert "gzip" in accept_encoding.split(", ")
+
+
+def test_get_inventory_destination_write_error(
+    responses: RequestsMock, monkeypatch: Any, tmp_path: Path
+) -> None:
+    """A destination that can't be written is reported as a cache error."""
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        body=INVENTORY_BYTES,
+        status=200,
+        content_type="application/octet-stream",
+    )
+    # The destination is a directory, so the download can't be renamed to
+    # it.
+    destination = tmp_path / "python.inv"
+    destination.mkdir()
+
+    client = IntersphinxCacheClient()
+    with pytest.raises(IntersphinxCacheError, match="Could not write"):
+        client.get_inventory(INVENTORY_URL, destination=destination)
+    assert list(tmp_path.iterdir()) == [destination]
+
+
 def test_get_inventory_returns_etag(
     responses: RequestsMock, monkeypatch: Any
 ) -> None:
@@ -160,6 +228,28 @@ def test_unreachable_timeout(
         client.get_inventory(INVENTORY_URL)
 
 
+def test_unreachable_retries() -> None:
+    """An unreachable error records the retries that the session made."""
+    with socket.socket() as sock:
+        # A local port that nothing listens on.
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}/ook"
+    # Passed through the default mock of the pytest-responses plugin, so
+    # the connection is really refused.
+    responses_module.add_passthru(base_url)
+    client = IntersphinxCacheClient(
+        base_url=base_url,
+        token="test-token",
+        session=requests_retry_session(retries=2, backoff_factor=0),
+    )
+
+    with pytest.raises(IntersphinxCacheUnreachableError) as excinfo:
+        client.get_inventory(INVENTORY_URL)
+    assert excinfo.value.retries == 2
+    assert excinfo.value.elapsed > 0
+
+
 @pytest.mark.parametrize("status", [500, 502, 503])
 def test_server_error(
     responses: RequestsMock, monkeypatch: Any, status: int
@@ -212,3 +302,269 @@ def test_explicit_token_argument(
     assert result.content == INVENTORY_BYTES
     api_request = responses.calls[0].request
     assert api_request.headers["Authorization"] == "Bearer explicit-token"
+
+
+OTHER_INVENTORY_URL = "https://www.sphinx-doc.org/en/master/objects.inv"
+"""A second example origin ``objects.inv`` URL."""
+
+
+def test_get_inventories_batch(
+    responses: RequestsMock, monkeypatch: Any
+) -> None:
+    """Several inventories are revalidated in one request to the batch
+    endpoint, and each item maps to the result or error the single-inventory
+    endpoint would give.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.post(
+        f"{BASE_URL}/intersphinx/inventories",
+        json={
+            "inventories": [
+                {
+                    "url": INVENTORY_URL,
+                    "status": 200,
+                    "etag": '"new"',
+                    "content": base64.b64encode(INVENTORY_BYTES).decode(),
+                },
+                {"url": OTHER_INVENTORY_URL, "status": 304},
+                {
+                    "url": "https://example.com/objects.inv",
+                    "status": 502,
+                    "detail": "upstream unavailable",
+                },
+            ]
+        },
+        status=200,
+    )
+
+    client = IntersphinxCacheClient()
+    results = client.get_inventories(
+        [
+            InventoryRequest(url=INVENTORY_URL),
+            InventoryRequest(url=OTHER_INVENTORY_URL, etag='"abc123"'),
+            InventoryRequest(url="https://example.com/objects.inv"),
+        ]
+    )
+
+    assert results[0] == InventoryFetchResult(
+        not_modified=False, content=INVENTORY_BYTES, etag='"new"'
+    )
+    assert results[1] == InventoryFetchResult(
+        not_modified=True, content=None, etag='"abc123"'
+    )
+    assert isinstance(results[2], IntersphinxCacheServerError)
+    assert "upstream unavailable" in str(results[2])
+
+    assert len(responses.calls) == 1
+    api_request = responses.calls[0].request
+    assert api_request.headers["Authorization"] == "Bearer test-token"
+    assert json.loads(api_request.body or "") == {
+        "inventories": [
+            {"url": INVENTORY_URL, "etag": None},
+            {"url": OTHER_INVENTORY_URL, "etag": '"abc123"'},
+            {"url": "https://example.com/objects.inv", "etag": None},
+        ]
+    }
+
+
+def test_get_inventories_without_batch_endpoint(
+    responses: RequestsMock, monkeypatch: Any
+) -> None:
+    """Against a service without the batch endpoint, inventories are
+    requested individually, and later calls skip the batch endpoint.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.post(f"{BASE_URL}/intersphinx/inventories", status=404)
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        body=INVENTORY_BYTES,
+        status=200,
+        match=[matchers.query_param_matcher({"url": INVENTORY_URL})],
+    )
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        status=404,
+        match=[matchers.query_param_matcher({"url": OTHER_INVENTORY_URL})],
+    )
+    inventories = [
+        InventoryRequest(url=INVENTORY_URL),
+        InventoryRequest(url=OTHER_INVENTORY_URL),
+    ]
+
+    client = IntersphinxCacheClient()
+    results = client.get_inventories(inventories, max_workers=2)
+    assert isinstance(results[0], InventoryFetchResult)
+    assert results[0].content == INVENTORY_BYTES
+    assert isinstance(results[1], IntersphinxCacheError)
+    assert len(responses.calls) == 3
+    assert not client.batch_supported
+
+    client.get_inventories(inventories)
+    assert len(responses.calls) == 5
+    assert all(call.request.method == "GET" for call in responses.calls[3:])
+
+    # A client told up front that the endpoint is missing never tries it.
+    IntersphinxCacheClient(batch_supported=False).get_inventories(inventories)
+    assert len(responses.calls) == 7
+    assert all(call.request.method == "GET" for call in responses.calls[5:])
+
+
+def test_get_inventories_malformed_batch_response(
+    responses: RequestsMock, monkeypatch: Any
+) -> None:
+    """A batch response that doesn't answer the requested inventories falls
+    back to individual requests.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.post(
+        f"{BASE_URL}/intersphinx/inventories",
+        json={"inventories": [{"url": INVENTORY_URL, "status": 304}]},
+        status=200,
+    )
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        body=INVENTORY_BYTES,
+        status=200,
+    )
+
+    client = IntersphinxCacheClient()
+    results = client.get_inventories(
+        [
+            InventoryRequest(url=INVENTORY_URL),
+            InventoryRequest(url=OTHER_INVENTORY_URL),
+        ]
+    )
+
+    assert [
+        result.content
+        for result in results
+        if isinstance(result, InventoryFetchResult)
+    ] == [INVENTORY_BYTES, INVENTORY_BYTES]
+
+
+def test_circuit_breaker(responses: RequestsMock, monkeypatch: Any) -> None:
+    """After as many consecutive failures as the circuit breaker threshold,
+    counting a failed batch request, the remaining inventories fail without
+    a request.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.post(
+        f"{BASE_URL}/intersphinx/inventories",
+        body=RequestsConnectionError("Connection refused"),
+    )
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        body=RequestsConnectionError("Connection refused"),
+    )
+
+    client = IntersphinxCacheClient(circuit_breaker_threshold=2)
+    results = client.get_inventories(
+        [
+            InventoryRequest(url=INVENTORY_URL),
+            InventoryRequest(url=OTHER_INVENTORY_URL),
+            InventoryRequest(url="https://numpy.org/doc/stable/objects.inv"),
+        ]
+    )
+
+    assert isinstance(results[0], IntersphinxCacheUnreachableError)
+    assert not isinstance(results[0], IntersphinxCacheCircuitOpenError)
+    assert all(
+        isinstance(result, IntersphinxCacheCircuitOpenError)
+        for result in results[1:]
+    )
+    assert client.circuit_open
+    assert len(responses.calls) == 2
+
+
+def test_circuit_breaker_resets(
+    responses: RequestsMock, monkeypatch: Any
+) -> None:
+    """Any answer from the service, even an error, resets the count of
+    consecutive failures.
+    """
+    monkeypatch.setenv("OOK_TOKEN", "test-token")
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        status=503,
+        match=[matchers.query_param_matcher({"url": INVENTORY_URL})],
+    )
+    responses.get(
+        f"{BASE_URL}/intersphinx/inventory",
+        status=404,
+        match=[matchers.query_param_matcher({"url": OTHER_INVENTORY_URL})],
+    )
+
+    client = IntersphinxCacheClient(circuit_breaker_threshold=2)
+    circuit_states = []
+    for url in (INVENTORY_URL, OTHER_INVENTORY_URL, INVENTORY_URL):
+        with pytest.raises(IntersphinxCacheError):
+            client.get_inventory(url)
+        circuit_states.append(client.circuit_open)
+    with pytest.raises(IntersphinxCacheServerError):
+        client.get_inventory(INVENTORY_URL)
+    circuit_states.append(client.circuit_open)
+    assert circuit_states == [False, False, False, True]
+
+    with pytest.raises(IntersphinxCacheCircuitOpenError):
+        client.get_inventory(OTHER_INVENTORY_URL)
+
+
+def _revalidate_twice(ook_server: OokStandIn) -> list[tuple[str, str]]:
+    """Fetch two inventories from the stand-in server, then revalidate them,
+    returning the requests the server received for the revalidation.
+    """
+    etag = ook_server.add_inventory(INVENTORY_URL, INVENTORY_BYTES)
+    other_etag = ook_server.add_inventory(OTHER_INVENTORY_URL, b"other")
+    client = IntersphinxCacheClient(
+        base_url=ook_server.base_url, token=ook_server.token
+    )
+
+    results = client.get_inventories(
+        [
+            InventoryRequest(url=INVENTORY_URL),
+            InventoryRequest(url=OTHER_INVENTORY_URL),
+        ]
+    )
+    assert results == [
+        InventoryFetchResult(
+            not_modified=False, content=INVENTORY_BYTES, etag=etag
+        ),
+        InventoryFetchResult(
+            not_modified=False, content=b"other", etag=other_etag
+        ),
+    ]
+
+    ook_server.requests.clear()
+    results = client.get_inventories(
+        [
+            InventoryRequest(url=INVENTORY_URL, etag=etag),
+            InventoryRequest(url=OTHER_INVENTORY_URL, etag=other_etag),
+        ]
+    )
+    assert all(
+        isinstance(result, InventoryFetchResult) and result.not_modified
+        for result in results
+    )
+    return ook_server.requests
+
+
+def test_get_inventories_stand_in(ook_server: OokStandIn) -> None:
+    """Against the local stand-in server, revalidating unchanged inventories
+    costs one round-trip.
+    """
+    assert _revalidate_twice(ook_server) == [
+        ("POST", "/ook/intersphinx/inventories")
+    ]
+
+
+def test_get_inventories_stand_in_without_batch(
+    ook_server: OokStandIn,
+) -> None:
+    """Against a stand-in server without the batch endpoint, revalidating
+    costs one round-trip per inventory.
+    """
+    ook_server.batch = False
+    assert _revalidate_twice(ook_server) == [
+        ("GET", "/ook/intersphinx/inventory"),
+        ("GET", "/ook/intersphinx/inventory"),
+    ]
@@ -0,0 +1,161 @@
+"""Tests for the shared intersphinx inventory cache."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from documenteer.storage.inventorycache import (
+    SharedInventory,
+    SharedInventoryCache,
+    default_shared_cache_dir,
+)
+
+URL = "https://docs.python.org/3/objects.inv"
+OTHER_URL = "https://numpy.org/doc/stable/objects.inv"
+
+
+def _age(path: Path, seconds: float) -> None:
+    """Set a file's modification time to ``seconds`` ago."""
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_store_and_lookup(tmp_path: Path) -> None:
+    """Inventories are stored by content and looked up by origin URL."""
+    cache = SharedInventoryCache(tmp_path / "cache")
+    assert cache.lookup(URL) is None
+
+    blob = cache.store(URL, b"python", '"v1"')
+    other_blob = cache.store(OTHER_URL, b"python", None)
+
+    # Identical content is stored once.
+    assert blob == other_blob
+    assert blob.read_bytes() == b"python"
+    inventory = cache.lookup(URL)
+    assert inventory is not None
+    assert inventory.path == blob
+    assert inventory.etag == '"v1"'
+    other = cache.lookup(OTHER_URL)
+    assert other is not None
+    assert other.etag is None
+
+    # A new inventory for the URL replaces the entry.
+    cache.store(URL, b"python v2", '"v2"')
+    inventory = cache.lookup(URL)
+    assert inventory is not None
+    assert inventory.path.read_bytes() == b"python v2"
+    assert inventory.etag == '"v2"'
+
+
+def test_store_file(tmp_path: Path) -> None:
+    """An inventory file is stored by its digest, like stored content."""
+    cache = SharedInventoryCache(tmp_path / "cache")
+    inv_path = tmp_path / "downloaded.inv"
+    inv_path.write_bytes(b"inventory")
+
+    blob_path = cache.store_file(URL, inv_path, '"v1"')
+
+    assert blob_path == cache.store(URL, b"inventory", '"v1"')
+    assert blob_path.read_bytes() == b"inventory"
+    assert cache.lookup(URL) == SharedInventory(
+        url=URL, path=blob_path, etag='"v1"'
+    )
+
+
+def test_link(tmp_path: Path) -> None:
+    """A blob is hard-linked into a build tree, replacing any existing file,
+    and the link survives the blob's eviction.
+    """
+    cache = SharedInventoryCache(tmp_path / "cache", max_size=0)
+    blob = cache.store(URL, b"python", None)
+    target = tmp_path / "build" / "python.inv"
+    target.parent.mkdir()
+    target.write_bytes(b"old")
+
+    cache.link(blob, target)
+
+    assert target.read_bytes() == b"python"
+    assert target.stat().st_ino == blob.stat().st_ino
+    cache.evict()
+    assert not blob.exists()
+    assert target.read_bytes() == b"python"
+
+
+def test_evict_least_recently_used(tmp_path: Path) -> None:
+    """Eviction removes the least recently used entries until the cache is
+    within its size limit.
+    """
+    cache = SharedInventoryCache(tmp_path / "cache", max_size=12)
+    urls = [f"https://example.com/{i}/objects.inv" for i in range(4)]
+    for url, content, age in (
+        (urls[0], b"aaaaaa", 300),
+        (urls[1], b"bbbbbb", 200),
+        (urls[2], b"cccccc", 100),
+    ):
+        cache.store(url, content, None)
+        _age(cache._entry_path(url), age)
+
+    cache.evict()
+    assert [cache.lookup(url) is not None for url in urls[:3]] == [
+        False,
+        True,
+        True,
+    ]
+
+    # The lookups marked both remaining entries as used; age them again so
+    # the first is now the least recently used.
+    _age(cache._entry_path(urls[1]), 100)
+    _age(cache._entry_path(urls[2]), 200)
+    cache.store(urls[3], b"dddddd", None)
+    cache.evict()
+    assert [cache.lookup(url) is not None for url in urls] == [
+        False,
+        True,
+        False,
+        True,
+    ]
+
+
+def test_evict_keeps_shared_blobs(tmp_path: Path) -> None:
+    """An unreferenced blob is removed once it's older than the grace
+    period, and a blob is kept while any entry refers to it.
+    """
+    cache = SharedInventoryCache(tmp_path / "cache", max_size=12)
+    blob = cache.store(URL, b"python", None)
+    orphan = cache.store("https://example.com/objects.inv", b"orphan", None)
+    cache._entry_path("https://example.com/objects.inv").unlink()
+
+    cache.evict()
+    assert orphan.exists()
+    _age(orphan, 2 * 3600)
+    cache.evict()
+    assert not orphan.exists()
+
+    # The two least recently used entries are evicted, but the first one's
+    # blob is still used by another entry.
+    cache.max_size = 6
+    cache.store(OTHER_URL, b"python", None)
+    cache.store("https://example.com/numpy/objects.inv", b"numpy!", None)
+    _age(cache._entry_path(URL), 100)
+    _age(cache._entry_path("https://example.com/numpy/objects.inv"), 50)
+    cache.evict()
+    assert blob.exists()
+    assert cache.lookup(URL) is None
+    assert cache.lookup("https://example.com/numpy/objects.inv") is None
+    assert cache.lookup(OTHER_URL) is not None
+
+
+def test_default_shared_cache_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The default directory is in the XDG cache directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", "/home/user/.xdg-cache")
+    assert default_shared_cache_dir() == Path(
+        "/home/user/.xdg-cache/documenteer/intersphinx"
+    )
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    assert default_shared_cache_dir() == (
+        Path.home() / ".cache" / "documenteer" / "intersphinx"
+    )
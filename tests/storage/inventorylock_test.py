@@ -0,0 +1,45 @@
+"""Tests for the intersphinx inventory lockfile."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from documenteer.storage.inventorylock import (
+    InventoryLockfile,
+    LockedInventory,
+)
+
+
+def test_write_and_read(tmp_path: Path) -> None:
+    """The lockfile round-trips, with its entries sorted by name."""
+    lockfile = InventoryLockfile(
+        inventories={
+            "sphinx": LockedInventory(
+                url="https://www.sphinx-doc.org/en/master/objects.inv",
+                sha256="b" * 64,
+            ),
+            "python": LockedInventory(
+                url="https://docs.python.org/3/objects.inv",
+                etag='"v1"',
+                sha256="a" * 64,
+            ),
+        }
+    )
+    path = tmp_path / "intersphinx-lock.json"
+    lockfile.write(path)
+
+    content = path.read_text()
+    assert content.index('"python"') < content.index('"sphinx"')
+    assert content.endswith("}\n")
+    assert InventoryLockfile.read(path) == lockfile
+
+
+def test_read_invalid(tmp_path: Path) -> None:
+    """A lockfile of an unknown version is rejected."""
+    path = tmp_path / "intersphinx-lock.json"
+    path.write_text('{"version": 2, "inventories": {}}')
+    with pytest.raises(ValidationError):
+        InventoryLockfile.read(path)
@@ -0,0 +1,158 @@
+"""Tests for the origin inventory client."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import pytest_responses  # noqa: F401
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from responses import RequestsMock, matchers
+
+from documenteer.storage.intersphinxcacheclient import InventoryFetchResult
+from documenteer.storage.origininventoryclient import (
+    OriginInventoryClient,
+    OriginInventoryError,
+    OriginInventoryRequest,
+)
+
+INVENTORY_URL = "https://docs.python.org/3/objects.inv"
+
+OTHER_INVENTORY_URL = "https://numpy.org/doc/stable/objects.inv"
+
+INVENTORY_BYTES = b"# Sphinx inventory version 2\nbinary-payload\x00\x01\x02"
+
+LAST_MODIFIED = "Wed, 14 Oct 2026 12:00:00 GMT"
+
+
+def test_get_inventory(responses: RequestsMock) -> None:
+    """A 200 response carries the inventory and the origin's validators."""
+    responses.get(
+        INVENTORY_URL,
+        body=INVENTORY_BYTES,
+        status=200,
+        headers={"ETag": '"v1"', "Last-Modified": LAST_MODIFIED},
+    )
+
+    result = OriginInventoryClient().get_inventory(INVENTORY_URL)
+
+    assert result == InventoryFetchResult(
+        not_modified=False,
+        content=INVENTORY_BYTES,
+        etag='"v1"',
+        last_modified=LAST_MODIFIED,
+    )
+    headers = responses.calls[0].request.headers
+    assert "If-None-Match" not in headers
+    assert "If-Modified-Since" not in headers
+
+
+def test_get_inventory_not_modified(responses: RequestsMock) -> None:
+    """A conditional request sends both validators, and a 304 echoes
+    them.
+    """
+    responses.get(
+        INVENTORY_URL,
+        status=304,
+        match=[
+            matchers.header_matcher(
+                {"If-None-Match": '"v1"', "If-Modified-Since": LAST_MODIFIED}
+            )
+        ],
+    )
+
+    result = OriginInventoryClient().get_inventory(
+        INVENTORY_URL, etag='"v1"', last_modified=LAST_MODIFIED
+    )
+
+    assert result == InventoryFetchResult(
+        not_modified=True,
+        content=None,
+        etag='"v1"',
+        last_modified=LAST_MODIFIED,
+    )
+
+
+def test_get_inventory_error(responses: RequestsMock) -> None:
+    """An error status is raised as an origin inventory error."""
+    responses.get(INVENTORY_URL, status=404)
+
+    with pytest.raises(OriginInventoryError) as excinfo:
+        OriginInventoryClient().get_inventory(INVENTORY_URL)
+    assert not excinfo.value.unreachable
+
+
+def test_get_inventory_unreachable(responses: RequestsMock) -> None:
+    """A connection error is raised as an error for an unreachable
+    origin.
+    """
+    responses.get(INVENTORY_URL, body=RequestsConnectionError("refused"))
+
+    with pytest.raises(OriginInventoryError) as excinfo:
+        OriginInventoryClient().get_inventory(INVENTORY_URL)
+    assert excinfo.value.unreachable
+
+
+def test_get_inventory_request_options(responses: RequestsMock) -> None:
+    """Requests carry the configured User-Agent, timeout, and TLS
+    verification, with CA certificate bundles chosen by host.
+    """
+    responses.get(
+        INVENTORY_URL,
+        body=INVENTORY_BYTES,
+        match=[matchers.header_matcher({"User-Agent": "test-agent"})],
+    )
+    responses.get(
+        OTHER_INVENTORY_URL,
+        body=INVENTORY_BYTES,
+        match=[matchers.header_matcher({"User-Agent": "test-agent"})],
+    )
+    client = OriginInventoryClient(
+        timeout=10.0,
+        tls_cacerts={"docs.python.org": "/etc/python-ca.pem"},
+        user_agent="test-agent",
+    )
+
+    client.get_inventory(INVENTORY_URL)
+    client.get_inventory(OTHER_INVENTORY_URL)
+
+    kwargs = [call.request.req_kwargs for call in responses.calls]  # type: ignore[attr-defined]
+    assert [k["timeout"] for k in kwargs] == [10.0, 10.0]
+    assert kwargs[0]["verify"] == "/etc/python-ca.pem"
+    # Other hosts use the default bundle (which requests may resolve from
+    # the environment).
+    assert kwargs[1]["verify"] != "/etc/python-ca.pem"
+
+    responses.get(INVENTORY_URL, body=INVENTORY_BYTES)
+    OriginInventoryClient(tls_verify=False).get_inventory(INVENTORY_URL)
+    assert responses.calls[2].request.req_kwargs["verify"] is False  # type: ignore[attr-defined]
+
+
+def test_get_inventories_to_destinations(
+    responses: RequestsMock, tmp_path: Path
+) -> None:
+    """Several inventories are streamed to their destinations concurrently,
+    and a failed one is returned as its error.
+    """
+    responses.get(INVENTORY_URL, body=INVENTORY_BYTES, status=200)
+    responses.get(OTHER_INVENTORY_URL, status=503)
+    destinations = [tmp_path / "python.inv", tmp_path / "numpy.inv"]
+
+    results = OriginInventoryClient().get_inventories(
+        [
+            OriginInventoryRequest(url=INVENTORY_URL),
+            OriginInventoryRequest(url=OTHER_INVENTORY_URL),
+        ],
+        max_workers=2,
+        destinations=destinations,
+    )
+
+    assert results[0] == InventoryFetchResult(
+        not_modified=False,
+        content=None,
+        etag=None,
+        path=destinations[0],
+    )
+    assert destinations[0].read_bytes() == INVENTORY_BYTES
+    assert isinstance(results[1], OriginInventoryError)
+    assert not destinations[1].exists()
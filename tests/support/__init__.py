@@ -0,0 +1 @@
+"""Support code shared by the test suite."""
@@ -0,0 +1,165 @@
+"""A local stand-in for Ook's intersphinx inventory cache API."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+__all__ = ["OokStandIn"]
+
+
+class OokStandIn:
+    """A local HTTP server that serves intersphinx inventories the way Ook's
+    inventory cache does.
+
+    The server implements the single-inventory endpoint
+    (``GET /ook/intersphinx/inventory?url=...``, with ``If-None-Match``
+    revalidation) and, unless ``batch`` is `False`, the batch endpoint
+    (``POST /ook/intersphinx/inventories``). An inventory that hasn't been
+    added is answered with a 502, as Ook answers a cold miss when the origin
+    is down.
+
+    Parameters
+    ----------
+    token
+        The bearer token the server accepts.
+    batch
+        Whether the server has the batch endpoint. Without it, batch
+        requests are answered with a 404, like an older Ook.
+    """
+
+    def __init__(
+        self, *, token: str = "test-token", batch: bool = True
+    ) -> None:
+        self.token = token
+        self.batch = batch
+        self.inventories: dict[str, tuple[bytes, str]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), _make_handler(self)
+        )
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the stand-in Ook API."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/ook"
+
+    def add_inventory(self, url: str, content: bytes) -> str:
+        """Serve an inventory for an origin URL, returning its ETag."""
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        self.inventories[url] = (content, etag)
+        return etag
+
+    def record(self, method: str, path: str) -> None:
+        """Record a request the server received."""
+        with self._lock:
+            self.requests.append((method, path))
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the server."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def answer(self, url: str, etag: str | None) -> dict[str, Any]:
+        """Answer a request for one inventory as a batch response item."""
+        if url not in self.inventories:
+            return {
+                "url": url,
+                "status": HTTPStatus.BAD_GATEWAY,
+                "detail": "The origin is unavailable.",
+            }
+        content, current_etag = self.inventories[url]
+        if etag == current_etag:
+            return {"url": url, "status": HTTPStatus.NOT_MODIFIED}
+        return {
+            "url": url,
+            "status": HTTPStatus.OK,
+            "etag": current_etag,
+            "content": base64.b64encode(content).decode(),
+        }
+
+
+def _make_handler(server: OokStandIn) -> type[BaseHTTPRequestHandler]:
+    """Create a request handler class bound to a stand-in server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            parsed = urlparse(self.path)
+            server.record("GET", parsed.path)
+            if parsed.path != "/ook/intersphinx/inventory":
+                self._send(HTTPStatus.NOT_FOUND)
+                return
+            if not self._authorized():
+                return
+            url = parse_qs(parsed.query).get("url", [""])[0]
+            item = server.answer(url, self.headers.get("If-None-Match"))
+            if item["status"] == HTTPStatus.OK:
+                content, etag = server.inventories[url]
+                self._send(HTTPStatus.OK, content, {"ETag": etag})
+            else:
+                self._send(item["status"])
+
+        def do_POST(self) -> None:
+            parsed = urlparse(self.path)
+            server.record("POST", parsed.path)
+            if (
+                parsed.path != "/ook/intersphinx/inventories"
+                or not server.batch
+            ):
+                self._send(HTTPStatus.NOT_FOUND)
+                return
+            if not self._authorized():
+                return
+            length = int(self.headers.get("Content-Length", "0"))
+            payload = json.loads(self.rfile.read(length))
+            items = [
+                server.answer(inventory["url"], inventory.get("etag"))
+                for inventory in payload["inventories"]
+            ]
+            body = json.dumps({"inventories": items}).encode()
+            self._send(
+                HTTPStatus.OK, body, {"Content-Type": "application/json"}
+            )
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            # Keep the test output quiet.
+            pass
+
+        def _authorized(self) -> bool:
+            expected = f"Bearer {server.token}"
+            if self.headers.get("Authorization") == expected:
+                return True
+            self._send(HTTPStatus.UNAUTHORIZED)
+            return False
+
+        def _send(
+            self,
+            status: int,
+            body: bytes = b"",
+            headers: dict[str, str] | None = None,
+        ) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status != HTTPStatus.NOT_MODIFIED:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
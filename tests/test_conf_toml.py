@@ -303,6 +303,31 @@ def test_linkcheck_origin_no_base_url() -> None:
     assert config.linkcheck_origin_base_url is None
 
 
+EXAMPLE_INTERSPHINX_USAGE = """
+
+[project]
+title = "Documenteer"
+base_url = "https://documenteer.lsst.io"
+
+[sphinx.intersphinx]
+usage_report = true
+usage_threshold = 3
+"""
+
+
+def test_intersphinx_usage() -> None:
+    """The intersphinx usage report is off by default, and can be enabled
+    with a threshold.
+    """
+    config = DocumenteerConfig.load(EXAMPLE_NO_SPHINX)
+    assert config.intersphinx_usage_report is False
+    assert config.intersphinx_usage_threshold == 5
+
+    config = DocumenteerConfig.load(EXAMPLE_INTERSPHINX_USAGE)
+    assert config.intersphinx_usage_report is True
+    assert config.intersphinx_usage_threshold == 3
+
+
 EXAMPLE_INTERSPHINX_CACHE = """
 
 [project]
@@ -313,6 +338,17 @@ base_url = "https://documenteer.lsst.io"
 use_service = false
 service_url = "https://roundtable-dev.lsst.cloud/ook"
 disk_cache_ttl = 0
+concurrency = 2
+circuit_breaker_threshold = 0
+report_summary = true
+direct = true
+stale_while_revalidate = true
+lockfile = "intersphinx-lock.json"
+trim = true
+trim_keep = ["py:class"]
+shared_cache = true
+shared_cache_dir = "/var/cache/intersphinx"
+shared_cache_max_size = 64
 """
 
 
@@ -328,6 +364,14 @@ def test_intersphinx_cache_defaults() -> None:
             == "https://roundtable.lsst.cloud/ook"
         )
         assert config.intersphinx_cache_disk_cache_ttl == 600
+        assert config.intersphinx_cache_concurrency == 8
+        assert config.intersphinx_cache_circuit_breaker_threshold == 3
+        assert config.intersphinx_cache_report_summary is False
+        assert config.intersphinx_cache_direct is False
+        assert config.intersphinx_cache_stale_while_revalidate is False
+        assert config.intersphinx_cache_lockfile is None
+        assert config.intersphinx_cache_shared_dir is None
+        assert config.intersphinx_cache_shared_max_size == 256
 
 
 def test_intersphinx_cache_settings() -> None:
@@ -339,6 +383,16 @@ def test_intersphinx_cache_settings() -> None:
         == "https://roundtable-dev.lsst.cloud/ook"
     )
     assert config.intersphinx_cache_disk_cache_ttl == 0
+    assert config.intersphinx_cache_concurrency == 2
+    assert config.intersphinx_cache_circuit_breaker_threshold == 0
+    assert config.intersphinx_cache_report_summary is True
+    assert config.intersphinx_cache_direct is True
+    assert config.intersphinx_cache_stale_while_revalidate is True
+    assert config.intersphinx_cache_lockfile == "intersphinx-lock.json"
+    assert config.intersphinx_cache_trim is True
+    assert config.intersphinx_cache_trim_keep == ["py:class"]
+    assert config.intersphinx_cache_shared_dir == "/var/cache/intersphinx"
+    assert config.intersphinx_cache_shared_max_size == 64
 
 
 EXAMPLE_NEGATIVE_TTL = """
@@ -358,3 +412,36 @@ def test_intersphinx_cache_negative_ttl_rejected() -> None:
     """
     with pytest.raises(ConfigError):
         DocumenteerConfig.load(EXAMPLE_NEGATIVE_TTL)
+
+
+EXAMPLE_ZERO_CONCURRENCY = """
+
+[project]
+title = "Documenteer"
+base_url = "https://documenteer.lsst.io"
+
+[sphinx.intersphinx_cache]
+concurrency = 0
+"""
+
+
+def test_intersphinx_cache_zero_concurrency_rejected() -> None:
+    """A concurrency below 1 is rejected at config load."""
+    with pytest.raises(ConfigError):
+        DocumenteerConfig.load(EXAMPLE_ZERO_CONCURRENCY)
+
+
+def test_intersphinx_cache_shared_dir_default(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Enabling the shared cache without a directory uses the XDG cache
+    directory.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", "/home/user/.xdg-cache")
+    config = DocumenteerConfig.load(
+        EXAMPLE_NO_SPHINX
+        + "\n[sphinx.intersphinx_cache]\nshared_cache = true\n"
+    )
+    assert config.intersphinx_cache_shared_dir == (
+        "/home/user/.xdg-cache/documenteer/intersphinx"
+    )
@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+import json
+import os
 from datetime import UTC, datetime
 from pathlib import Path
+from unittest.mock import patch
 
+import pytest
 from git import Actor, Repo
 
-from documenteer.conf._utils import GitRepository
+from documenteer.conf._utils import (
+    GitRepository,
+    LastCommit,
+    get_git_repository,
+)
 
 ACTOR = Actor("Test Author", "test@example.com")
 
@@ -28,6 +36,11 @@ def _commit(repo: Repo, paths: list[Path], message: str, date: str) -> None:
     )
 
 
+def _dates(index: dict[str, LastCommit]) -> dict[str, datetime]:
+    """Reduce a history index to its commit dates."""
+    return {path: commit.date for path, commit in index.items()}
+
+
 def test_source_only(tmp_path: Path) -> None:
     """The last-modified date for a single tracked file is its commit date."""
     repo = Repo.init(tmp_path)
@@ -157,13 +170,613 @@ def test_cache_reuse(tmp_path: Path) -> None:
     _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
 
     git_repo = GitRepository(tmp_path)
-    assert not git_repo._last_modified_cache
+    assert not git_repo._last_commit_cache
 
     first = git_repo.compute_last_modified([page])
     key = str(page.resolve())
-    assert key in git_repo._last_modified_cache
-    assert git_repo._last_modified_cache[key] == first
+    assert key in git_repo._last_commit_cache
+    cached = git_repo._last_commit_cache[key]
+    assert cached is not None
+    assert cached.date == first
 
     # A second call returns the same cached value.
     second = git_repo.compute_last_modified([page])
     assert second == first
+
+
+def test_history_index_matches_per_path(tmp_path: Path) -> None:
+    """History-index mode reports the same dates as per-path lookups."""
+    repo = Repo.init(tmp_path)
+    page = tmp_path / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+
+    snippet = tmp_path / "snippets" / "snippet.txt"
+    snippet.parent.mkdir()
+    snippet.write_text("snippet\n")
+    _commit(repo, [snippet], "Add snippet", "2024-07-15T00:00:00+0000")
+
+    page.write_text("Page, revised\n")
+    _commit(repo, [page], "Revise page", "2024-08-01T12:30:00+0000")
+
+    per_path = GitRepository(tmp_path)
+    indexed = GitRepository(tmp_path, history_index=True)
+    for paths in ([page], [snippet], [page, snippet]):
+        assert indexed.compute_last_commit(
+            paths
+        ) == per_path.compute_last_commit(paths)
+
+    assert _dates(indexed.get_history_index()) == {
+        "index.rst": datetime(2024, 8, 1, 12, 30, tzinfo=UTC),
+        "snippets/snippet.txt": datetime(2024, 7, 15, tzinfo=UTC),
+    }
+
+
+@pytest.mark.parametrize("backend", ["subprocess", "objects"])
+def test_history_index_merge_changes(tmp_path: Path, backend: str) -> None:
+    """A conflict resolved in a merge commit is dated by the merge, and a
+    change that the merge discarded doesn't date the file, as with per-path
+    lookups.
+    """
+    repo = Repo.init(tmp_path, initial_branch="main")
+    page = tmp_path / "index.rst"
+    other = tmp_path / "other.rst"
+    page.write_text("Page\n")
+    other.write_text("Other\n")
+    _commit(repo, [page, other], "Add pages", "2024-06-01T00:00:00+0000")
+
+    repo.git.checkout("-q", "-b", "side")
+    page.write_text("Page, side\n")
+    other.write_text("Other, side\n")
+    _commit(repo, [page, other], "Edit on side", "2024-07-01T00:00:00+0000")
+    repo.git.checkout("-q", "main")
+    page.write_text("Page, main\n")
+    _commit(repo, [page], "Edit on main", "2024-06-15T00:00:00+0000")
+
+    # The merge resolves the conflicting page by hand, and keeps main's
+    # version of the other page.
+    page.write_text("Page, resolved\n")
+    other.write_text("Other\n")
+    repo.index.add([str(page), str(other)])
+    repo.index.commit(
+        "Merge side",
+        parent_commits=[repo.head.commit, repo.commit("side")],
+        author=ACTOR,
+        committer=ACTOR,
+        author_date="2024-08-01T00:00:00+0000",
+        commit_date="2024-08-01T00:00:00+0000",
+    )
+
+    per_path = GitRepository(tmp_path)
+    indexed = GitRepository(tmp_path, history_index=True, backend=backend)
+    for path in (page, other):
+        assert indexed.compute_last_commit(
+            [path]
+        ) == per_path.compute_last_commit([path])
+    assert _dates(indexed.get_history_index()) == {
+        "index.rst": datetime(2024, 8, 1, tzinfo=UTC),
+        "other.rst": datetime(2024, 6, 1, tzinfo=UTC),
+    }
+
+
+def test_history_index_single_pass(tmp_path: Path) -> None:
+    """The index is built once, and lookups never run per-path queries."""
+    repo = Repo.init(tmp_path)
+    pages = []
+    for i in range(3):
+        page = tmp_path / f"page{i}.rst"
+        page.write_text(f"Page {i}\n")
+        _commit(
+            repo, [page], f"Add page {i}", f"2024-06-0{i + 1}T00:00:00+0000"
+        )
+        pages.append(page)
+
+    git_repo = GitRepository(tmp_path, history_index=True)
+    with patch.object(
+        git_repo._repo, "iter_commits", side_effect=AssertionError
+    ):
+        for page in pages:
+            git_repo.compute_last_modified([page])
+        index = git_repo.get_history_index()
+    assert git_repo.get_history_index() is index
+    assert git_repo.compute_last_modified(pages) == datetime(
+        2024, 6, 3, tzinfo=UTC
+    )
+
+
+def test_history_index_uncommitted_and_outside(tmp_path: Path) -> None:
+    """Untracked files and paths outside the tree are skipped in index mode."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    page = repo_dir / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+
+    draft = repo_dir / "draft.rst"
+    draft.write_text("Draft\n")
+    outside = tmp_path / "outside.txt"
+    outside.write_text("Outside\n")
+
+    git_repo = GitRepository(repo_dir, history_index=True)
+    assert git_repo.compute_last_modified([draft, outside]) is None
+    assert git_repo.compute_last_modified([page, draft, outside]) == datetime(
+        2024, 6, 1, tzinfo=UTC
+    )
+
+
+def test_history_index_rename_and_special_names(tmp_path: Path) -> None:
+    """A renamed path is dated by the rename, and unusual filenames (spaces,
+    non-ASCII characters) are indexed verbatim.
+    """
+    repo = Repo.init(tmp_path)
+    page = tmp_path / "old name é.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+
+    renamed = tmp_path / "new name é.rst"
+    repo.index.move([str(page), str(renamed)])
+    repo.index.commit(
+        "Rename page",
+        author=ACTOR,
+        committer=ACTOR,
+        author_date="2024-07-01T00:00:00+0000",
+        commit_date="2024-07-01T00:00:00+0000",
+    )
+
+    git_repo = GitRepository(tmp_path, history_index=True)
+    assert git_repo.compute_last_modified([renamed]) == datetime(
+        2024, 7, 1, tzinfo=UTC
+    )
+
+
+def test_history_index_empty_repository(tmp_path: Path) -> None:
+    """A repository without commits yields an empty index."""
+    Repo.init(tmp_path)
+    page = tmp_path / "index.rst"
+    page.write_text("Page\n")
+
+    git_repo = GitRepository(tmp_path, history_index=True)
+    assert git_repo.get_history_index() == {}
+    assert git_repo.compute_last_modified([page]) is None
+
+
+def test_history_index_cache_written_and_reused(tmp_path: Path) -> None:
+    """The index is persisted keyed by HEAD and reused without a rescan."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    page = repo_dir / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    cache_path = tmp_path / "build" / "index.json"
+
+    first = GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    )
+    assert first.compute_last_modified([page]) == datetime(
+        2024, 6, 1, tzinfo=UTC
+    )
+    head = repo.head.commit.hexsha
+    data = json.loads(cache_path.read_text())
+    assert data["head"] == head
+    assert data["commits"] == {head: "2024-06-01T00:00:00+00:00"}
+    assert data["paths"] == {"index.rst": head}
+
+    # A fresh process with the same HEAD does no Git history work at all.
+    second = GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    )
+    with patch.object(second, "_scan_history", side_effect=AssertionError):
+        assert second.compute_last_modified([page]) == datetime(
+            2024, 6, 1, tzinfo=UTC
+        )
+
+
+def test_history_index_cache_incremental_update(tmp_path: Path) -> None:
+    """When HEAD advances, only the new commits are scanned."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    page = repo_dir / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    old_head = repo.head.commit.hexsha
+    cache_path = tmp_path / "index.json"
+    GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    ).get_history_index()
+
+    snippet = repo_dir / "snippet.txt"
+    snippet.write_text("snippet\n")
+    _commit(repo, [snippet], "Add snippet", "2024-07-15T00:00:00+0000")
+    new_head = repo.head.commit.hexsha
+
+    git_repo = GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    )
+    with patch.object(
+        git_repo, "_scan_history", wraps=git_repo._scan_history
+    ) as scan:
+        index = git_repo.get_history_index()
+    scan.assert_called_once_with(new_head, since=old_head)
+    assert index == {
+        "index.rst": LastCommit(
+            sha=old_head, date=datetime(2024, 6, 1, tzinfo=UTC)
+        ),
+        "snippet.txt": LastCommit(
+            sha=new_head, date=datetime(2024, 7, 15, tzinfo=UTC)
+        ),
+    }
+    assert json.loads(cache_path.read_text())["head"] == new_head
+
+
+def test_history_index_cache_rewritten_history(tmp_path: Path) -> None:
+    """A cache for a HEAD that is no longer an ancestor is discarded."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    page = repo_dir / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    cache_path = tmp_path / "index.json"
+    # A cache recorded for a commit that doesn't exist in this repository,
+    # as after a force-push, and carrying a stale path.
+    cache_path.write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "head": "0" * 40,
+                "commits": {"0" * 40: "2020-01-01T00:00:00+00:00"},
+                "paths": {"gone.rst": "0" * 40},
+            }
+        )
+    )
+
+    git_repo = GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    )
+    assert _dates(git_repo.get_history_index()) == {
+        "index.rst": datetime(2024, 6, 1, tzinfo=UTC)
+    }
+    assert json.loads(cache_path.read_text())["head"] == (
+        repo.head.commit.hexsha
+    )
+
+
+def test_history_index_cache_unreadable(tmp_path: Path) -> None:
+    """A corrupt cache file falls back to a full scan."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    page = repo_dir / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    cache_path = tmp_path / "index.json"
+    cache_path.write_text("{not json")
+
+    git_repo = GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    )
+    assert git_repo.compute_last_modified([page]) == datetime(
+        2024, 6, 1, tzinfo=UTC
+    )
+    assert json.loads(cache_path.read_text())["version"] == 2
+
+
+def test_history_index_cache_older_version(tmp_path: Path) -> None:
+    """A cache in an older format (dates without commit SHAs) is rebuilt."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    page = repo_dir / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    cache_path = tmp_path / "index.json"
+    cache_path.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "head": repo.head.commit.hexsha,
+                "paths": {"index.rst": "2020-01-01T00:00:00+00:00"},
+            }
+        )
+    )
+
+    git_repo = GitRepository(
+        repo_dir, history_index=True, history_index_cache=cache_path
+    )
+    assert git_repo.compute_last_commit([page]) == LastCommit(
+        sha=repo.head.commit.hexsha, date=datetime(2024, 6, 1, tzinfo=UTC)
+    )
+
+
+def _make_manifest_history(tmp_path: Path) -> tuple[Repo, Path]:
+    """Create a repository with a history manifest written partway through
+    its history.
+
+    The manifest is for the third of six commits:
+
+    1. Add a.rst (Jan)
+    2. Add b.rst (Feb)
+    3. Add c.rst (Mar) -- the manifest's HEAD
+    4. Modify a.rst (Apr)
+    5. Add d.rst (May)
+    6. Modify b.rst (Jun)
+    """
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    repo = Repo.init(repo_dir)
+    for name, month in (("a", 1), ("b", 2), ("c", 3)):
+        path = repo_dir / f"{name}.rst"
+        path.write_text(f"{name}\n")
+        _commit(repo, [path], f"Add {name}", f"2024-0{month}-01T00:00:00+0000")
+    manifest_path = tmp_path / "manifest.json"
+    GitRepository(repo_dir).write_history_manifest(manifest_path)
+    for name, month in (("a", 4), ("d", 5), ("b", 6)):
+        path = repo_dir / f"{name}.rst"
+        path.write_text(f"{name}, {month}\n")
+        _commit(
+            repo, [path], f"Edit {name}", f"2024-0{month}-01T00:00:00+0000"
+        )
+    return repo, manifest_path
+
+
+@pytest.mark.parametrize("backend", ["subprocess", "objects"])
+def test_history_manifest_in_shallow_window(
+    tmp_path: Path, backend: str
+) -> None:
+    """A shallow clone whose window reaches the manifest's HEAD gets the
+    same index as a full clone, scanning only the commits since.
+    """
+    repo, manifest_path = _make_manifest_history(tmp_path)
+    clone_dir = tmp_path / "clone"
+    Repo.clone_from(f"file://{repo.working_tree_dir}", clone_dir, depth=4)
+    manifest_head = json.loads(manifest_path.read_text())["head"]
+
+    git_repo = GitRepository(
+        clone_dir,
+        history_index=True,
+        backend=backend,
+        history_manifest=manifest_path,
+    )
+    assert git_repo.is_shallow
+    assert git_repo.history_manifest_head == manifest_head
+    with patch.object(
+        git_repo, "_scan_history", wraps=git_repo._scan_history
+    ) as scan:
+        index = git_repo.get_history_index()
+    scan.assert_called_once_with(repo.head.commit.hexsha, since=manifest_head)
+    assert (
+        index
+        == GitRepository(
+            tmp_path / "repo", history_index=True
+        ).get_history_index()
+    )
+
+
+def test_history_manifest_beyond_shallow_window(tmp_path: Path) -> None:
+    """When the manifest's HEAD predates the shallow window, the boundary
+    commit only dates the paths that the manifest lacks.
+    """
+    repo, manifest_path = _make_manifest_history(tmp_path)
+    clone_dir = tmp_path / "clone"
+    Repo.clone_from(f"file://{repo.working_tree_dir}", clone_dir, depth=2)
+
+    git_repo = GitRepository(
+        clone_dir, history_index=True, history_manifest=manifest_path
+    )
+    assert _dates(git_repo.get_history_index()) == {
+        # The April edit precedes the window and postdates the manifest, so
+        # the manifest's date is kept.
+        "a.rst": datetime(2024, 1, 1, tzinfo=UTC),
+        # Edited within the window.
+        "b.rst": datetime(2024, 6, 1, tzinfo=UTC),
+        "c.rst": datetime(2024, 3, 1, tzinfo=UTC),
+        # Not in the manifest, so dated by the boundary commit.
+        "d.rst": datetime(2024, 5, 1, tzinfo=UTC),
+    }
+
+
+def test_history_manifest_ignored(tmp_path: Path) -> None:
+    """A full clone ignores the manifest, and a shallow clone ignores an
+    unreadable one.
+    """
+    repo, manifest_path = _make_manifest_history(tmp_path)
+    full = GitRepository(
+        tmp_path / "repo",
+        history_index=True,
+        history_manifest=manifest_path,
+    )
+    assert _dates(full.get_history_index())["a.rst"] == datetime(
+        2024, 4, 1, tzinfo=UTC
+    )
+
+    clone_dir = tmp_path / "clone"
+    Repo.clone_from(f"file://{repo.working_tree_dir}", clone_dir, depth=2)
+    missing = GitRepository(
+        clone_dir,
+        history_index=True,
+        history_manifest=tmp_path / "missing.json",
+    )
+    assert missing.history_manifest_head is None
+    with pytest.raises(RuntimeError, match="shallow"):
+        missing.write_history_manifest(tmp_path / "new.json")
+
+
+def test_get_git_repository_shared(tmp_path: Path) -> None:
+    """Directories in the same working tree share one repository, which is
+    discovered only once; a nested repository gets its own.
+    """
+    repo = Repo.init(tmp_path)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    page = docs / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    nested_dir = tmp_path / "vendor" / "nested"
+    nested_dir.mkdir(parents=True)
+    Repo.init(nested_dir)
+
+    shared = get_git_repository(docs)
+    with patch("documenteer.conf._utils.Repo", side_effect=AssertionError):
+        assert get_git_repository(tmp_path) is shared
+        assert get_git_repository(tmp_path / "vendor") is shared
+    nested = get_git_repository(nested_dir)
+    assert nested is not shared
+    assert nested.working_tree_dir.resolve() == nested_dir.resolve()
+    assert get_git_repository(nested_dir) is nested
+
+
+def test_history_index_follows_head(tmp_path: Path) -> None:
+    """A long-lived instance updates its index in memory, scanning only the
+    new commits, when HEAD advances.
+    """
+    repo = Repo.init(tmp_path)
+    page = tmp_path / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    old_head = repo.head.commit.hexsha
+
+    git_repo = GitRepository(tmp_path, history_index=True)
+    assert git_repo.compute_last_modified([page]) == datetime(
+        2024, 6, 1, tzinfo=UTC
+    )
+
+    page.write_text("Page, revised\n")
+    _commit(repo, [page], "Revise page", "2024-07-15T00:00:00+0000")
+    new_head = repo.head.commit.hexsha
+    with patch.object(
+        git_repo, "_scan_history", wraps=git_repo._scan_history
+    ) as scan:
+        assert git_repo.compute_last_commit([page]) == LastCommit(
+            sha=new_head, date=datetime(2024, 7, 15, tzinfo=UTC)
+        )
+    scan.assert_called_once_with(new_head, since=old_head)
+
+
+def test_enable_history_index(tmp_path: Path) -> None:
+    """Enabling the history index on an existing instance, or changing its
+    options, takes effect; repeating the same options keeps the index.
+    """
+    repo = Repo.init(tmp_path)
+    page = tmp_path / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+
+    git_repo = GitRepository(tmp_path)
+    git_repo.enable_history_index()
+    index = git_repo.get_history_index()
+    git_repo.enable_history_index()
+    assert git_repo.get_history_index() is index
+
+    cache_path = tmp_path / "build" / "index.json"
+    git_repo.enable_history_index(history_index_cache=cache_path)
+    assert git_repo.get_history_index() == index
+    assert cache_path.exists()
+
+
+def test_dirty_paths(tmp_path: Path) -> None:
+    """One git status finds modified, staged, renamed, deleted, and untracked
+    files (but not ignored ones), and is cached until refreshed.
+    """
+    repo = Repo.init(tmp_path)
+    names = ("modified.rst", "staged.rst", "old name.rst", "deleted.rst")
+    for name in (*names, "clean.rst", ".gitignore"):
+        (tmp_path / name).write_text(
+            f"{name}\n" if name[0] != "." else "*.log\n"
+        )
+    _commit(
+        repo,
+        [tmp_path / name for name in (*names, "clean.rst", ".gitignore")],
+        "Add files",
+        "2024-06-01T00:00:00+0000",
+    )
+    (tmp_path / "modified.rst").write_text("Modified\n")
+    (tmp_path / "staged.rst").write_text("Staged\n")
+    repo.git.add("staged.rst")
+    repo.git.mv("old name.rst", "new name.rst")
+    (tmp_path / "deleted.rst").unlink()
+    (tmp_path / "new").mkdir()
+    (tmp_path / "new" / "untracked.rst").write_text("Untracked\n")
+    (tmp_path / "build.log").write_text("Ignored\n")
+
+    git_repo = GitRepository(tmp_path)
+    expected = {
+        "modified.rst",
+        "staged.rst",
+        "old name.rst",
+        "new name.rst",
+        "deleted.rst",
+        "new/untracked.rst",
+    }
+    assert git_repo.get_dirty_paths() == expected
+    with patch("git.cmd.Git.execute", side_effect=AssertionError("git")):
+        assert git_repo.get_dirty_paths() == expected
+
+    (tmp_path / "modified.rst").write_text("modified.rst\n")
+    assert "modified.rst" not in git_repo.refresh_dirty_paths()
+
+
+def test_uncommitted_dates(tmp_path: Path) -> None:
+    """Uncommitted changes are dated by the status time or by mtime, and
+    otherwise ignored.
+    """
+    repo = Repo.init(tmp_path)
+    page = tmp_path / "index.rst"
+    page.write_text("Page\n")
+    _commit(repo, [page], "Add page", "2024-06-01T00:00:00+0000")
+    committed = LastCommit(
+        sha=repo.head.commit.hexsha, date=datetime(2024, 6, 1, tzinfo=UTC)
+    )
+    page.write_text("Page, edited\n")
+    snippet = tmp_path / "snippet.txt"
+    snippet.write_text("Untracked\n")
+    mtime = datetime(2024, 7, 15, tzinfo=UTC)
+    os.utime(snippet, (mtime.timestamp(), mtime.timestamp()))
+
+    git_repo = GitRepository(tmp_path, history_index=True)
+    assert git_repo.compute_last_commit([page, snippet]) == committed
+    assert git_repo.compute_last_commit(
+        [page, snippet], uncommitted="mtime"
+    ) == LastCommit(
+        sha=None, date=datetime.fromtimestamp(page.stat().st_mtime, tz=UTC)
+    )
+    assert git_repo.compute_last_commit(
+        [snippet], uncommitted="mtime"
+    ) == LastCommit(sha=None, date=mtime)
+
+    now = git_repo.compute_last_commit([page], uncommitted="now")
+    assert now is not None
+    assert now.sha is None
+    assert now.date > committed.date
+    # Every page in a build gets the same time.
+    assert git_repo.compute_last_modified([snippet], uncommitted="now") == (
+        now.date
+    )
+
+
+def test_find_paths_by_suffix(tmp_path: Path) -> None:
+    """Paths are matched by whole trailing components, and deleted paths
+    are left out.
+    """
+    repo = Repo.init(tmp_path)
+    paths = [
+        tmp_path / "src" / "pkg" / "mod.py",
+        tmp_path / "src" / "mypkg" / "mod.py",
+        tmp_path / "old" / "pkg" / "mod.py",
+    ]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("X = 1\n")
+    _commit(repo, paths, "Add modules", "2024-06-01T00:00:00+0000")
+    repo.index.remove([str(paths[2])], working_tree=True)
+    repo.index.commit("Remove old module", author=ACTOR, committer=ACTOR)
+
+    git_repo = GitRepository(tmp_path, history_index=True)
+    assert git_repo.find_paths_by_suffix("pkg/mod.py") == ["src/pkg/mod.py"]
+    assert git_repo.find_paths_by_suffix("mod.py") == [
+        "src/mypkg/mod.py",
+        "src/pkg/mod.py",
+    ]
+    assert git_repo.find_paths_by_suffix("kg/mod.py") == []